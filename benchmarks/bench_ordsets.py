@@ -0,0 +1,108 @@
+"""Scaling benchmark: member/2 scans vs ordset predicates.
+
+Loads a synthetic KB (see ``bench_suite.generate_kb``), adds the previous
+list-scanning definitions of the pantry queries under ``old_`` names, then
+times old and new versions of each query as the pantry grows.  The old
+versions cost O(required x pantry) per recipe; the ordset versions sort the
+pantry once and merge, O(required + pantry).
+
+    python benchmarks/bench_ordsets.py [--pizzas 2000] [--toppings 5000] [--sizes 10,100,1000,4000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pyswip import Functor, Variable, call  # noqa: E402
+
+from bench_suite import generate_kb  # noqa: E402
+from pizza_expert import PizzaExpertSystem  # noqa: E402
+
+
+# The member/2-based definitions the ordset predicates replaced
+OLD_DEFINITIONS = """
+old_subset([], _).
+old_subset([H|T], List) :-
+    member(H, List),
+    old_subset(T, List).
+
+old_find_missing_extra(UserIngredients, MissingExtra) :-
+    findall(Ing, (extra_base(Ing), \\+ member(Ing, UserIngredients)), MissingExtra).
+
+old_get_user_extras(UserBase, UserExtras) :-
+    findall(Ing, (member(Ing, UserBase), extra_base(Ing)), UserExtras).
+
+old_can_make_all(UserToppings, Pizzas) :-
+    findall(Pizza, (pizza_toppings(Pizza, Required), old_subset(Required, UserToppings)), Pizzas).
+
+old_missing_toppings_for_pizza(UserToppings, PizzaType, MissingToppings) :-
+    pizza_toppings(PizzaType, RequiredToppings),
+    findall(Ing, (member(Ing, RequiredToppings), \\+ member(Ing, UserToppings)), MissingToppings).
+
+old_missing_toppings_by_pizza(UserToppings, MissingByPizza) :-
+    findall([Pizza, Missing],
+            ( pizza_toppings(Pizza, _),
+              old_missing_toppings_for_pizza(UserToppings, Pizza, Missing),
+              Missing \\= []
+            ),
+            MissingByPizza).
+
+new_can_make_all(UserToppings, Pizzas) :-
+    findall(Pizza, can_make_topping(Pizza, UserToppings), Pizzas).
+"""
+
+
+def solve(name, *args):
+    """Call name(*args, Result) once, discarding the answer"""
+    result = Variable()
+    return call(Functor(name, len(args) + 1)(*args, result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pizzas", type=int, default=2000)
+    parser.add_argument("--toppings", type=int, default=5000)
+    parser.add_argument("--sizes", default="10,100,1000,4000", help="pantry sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        kb_file = generate_kb(os.path.join(workdir, "synthetic.pl"), args.pizzas,
+                              args.toppings, args.seed)
+        defs_file = os.path.join(workdir, "old_definitions.pl")
+        with open(defs_file, "w", encoding="utf-8") as f:
+            f.write(OLD_DEFINITIONS)
+        expert = PizzaExpertSystem(kb_file, cache_size=0)
+        expert.prolog.consult(defs_file)
+
+    rng = random.Random(args.seed)
+    toppings = expert.get_topping_ingredients()
+    base = expert.get_essential_base_ingredients() + expert.get_extra_base_ingredients()
+    cases = [
+        ("missing_toppings_by_pizza", "old_missing_toppings_by_pizza", "missing_toppings_by_pizza",
+         toppings),
+        ("can_make_topping (all)", "old_can_make_all", "new_can_make_all", toppings),
+        ("find_missing_extra", "old_find_missing_extra", "find_missing_extra", base + toppings),
+        ("get_user_extras", "old_get_user_extras", "get_user_extras", base + toppings),
+    ]
+
+    print(f"{args.pizzas} pizzas, {args.toppings} toppings")
+    print(f"{'query':<28}{'pantry':>8}{'member ms':>12}{'ordset ms':>12}{'speedup':>10}")
+    for label, old, new, pool in cases:
+        for size in (int(s) for s in args.sizes.split(",")):
+            pantry = rng.sample(pool, min(size, len(pool)))
+            old_s = min(timeit.repeat(lambda: solve(old, pantry), number=1, repeat=args.repeat))
+            new_s = min(timeit.repeat(lambda: solve(new, pantry), number=1, repeat=args.repeat))
+            print(f"{label:<28}{len(pantry):>8}{old_s * 1e3:>12.2f}{new_s * 1e3:>12.2f}"
+                  f"{old_s / new_s:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Micro-benchmark: f-string queries vs pre-built Functor goals.
+
+Times the per-call cost of the old query path (format the goal as text and
+let SWI parse it through ``Prolog.query``) against the term-based query
+layer of ``PizzaExpertSystem`` for the same goals.  The result cache is
+disabled so every call reaches Prolog.
+
+    python benchmarks/bench_query_layer.py [--calls 5000] [--kb pizza_expert.pl]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pizza_expert import PizzaExpertSystem  # noqa: E402
+
+
+def text_query(prolog, goal, var):
+    results = list(prolog.query(goal))
+    return results[0][var] if results else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--kb", default=os.path.join(ROOT, "pizza_expert.pl"))
+    args = parser.parse_args()
+
+    expert = PizzaExpertSystem(args.kb, cache_size=0)
+    toppings = ["tomato_sauce", "mozzarella_cheese", "pepperoni_slices", "onions"]
+    base = ["flour", "water", "salt", "sugar"]
+    pantry = "[" + ",".join(toppings) + "]"
+    base_list = "[" + ",".join(base) + "]"
+
+    cases = [
+        ("find_makeable_pizzas",
+         lambda: text_query(expert.prolog, f"find_makeable_pizzas({pantry}, Pizzas)", "Pizzas"),
+         lambda: expert.find_makeable_pizzas(toppings)),
+        ("missing_toppings_by_pizza",
+         lambda: text_query(expert.prolog, f"missing_toppings_by_pizza({pantry}, M)", "M"),
+         lambda: expert.missing_toppings_by_pizza(toppings)),
+        ("find_missing_extra",
+         lambda: text_query(expert.prolog, f"find_missing_extra({base_list}, Missing)", "Missing"),
+         lambda: expert.find_missing_extra(base)),
+        ("generate_steps",
+         lambda: text_query(expert.prolog, "generate_steps(pepperoni, [sugar], Steps)", "Steps"),
+         lambda: expert.generate_steps("pepperoni", ["sugar"])),
+    ]
+
+    print(f"{'query':<28}{'f-string us/call':>18}{'functor us/call':>18}{'speedup':>10}")
+    for name, before, after in cases:
+        before_s = min(timeit.repeat(before, number=args.calls, repeat=3)) / args.calls
+        after_s = min(timeit.repeat(after, number=args.calls, repeat=3)) / args.calls
+        print(f"{name:<28}{before_s * 1e6:>18.1f}{after_s * 1e6:>18.1f}{before_s / after_s:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
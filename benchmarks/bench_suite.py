@@ -0,0 +1,288 @@
+"""Benchmark suite for every PizzaExpertSystem query on synthetic KBs.
+
+Generates synthetic versions of ``pizza_expert.pl`` (same rules, random
+facts) at several scales, then times every public query method against
+random pantries.  Each scale runs in a fresh interpreter so peak RSS is
+per scale.  Results are written as JSON; two result files can be compared
+and regressions beyond a threshold are flagged (exit status 1).
+
+    python benchmarks/bench_suite.py --scales small,medium --backend native -o run.json
+    python benchmarks/bench_suite.py --compare baseline.json run.json --threshold 0.10
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# name -> (pizzas, toppings)
+SCALES = {
+    "tiny": (10, 50),
+    "small": (1000, 500),
+    "medium": (10000, 2000),
+    "large": (100000, 5000),
+}
+
+FACT_PREDICATES = ("essential_base", "extra_base", "topping_ingredient", "pizza_toppings",
+                   "topping_quantity", "missing_extra_effect", "base_step", "extra_step", "topping_step")
+
+_FACT_LINE = re.compile(r"(%s)\(" % "|".join(FACT_PREDICATES))
+
+
+##################################################################################
+#        Synthetic knowledge bases
+##################################################################################
+
+def kb_rules(kb_file=os.path.join(ROOT, "pizza_expert.pl")):
+    """The rules and directives of the real KB, with its facts removed"""
+    with open(kb_file, encoding="utf-8") as f:
+        return "".join(line for line in f if not _FACT_LINE.match(line))
+
+
+def generate_kb(path, pizzas, toppings, seed=0, min_toppings=2, max_toppings=8):
+    """Write a synthetic KB with the given number of pizzas and topping ingredients"""
+    rng = random.Random(seed)
+    names = [f"topping_{i}" for i in range(toppings)]
+    with open(path, "w", encoding="utf-8") as f:
+        # Rules first: they declare the catalog predicates dynamic
+        f.write(kb_rules())
+        f.write("\n")
+        for ing in ("flour", "water", "salt"):
+            f.write(f"essential_base({ing}).\n")
+        for ing in ("sugar", "semolina"):
+            f.write(f"extra_base({ing}).\n")
+        for name in names:
+            f.write(f"topping_ingredient({name}).\n")
+        for i in range(pizzas):
+            required = rng.sample(names, rng.randint(min_toppings, min(max_toppings, toppings)))
+            f.write(f"pizza_toppings(pizza_{i}, [{','.join(required)}]).\n")
+            f.write(f"topping_quantity(pizza_{i}, {required[0]}, {rng.randint(2, 4)}).\n")
+        f.write('missing_extra_effect(sugar, "Slower yeast rise, less browning").\n')
+        f.write('missing_extra_effect(semolina, "Crustless crisp, more doughy").\n')
+        f.write('base_step(1, "Mix flour, water, and salt").\n')
+        f.write('base_step(2, "Knead the dough").\n')
+        f.write('extra_step(sugar, "Add sugar to the mix").\n')
+        f.write('extra_step(semolina, "Add semolina to the mix").\n')
+        for i in range(pizzas):
+            for step in range(1, 4):
+                f.write(f'topping_step(pizza_{i}, {step}, "Step {step} of pizza {i}").\n')
+    return path
+
+
+##################################################################################
+#        Worker: time one backend on one KB
+##################################################################################
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summarize(latencies, total_s):
+    latencies = sorted(latencies)
+    return {
+        "calls": len(latencies),
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p50_us": _percentile(latencies, 0.50) * 1e6,
+        "p90_us": _percentile(latencies, 0.90) * 1e6,
+        "p99_us": _percentile(latencies, 0.99) * 1e6,
+        "max_us": latencies[-1] * 1e6,
+        "throughput_per_s": len(latencies) / total_s if total_s else 0.0,
+    }
+
+
+def _cases(expert, rng, pantry_size):
+    """method name -> zero-argument callable producing that method's arguments"""
+    toppings = expert.get_topping_ingredients()
+    pizzas = expert.get_pizza_types()
+    base = expert.get_essential_base_ingredients() + expert.get_extra_base_ingredients()
+    extras = expert.get_extra_base_ingredients()
+
+    def pantry():
+        return rng.sample(toppings, min(pantry_size, len(toppings)))
+
+    def user_base():
+        return rng.sample(base, rng.randint(1, len(base)))
+
+    def stock():
+        return {ing: rng.randint(0, 50) for ing in pantry()}
+
+    def order():
+        return {pizza: rng.randint(1, 10) for pizza in rng.sample(pizzas, min(5, len(pizzas)))}
+
+    return {
+        "get_essential_base_ingredients": lambda: (),
+        "get_extra_base_ingredients": lambda: (),
+        "get_topping_ingredients": lambda: (),
+        "check_essential_base": lambda: (user_base(),),
+        "find_missing_extra": lambda: (user_base(),),
+        "find_missing_essential": lambda: (user_base(),),
+        "get_missing_extra_effect": lambda: (rng.choice(extras),),
+        "find_makeable_pizzas": lambda: (pantry(),),
+        "missing_toppings_by_pizza": lambda: (pantry(),),
+        "closest_pizzas": lambda: (pantry(), 10, rng.choice((None, 2))),
+        "shopping_list": lambda: (pantry(), min(5, len(pizzas)), None, None, 0.05),
+        "plan_production": lambda: (stock(), order()),
+        "find_makeable_pizzas_batch": lambda: ([pantry() for _ in range(10)],),
+        "missing_toppings_by_pizza_batch": lambda: ([pantry() for _ in range(10)],),
+        "get_user_extras": lambda: (user_base(),),
+        "generate_steps": lambda: (rng.choice(pizzas), rng.sample(extras, rng.randint(0, len(extras)))),
+        "get_steps_for": lambda: (rng.choice(pizzas), user_base()),
+        "get_pizza_types": lambda: (),
+        "get_pizza_ingredients": lambda: (rng.choice(pizzas),),
+    }
+
+
+def run_worker(kb_file, backend, calls, seed, pantry_size, max_seconds):
+    """Benchmark every method in this process and return a result dict"""
+    started = time.perf_counter()
+    if backend == "native":
+        from pizza_native import NativePizzaExpertSystem
+        expert = NativePizzaExpertSystem(kb_file, use_snapshot=False)
+    else:
+        from pizza_expert import PizzaExpertSystem
+        expert = PizzaExpertSystem(kb_file, cache_size=0)
+    load_s = time.perf_counter() - started
+
+    rng = random.Random(seed)
+    methods = {}
+    for name, make_args in _cases(expert, rng, pantry_size).items():
+        method = getattr(expert, name)
+        argument_sets = [make_args() for _ in range(calls)]
+        latencies = []
+        method_start = time.perf_counter()
+        for args in argument_sets:
+            t0 = time.perf_counter()
+            method(*args)
+            latencies.append(time.perf_counter() - t0)
+            if time.perf_counter() - method_start > max_seconds:
+                break
+        methods[name] = _summarize(latencies, time.perf_counter() - method_start)
+
+    return {
+        "load_s": load_s,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "methods": methods,
+    }
+
+
+##################################################################################
+#        Driver and comparison
+##################################################################################
+
+def run_scale(scale, backend, calls, seed, pantry_size, max_seconds, workdir):
+    pizzas, toppings = SCALES[scale]
+    kb_file = generate_kb(os.path.join(workdir, f"synthetic_{scale}.pl"), pizzas, toppings, seed)
+    command = [sys.executable, os.path.abspath(__file__), "--worker", kb_file,
+               "--backend", backend, "--calls", str(calls), "--seed", str(seed),
+               "--pantry-size", str(pantry_size), "--max-seconds", str(max_seconds)]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result.update({"pizzas": pizzas, "toppings": toppings})
+    return result
+
+
+def compare(baseline, current, threshold):
+    """List of regression messages: p50 latency up or throughput down by more than threshold"""
+    regressions = []
+    for scale, result in current["results"].items():
+        base_result = baseline["results"].get(scale)
+        if base_result is None:
+            continue
+        for method, stats in result["methods"].items():
+            base_stats = base_result["methods"].get(method)
+            if base_stats is None:
+                continue
+            if stats["p50_us"] > base_stats["p50_us"] * (1 + threshold):
+                regressions.append(f"{scale}/{method}: p50 {base_stats['p50_us']:.1f}us -> "
+                                   f"{stats['p50_us']:.1f}us")
+            if stats["throughput_per_s"] < base_stats["throughput_per_s"] * (1 - threshold):
+                regressions.append(f"{scale}/{method}: throughput "
+                                   f"{base_stats['throughput_per_s']:.0f}/s -> "
+                                   f"{stats['throughput_per_s']:.0f}/s")
+        base_rss = base_result.get("peak_rss_kb")
+        if base_rss and result["peak_rss_kb"] > base_rss * (1 + threshold):
+            regressions.append(f"{scale}: peak RSS {base_rss} KB -> {result['peak_rss_kb']} KB")
+    return regressions
+
+
+def print_table(report):
+    for scale, result in report["results"].items():
+        print(f"\n{scale}: {result['pizzas']} pizzas, {result['toppings']} toppings, "
+              f"load {result['load_s'] * 1000:.0f} ms, peak RSS {result['peak_rss_kb'] / 1024:.1f} MB")
+        print(f"  {'method':<34}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}{'ops/s':>12}")
+        for method, stats in result["methods"].items():
+            print(f"  {method:<34}{stats['p50_us']:>10.1f}{stats['p90_us']:>10.1f}"
+                  f"{stats['p99_us']:>10.1f}{stats['throughput_per_s']:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PizzaExpertSystem queries")
+    parser.add_argument("--scales", default="tiny,small",
+                        help=f"comma-separated, from: {', '.join(SCALES)}")
+    parser.add_argument("--backend", choices=("prolog", "native"), default="prolog")
+    parser.add_argument("--calls", type=int, default=200, help="calls per method")
+    parser.add_argument("--max-seconds", type=float, default=10.0,
+                        help="time budget per method (fewer calls are made if exceeded)")
+    parser.add_argument("--pantry-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="compare two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--worker", metavar="KB", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.worker, args.backend, args.calls, args.seed,
+                            args.pantry_size, args.max_seconds)
+        print(json.dumps(result))
+        return
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
+
+    report = {
+        "meta": {
+            "backend": args.backend,
+            "calls": args.calls,
+            "seed": args.seed,
+            "pantry_size": args.pantry_size,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales.split(","):
+            report["results"][scale] = run_scale(scale, args.backend, args.calls, args.seed,
+                                                 args.pantry_size, args.max_seconds, workdir)
+    print_table(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
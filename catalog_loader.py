@@ -0,0 +1,265 @@
+"""Bulk loader for recipe catalogs exported as CSV or JSONL.
+
+    python catalog_loader.py catalog.csv [--kb pizza_expert.pl] [--backend prolog|native] [--replace]
+
+A catalog holds two kinds of records, one per line:
+
+* recipes: ``pizza``, ``toppings`` and optionally ``steps`` and
+  ``quantities`` (amount of a topping per pizza, 1 when not given)
+* missing-extra effects: ``extra`` and ``effect``
+
+In CSV the columns are named by the header row and list fields are packed
+into one column (toppings separated by ``;``, steps by ``|``, quantities
+written as ``topping=amount`` separated by ``;``); in JSONL they are lists
+and quantities an object.
+
+    pizza,toppings,steps,quantities
+    calzone,ricotta;ham;mozzarella_cheese,Fill the dough|Fold it over|Bake,ham=4
+
+    {"pizza": "calzone", "toppings": ["ricotta", "ham"], "steps": ["Fill", "Fold"], "quantities": {"ham": 4}}
+    {"extra": "sugar", "effect": "Slower yeast rise, less browning"}
+
+A quoted CSV field may span lines.  The file is memory-mapped and cut into
+chunks of whole records.  For the
+Prolog backend each chunk becomes one block of fact text that
+``add_catalog_facts/1`` reads and asserts in a single call, so no Prolog
+term is built in Python; the native backend appends the chunk to its tables
+and recipe index.  The recipe index is rebuilt once, after the last chunk.
+"""
+
+import argparse
+import csv
+import io
+import json
+import mmap
+import os
+import time
+
+
+DEFAULT_CHUNK_BYTES = 1 << 20
+
+TOPPING_SEPARATOR = ";"
+STEP_SEPARATOR = "|"
+QUANTITY_SEPARATOR = "="
+
+
+class CatalogFormatError(ValueError):
+    pass
+
+
+##################################################################################
+#        Reading
+##################################################################################
+
+def _chunks(path, chunk_bytes, quote=None):
+    """Yield the file's contents as bytes blocks of whole lines, about chunk_bytes each.
+
+    With quote (a byte string), a block never ends inside a quoted field, so
+    CSV fields holding newlines stay in one block.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start, size = 0, len(data)
+            while start < size:
+                end = data.find(b"\n", min(start + chunk_bytes, size) - 1)
+                if quote:
+                    quotes = data[start:size if end < 0 else end].count(quote)
+                    while end >= 0 and quotes % 2:    # newline inside a quoted field
+                        after = data.find(b"\n", end + 1)
+                        quotes += data[end:size if after < 0 else after].count(quote)
+                        end = after
+                end = size if end < 0 else end + 1
+                yield data[start:end]
+                start = end
+
+
+def _split(field, separator):
+    return [item.strip() for item in field.split(separator) if item.strip()] if field else []
+
+
+def _quantities(field):
+    quantities = {}
+    for item in _split(field, TOPPING_SEPARATOR):
+        topping, sep, amount = item.partition(QUANTITY_SEPARATOR)
+        if not sep:
+            raise CatalogFormatError(f"Quantity is not topping{QUANTITY_SEPARATOR}amount: {item}")
+        try:
+            quantities[topping.strip()] = _number(amount.strip())
+        except ValueError:
+            raise CatalogFormatError(f"Quantity is not a number: {item}")
+    return quantities
+
+
+def _number(text):
+    return float(text) if any(c in text for c in ".eE") else int(text)
+
+
+def _csv_records(rows, header):
+    """Yield records from CSV rows, given the column index of each known field"""
+    columns = len(header)
+    pizza, toppings, steps = header.get("pizza"), header.get("toppings"), header.get("steps")
+    quantities = header.get("quantities")
+    extra, effect = header.get("extra"), header.get("effect")
+    for row in rows:
+        if not row:
+            continue
+        if len(row) < columns:
+            row += [""] * (columns - len(row))
+        if pizza is not None and row[pizza]:
+            yield ("recipe", row[pizza].strip(), _split(row[toppings], TOPPING_SEPARATOR),
+                   _split(row[steps], STEP_SEPARATOR) if steps is not None else [],
+                   _quantities(row[quantities]) if quantities is not None else {})
+        elif extra is not None and row[extra]:
+            yield ("effect", row[extra].strip(), row[effect])
+
+
+def _jsonl_records(lines):
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "pizza" in record:
+            yield ("recipe", record["pizza"], record.get("toppings", []), record.get("steps", []),
+                   record.get("quantities", {}))
+        elif "extra" in record:
+            yield ("effect", record["extra"], record["effect"])
+        else:
+            raise CatalogFormatError(f"Record is neither a recipe nor an effect: {line[:80]}")
+
+
+def _parse_header(row):
+    header = {name.strip(): i for i, name in enumerate(row)}
+    if not ({"pizza", "toppings"} <= header.keys() or {"extra", "effect"} <= header.keys()):
+        raise CatalogFormatError("CSV header needs pizza,toppings[,steps] and/or extra,effect columns")
+    return header
+
+
+def read_catalog(path, fmt=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Yield (records, n_bytes) per chunk of a CSV or JSONL catalog.
+
+    Records are ("recipe", pizza, toppings, steps, quantities) or
+    ("effect", extra, effect) tuples.  fmt is "csv" or "jsonl"; by default it comes from the extension.
+    """
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    header = None
+    for chunk in _chunks(path, chunk_bytes, b'"' if fmt == "csv" else None):
+        text = chunk.decode("utf-8")
+        if fmt == "csv":
+            rows = csv.reader(io.StringIO(text, newline=""))
+            if header is None:
+                first = next(rows, None)
+                if first is None:
+                    continue
+                header = _parse_header(first)
+            records = list(_csv_records(rows, header))
+        else:
+            # Only "\n" ends a record: str.splitlines would also split on
+            # U+2028 and other separators that JSON allows inside strings
+            records = list(_jsonl_records(text.split("\n")))
+        yield records, len(chunk)
+
+
+##################################################################################
+#        Prolog fact text
+##################################################################################
+
+def _quoted(text, quote):
+    """text as a quoted Prolog atom (quote "'") or string (quote '"').
+
+    Non-ASCII characters are written as \\x<hex>\\ escapes, so the fact
+    text is plain ASCII and reads the same whatever encoding it reaches SWI in.
+    """
+    text = text.replace("\\", "\\\\").replace(quote, "\\" + quote)
+    text = text.replace("\n", "\\n").replace("\r", "\\r")
+    if not text.isascii():
+        text = "".join(c if c < "\x80" else f"\\x{ord(c):x}\\" for c in text)
+    return quote + text + quote
+
+
+def _quote_atom(text):
+    return _quoted(text, "'")
+
+
+def _quote_string(text):
+    return _quoted(text, '"')
+
+
+def prolog_facts(records):
+    """Catalog records as Prolog fact text for add_catalog_facts/1"""
+    parts = []
+    for record in records:
+        if record[0] == "recipe":
+            _, pizza, toppings, steps, quantities = record
+            name = _quote_atom(pizza)
+            parts.append(f"pizza_toppings({name}, [{','.join(map(_quote_atom, toppings))}]).\n")
+            for topping, amount in quantities.items():
+                parts.append(f"topping_quantity({name}, {_quote_atom(topping)}, {amount!r}).\n")
+            for n, step in enumerate(steps, 1):
+                parts.append(f"topping_step({name}, {n}, {_quote_string(step)}).\n")
+        else:
+            _, extra, effect = record
+            parts.append(f"missing_extra_effect({_quote_atom(extra)}, {_quote_string(effect)}).\n")
+    return "".join(parts)
+
+
+##################################################################################
+#        Loading
+##################################################################################
+
+def load_catalog(expert, path, fmt=None, chunk_bytes=DEFAULT_CHUNK_BYTES, replace=False):
+    """Stream a catalog file into an expert system and return load statistics.
+
+    expert is a PizzaExpertSystem or NativePizzaExpertSystem.  With replace
+    the KB's own recipes, steps and effects are dropped first; otherwise the
+    catalog is added to them.
+    """
+    started = time.perf_counter()
+    if replace:
+        expert.clear_catalog()
+    stats = {"chunks": 0, "bytes": 0, "recipes": 0, "steps": 0, "effects": 0}
+    for records, n_bytes in read_catalog(path, fmt, chunk_bytes):
+        expert.add_catalog_records(records)
+        stats["chunks"] += 1
+        stats["bytes"] += n_bytes
+        for record in records:
+            if record[0] == "recipe":
+                stats["recipes"] += 1
+                stats["steps"] += len(record[3])
+            else:
+                stats["effects"] += 1
+    expert.rebuild_index()
+    seconds = time.perf_counter() - started
+    rows = stats["recipes"] + stats["effects"]
+    stats.update({
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_s": rows / seconds if seconds else 0.0,
+        "mb_per_s": stats["bytes"] / 1e6 / seconds if seconds else 0.0,
+    })
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a recipe catalog into the KB")
+    parser.add_argument("catalog")
+    parser.add_argument("--kb", default="pizza_expert.pl")
+    parser.add_argument("--backend", choices=("prolog", "native"), default="prolog")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    parser.add_argument("--chunk-kb", type=int, default=DEFAULT_CHUNK_BYTES // 1024)
+    parser.add_argument("--replace", action="store_true",
+                        help="drop the KB's own recipes before loading")
+    args = parser.parse_args()
+
+    from pizza_expert import create_expert_system
+    expert = create_expert_system(args.kb, args.backend)
+    stats = load_catalog(expert, args.catalog, args.format, args.chunk_kb * 1024, args.replace)
+    print(f"Loaded {stats['recipes']} recipes, {stats['steps']} steps and {stats['effects']} "
+          f"effects in {stats['chunks']} chunk(s), {stats['seconds']:.2f} s: "
+          f"{stats['rows_per_s']:.0f} rows/s, {stats['mb_per_s']:.1f} MB/s")
+    print(f"{len(expert.get_pizza_types())} pizza types now available")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,8 @@
-from pyswip import Prolog
+from health_sessions import HealthSessionManager
 
-# Initialize Prolog engine
-prolog = Prolog()
-
-# Load your knowledge base
-prolog.consult("health.pl")
+# One consultation on the shared knowledge base
+sessions = HealthSessionManager("health.pl")
+expert = sessions.open_session()
 
 print("Welcome to the simple health expert system!")
 print("---------------------------------------------")
@@ -14,22 +12,24 @@ fever = input("Do you have a fever? (yes/no): ").strip().lower()
 cough = input("Do you have a cough? (yes/no): ").strip().lower()
 headache = input("Do you have a headache? (yes/no): ").strip().lower()
 
-# Assert facts based on user input
+# Assert facts based on user input; each one updates the diagnoses
 if fever == "yes":
-    prolog.assertz("has(fever)")
+    expert.assert_symptom("fever")
 if cough == "yes":
-    prolog.assertz("has(cough)")
+    expert.assert_symptom("cough")
 if headache == "yes":
-    prolog.assertz("has(headache)")
+    expert.assert_symptom("headache")
 
-# Query Prolog for possible disease
+# Diagnoses are already up to date
 print("\nChecking possible diagnosis...\n")
 
-for sol in prolog.query("disease(D)."):
-    print(f"✅ You might have {sol['D']}.")
+diagnoses = expert.diagnoses()
+for disease in diagnoses:
+    print(f"✅ You might have {disease}.")
 
 # If nothing matched
-if not list(prolog.query("disease(_)")):
+if not diagnoses:
     print("❌ No matching disease found.")
 
+expert.close()
 print("\nThank you for using the expert system!")
@@ -1,4 +1,9 @@
 % family.pl
+% parent/2 may grow at run time; ancestor/2 is tabled so each answer is
+% computed once and the table is updated as parent/2 facts are added.
+:- dynamic parent/2 as incremental.
+:- table ancestor/2 as incremental.
+
 parent(john, mary).
 parent(mary, susan).
 parent(john, bob).
@@ -0,0 +1,316 @@
+"""Transitive-closure index over family.pl's parent/2 facts.
+
+    python genealogy.py edges.csv [--ancestor A B] [--descendants A] [--common A B]
+
+Every person is interned to an ID, which is also their bit position, and
+keeps two bitsets: their ancestors and their descendants.  Whether
+A is an ancestor of B is then a single bit test, and the common ancestors
+of two people one ``&``, instead of re-walking parent/2 paths the way the
+naive ``ancestor/2`` recursion does.
+
+``add_parent`` updates the closure incrementally: the new parent's
+ancestors are or-ed into the child and every descendant of it, and the
+child's descendants into every one of those ancestors.  ``add_parents``
+(used by the loader) appends a whole batch of edges and recomputes the
+closure once, in topological order.
+
+A bitset is only as wide as the span of the IDs it holds, and new people
+are interned one connected family at a time, so memory grows with the
+size of the families rather than of the whole file (people x people / 8
+bytes at worst, still far below a materialised ancestor/2 table).
+"""
+
+import argparse
+import re
+import time
+
+from pizza_registry import NameRegistry
+from prolog_reader import read_prolog_facts
+
+
+_PROLOG_EDGE = re.compile(r"parent\(\s*'?([^,']+)'?\s*,\s*'?([^)']+)'?\s*\)\s*\.")
+
+
+class GenealogyCycleError(ValueError):
+    pass
+
+
+# A bitset is a (base, mask) pair: bit i of mask stands for ID base + i, so
+# it is only as wide as the span of the IDs it holds.
+EMPTY = (0, 0)
+
+
+def _union(a, b):
+    if not a[1]:
+        return b
+    if not b[1]:
+        return a
+    base = min(a[0], b[0])
+    return base, a[1] << (a[0] - base) | b[1] << (b[0] - base)
+
+
+def _intersection(a, b):
+    base = max(a[0], b[0])
+    return base, a[1] >> (base - a[0]) & b[1] >> (base - b[0])
+
+
+def _difference(a, b):
+    """Mask of a's IDs that are not in b, relative to a's base"""
+    shift = b[0] - a[0]
+    other = b[1] << shift if shift >= 0 else b[1] >> -shift
+    return a[1] & ~other
+
+
+def _has(bitset, id_):
+    base, mask = bitset
+    return id_ >= base and mask >> (id_ - base) & 1 == 1
+
+
+def _ids(bitset):
+    """IDs of a bitset, ascending"""
+    base, mask = bitset
+    while mask:
+        low = mask & -mask
+        yield base + low.bit_length() - 1
+        mask ^= low
+
+
+class GenealogyIndex:
+    """Ancestor and descendant bitsets over parent -> child edges"""
+
+    def __init__(self, edges=()):
+        self.people = NameRegistry(typecode="I")   # person <-> ID (= bit)
+        self.parents = []          # ID -> [parent IDs]
+        self.children = []         # ID -> [child IDs]
+        self.ancestors_of = []     # ID -> bitset of ancestors
+        self.descendants_of = []   # ID -> bitset of descendants
+        self.edges = 0
+        self.add_parents(edges)
+
+    @classmethod
+    def from_kb(cls, kb_file="family.pl"):
+        """Index the parent/2 facts of a Prolog file"""
+        return cls(read_prolog_facts(kb_file).get(("parent", 2), ()))
+
+    def __len__(self):
+        return len(self.people)
+
+    def __contains__(self, person):
+        return person in self.people
+
+    def _intern(self, person):
+        id_ = self.people.intern(person)
+        if id_ == len(self.parents):
+            self.parents.append([])
+            self.children.append([])
+            self.ancestors_of.append(EMPTY)
+            self.descendants_of.append(EMPTY)
+        return id_
+
+    def _intern_by_family(self, edges):
+        """Intern the new people of edges one connected family at a time.
+
+        Relatives then get neighbouring IDs, which keeps their bitsets
+        narrow whatever order the edges come in.
+        """
+        related = {}
+        for parent, child in edges:
+            if parent not in self.people or child not in self.people:
+                related.setdefault(parent, []).append(child)
+                related.setdefault(child, []).append(parent)
+        for person in related:
+            if person in self.people:
+                continue
+            family = [person]
+            self._intern(person)
+            for member in family:    # grows while it is walked
+                for relative in related[member]:
+                    if relative not in self.people:
+                        self._intern(relative)
+                        family.append(relative)
+
+    def _id(self, person):
+        id_ = self.people.get(person)
+        if id_ is None:
+            raise KeyError(person)
+        return id_
+
+    def _link(self, parent, child):
+        """Record the edge; False if it is already there"""
+        if parent in self.parents[child]:
+            return False
+        if parent == child or _has(self.ancestors_of[parent], child):
+            raise GenealogyCycleError(f"{self.people.names[parent]} cannot be a parent of "
+                                      f"{self.people.names[child]}: it would close a cycle")
+        self.parents[child].append(parent)
+        self.children[parent].append(child)
+        self.edges += 1
+        return True
+
+    ##################################################################################
+    #        Updates
+    ##################################################################################
+
+    def add_parent(self, parent, child):
+        """Add parent(parent, child) and update the closure; False if already known"""
+        p, c = self._intern(parent), self._intern(child)
+        if not self._link(p, c):
+            return False
+        ancestors, descendants = self.ancestors_of, self.descendants_of
+        above = _union(ancestors[p], (p, 1))
+        below = _union(descendants[c], (c, 1))
+        if _difference(above, ancestors[c]):
+            for d in _ids(below):
+                ancestors[d] = _union(ancestors[d], above)
+            for a in _ids(above):
+                descendants[a] = _union(descendants[a], below)
+        return True
+
+    def add_parents(self, edges):
+        """Add many (parent, child) edges, then recompute the closure once; returns how many were new"""
+        edges = list(edges)
+        self._intern_by_family(edges)
+        added = []
+        for parent, child in edges:
+            p, c = self.people.ids[parent], self.people.ids[child]
+            if c not in self.children[p]:
+                self.parents[c].append(p)
+                self.children[p].append(c)
+                added.append((p, c))
+        if added:
+            try:
+                self.rebuild()
+            except GenealogyCycleError:
+                for p, c in reversed(added):    # leave the index as it was
+                    self.parents[c].pop()
+                    self.children[p].pop()
+                raise
+        self.edges += len(added)
+        return len(added)
+
+    def rebuild(self):
+        """Recompute every bitset from the edges, parents before children"""
+        pending = [len(ps) for ps in self.parents]
+        order = [id_ for id_, count in enumerate(pending) if not count]
+        for id_ in order:    # grows while it is walked
+            for child in self.children[id_]:
+                pending[child] -= 1
+                if not pending[child]:
+                    order.append(child)
+        if len(order) < len(pending):
+            stuck = [self.people.names[id_] for id_, count in enumerate(pending) if count]
+            raise GenealogyCycleError(f"parent/2 edges form a cycle through {', '.join(stuck[:5])}")
+        ancestors, descendants = self.ancestors_of, self.descendants_of
+        for id_ in order:
+            bitset = EMPTY
+            for p in self.parents[id_]:
+                bitset = _union(bitset, _union(ancestors[p], (p, 1)))
+            ancestors[id_] = bitset
+        for id_ in reversed(order):
+            bitset = EMPTY
+            for c in self.children[id_]:
+                bitset = _union(bitset, _union(descendants[c], (c, 1)))
+            descendants[id_] = bitset
+
+    ##################################################################################
+    #        Queries
+    ##################################################################################
+
+    def is_ancestor(self, ancestor, person):
+        """ancestor(ancestor, person), as family.pl defines it"""
+        a, p = self.people.get(ancestor), self.people.get(person)
+        if a is None or p is None:
+            return False
+        return _has(self.ancestors_of[p], a)
+
+    def ancestors(self, person):
+        """Every ancestor of person, by ID order"""
+        return self.people.names_of(_ids(self.ancestors_of[self._id(person)]))
+
+    def descendants(self, person):
+        """Every descendant of person, by ID order"""
+        return self.people.names_of(_ids(self.descendants_of[self._id(person)]))
+
+    def common_ancestors(self, first, second):
+        """Ancestors shared by both people"""
+        common = _intersection(self.ancestors_of[self._id(first)], self.ancestors_of[self._id(second)])
+        return self.people.names_of(_ids(common))
+
+    def lowest_common_ancestors(self, first, second):
+        """Common ancestors with no common ancestor below them"""
+        common = _intersection(self.ancestors_of[self._id(first)], self.ancestors_of[self._id(second)])
+        return self.people.names_of(a for a in _ids(common)
+                                    if not _intersection(self.descendants_of[a], common)[1])
+
+    def parents_of(self, person):
+        return self.people.names_of(self.parents[self._id(person)])
+
+    def children_of(self, person):
+        return self.people.names_of(self.children[self._id(person)])
+
+
+##################################################################################
+#        Loading
+##################################################################################
+
+def read_parent_edges(path):
+    """Yield (parent, child) pairs from an edge file.
+
+    Lines are ``parent,child`` (CSV, optionally with that header before
+    the first edge), tab or space separated pairs, or ``parent(a, b).``
+    Prolog facts; blank lines and lines starting with ``#`` or ``%`` are
+    skipped.
+    """
+    with open(path, encoding="utf-8") as f:
+        first = True
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line[0] in "#%":
+                continue
+            if line.startswith("parent("):
+                match = _PROLOG_EDGE.match(line)
+                fields = [field.strip() for field in match.groups()] if match else ()
+            elif "," in line:
+                fields = [field.strip() for field in line.split(",")]
+            else:
+                fields = line.split()
+            if len(fields) != 2:
+                raise ValueError(f"{path}:{number}: expected a parent and a child, got {line!r}")
+            if first:
+                first = False
+                if [field.lower() for field in fields] == ["parent", "child"]:
+                    continue
+            yield fields[0], fields[1]
+
+
+def load_parent_edges(path, index=None):
+    """Add every edge of a file to index (a new one if None) and return it"""
+    if index is None:
+        index = GenealogyIndex()
+    index.add_parents(read_parent_edges(path))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index a parent-edge file and query it")
+    parser.add_argument("edges")
+    parser.add_argument("--ancestor", nargs=2, metavar=("A", "B"))
+    parser.add_argument("--descendants", metavar="A")
+    parser.add_argument("--common", nargs=2, metavar=("A", "B"))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = load_parent_edges(args.edges)
+    print(f"Indexed {index.edges} edges between {len(index)} people "
+          f"in {time.perf_counter() - start:.2f} s")
+    if args.ancestor:
+        print(f"ancestor({args.ancestor[0]}, {args.ancestor[1]}): {index.is_ancestor(*args.ancestor)}")
+    if args.descendants:
+        print(f"descendants of {args.descendants}: {', '.join(index.descendants(args.descendants))}")
+    if args.common:
+        print(f"common ancestors: {', '.join(index.common_ancestors(*args.common))}")
+        print(f"lowest common ancestors: {', '.join(index.lowest_common_ancestors(*args.common))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
 from tkinter import *
-from pyswip import Prolog
+from health_sessions import HealthSessionManager
 
-# Initialize Prolog
-prolog = Prolog()
-prolog.consult("health.pl")
+# Each run through the questions is its own consultation
+sessions = HealthSessionManager("health.pl")
+expert = sessions.open_session()
 
 # Symptoms we’ll ask about
 questions = [
@@ -30,9 +30,9 @@ def record_answer(answer):
     _, symptom = questions[current_question]
     answers[symptom] = answer
 
-    # Assert facts if "yes"
+    # Assert facts if "yes"; the diagnoses update as each one comes in
     if answer == "yes":
-        prolog.assertz(f"has({symptom})")
+        expert.assert_symptom(symptom)
 
     current_question += 1
     next_question()
@@ -42,9 +42,9 @@ def diagnose():
     yes_button.pack_forget()
     no_button.pack_forget()
 
-    diseases = list(prolog.query("disease(D)."))
+    diseases = expert.diagnoses()
     if diseases:
-        result_text = "\n".join([f"✅ You might have {d['D']}." for d in diseases])
+        result_text = "\n".join([f"✅ You might have {d}." for d in diseases])
     else:
         result_text = "❌ No matching disease found."
     
@@ -53,11 +53,11 @@ def diagnose():
     restart_button.pack(pady=10)
 
 def restart():
-    global current_question, answers
+    global current_question, answers, expert
     answers = {}
-    for fact in list(prolog.query("has(_)")):
-        # Clean old facts
-        prolog.retract(f"has({fact['_']})")
+    # Drop the old consultation in one step and start a fresh one
+    expert.close()
+    expert = sessions.open_session()
     current_question = 0
     label_result.pack_forget()
     yes_button.pack(pady=5)
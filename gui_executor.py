@@ -0,0 +1,162 @@
+"""Background query executor for the Tk GUI.
+
+A single worker thread builds the expert system and is the only thread
+that ever calls it, so the Prolog engine stays on one thread and the Tk
+event loop never waits for a query.  Jobs are callables taking the expert;
+their results are put on a queue that the Tk thread drains with
+``root.after``, so every callback runs on the Tk thread.
+
+Only the latest request matters to the GUI: submitting a new one (or
+calling cancel() when the user navigates away) cancels the previous one.
+A cancelled job that has not started is skipped; one that is already
+running cannot be interrupted, but its result is dropped.
+"""
+
+import queue
+import threading
+
+
+# How often the Tk thread checks for finished jobs while any are pending
+POLL_MS = 20
+
+
+class QueryRequest:
+    """Handle on one submitted job"""
+
+    def __init__(self, job, on_done, on_error):
+        self.job = job
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class GuiQueryExecutor:
+    """Runs expert-system jobs on a worker thread and reports back on the Tk thread"""
+
+    def __init__(self, root, factory, on_busy=None, on_load_error=None):
+        """factory() builds the expert on the worker thread.
+
+        on_busy(busy) is called on the Tk thread whenever the executor
+        becomes busy or idle; on_load_error(error) if the factory fails.
+        """
+        self.root = root
+        self.on_busy = on_busy
+        self.on_load_error = on_load_error
+        self.expert = None
+        self._load_error = None
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._latest = None
+        self._pending = 0
+        self._polling = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, args=(factory,),
+                                        name="gui-queries", daemon=True)
+        self._thread.start()
+        self._expect_result()    # the load itself reports back
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def submit(self, job, on_done, on_error=None):
+        """Run job(expert) on the worker, then on_done(result) on the Tk thread.
+
+        Cancels the previous request.  Errors raised by the job go to
+        on_error(error) (nothing is called when on_error is None).
+        """
+        self.cancel()
+        request = QueryRequest(job, on_done, on_error)
+        self._latest = request
+        self._jobs.put(request)
+        self._expect_result()
+        return request
+
+    def call(self, method, *args, on_done, on_error=None):
+        """submit() for a single expert-system method call"""
+        return self.submit(lambda expert: getattr(expert, method)(*args), on_done, on_error)
+
+    def cancel(self):
+        """Cancel the latest request, if it has not reported back yet"""
+        if self._latest is not None:
+            self._latest.cancel()
+            self._latest = None
+
+    def close(self):
+        """Stop the worker once the job it is running (if any) returns"""
+        self._closed = True
+        self.cancel()
+        self._jobs.put(None)
+
+    ##################################################################################
+    #        Worker thread
+    ##################################################################################
+
+    def _run(self, factory):
+        try:
+            self.expert = factory()
+        except Exception as e:
+            self._load_error = e
+        self._results.put((None, None, self._load_error))
+
+        while True:
+            request = self._jobs.get()
+            if request is None:
+                break
+            if request.cancelled:
+                self._results.put((request, None, None))
+                continue
+            if self._load_error is not None:
+                self._results.put((request, None, self._load_error))
+                continue
+            try:
+                result = request.job(self.expert)
+            except Exception as e:
+                self._results.put((request, None, e))
+            else:
+                self._results.put((request, result, None))
+
+    ##################################################################################
+    #        Tk thread
+    ##################################################################################
+
+    def _expect_result(self):
+        self._pending += 1
+        if self._pending == 1 and self.on_busy is not None:
+            self.on_busy(True)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        if self._closed:
+            self._polling = False
+            return
+        while True:
+            try:
+                request, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if request is None:
+                if error is not None and self.on_load_error is not None:
+                    self.on_load_error(error)
+            elif not request.cancelled:
+                if request is self._latest:
+                    self._latest = None
+                if error is None:
+                    request.on_done(result)
+                elif request.on_error is not None:
+                    request.on_error(error)
+            if self._closed:
+                self._polling = False
+                return
+        if self._pending == 0 and self.on_busy is not None:
+            self.on_busy(False)
+        if self._pending:
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
@@ -0,0 +1,148 @@
+"""Tk widgets for long lists in the GUI.
+
+``VirtualList`` shows a scrollable list of (key, text) items but only
+creates widgets for the rows that fit in its window: a small pool of row
+widgets is moved and relabelled as the list scrolls, so a list of
+thousands of toppings costs about as much as one of twenty.  An optional
+search box filters the items by their text.
+"""
+
+import tkinter as tk
+
+
+class VirtualList(tk.Frame):
+    """Scrollable, filterable list that only builds widgets for visible rows.
+
+    kind is "label" (plain rows; items whose key is None are shown as bold
+    headers), "check" (a checkbox per row; the checked keys are in
+    .selected and on_toggle(key, checked) is called on every click) or
+    "button" (command(key) is called when a row is clicked).
+    """
+
+    def __init__(self, parent, kind="label", command=None, on_toggle=None, searchable=False,
+                 row_height=28, font=("Arial", 11), fg="#333", bg="white", **kwargs):
+        super().__init__(parent, bg=bg, **kwargs)
+        self.kind = kind
+        self.command = command
+        self.on_toggle = on_toggle
+        self.row_height = row_height
+        self.font = font
+        self.fg = fg
+        self.bg = bg
+        self.items = []        # (key, text)
+        self.visible = []      # items matching the search
+        self.selected = set()  # checked keys (kind "check")
+        self._lowered = []     # text.lower() of each item, for the search
+        self._rows = []        # pool of (widget, variable, canvas window ID)
+
+        self.search_var = None
+        if searchable:
+            search_frame = tk.Frame(self, bg=bg)
+            search_frame.pack(fill=tk.X, padx=10, pady=(8, 4))
+            tk.Label(search_frame, text="🔍", font=font, bg=bg).pack(side=tk.LEFT)
+            self.search_var = tk.StringVar()
+            self.search_var.trace_add("write", lambda *_: self.refilter())
+            tk.Entry(search_frame, textvariable=self.search_var, font=font).pack(
+                side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0, yscrollincrement=row_height)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._scroll)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind(sequence, self._wheel)
+
+    def set_items(self, items):
+        """Replace the items; checked keys that are still listed stay checked"""
+        self.items = list(items)
+        self._lowered = [text.lower() for _, text in self.items]
+        self.selected &= {key for key, _ in self.items}
+        self.refilter()
+
+    def clear_selection(self):
+        self.selected.clear()
+        self.redraw()
+
+    def refilter(self):
+        """Apply the search text and scroll back to the top"""
+        query = self.search_var.get().strip().lower() if self.search_var is not None else ""
+        if query:
+            self.visible = [item for item, lowered in zip(self.items, self._lowered)
+                            if query in lowered]
+        else:
+            self.visible = self.items
+        self.canvas.configure(scrollregion=(0, 0, 0, len(self.visible) * self.row_height))
+        self.canvas.yview_moveto(0)
+        self.redraw()
+
+    ##################################################################################
+    #        Row pool
+    ##################################################################################
+
+    def _scroll(self, *args):
+        self.canvas.yview(*args)
+        self.redraw()
+
+    def _wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.canvas.yview_scroll(-1, "units")
+        else:
+            self.canvas.yview_scroll(1, "units")
+        self.redraw()
+
+    def _new_row(self):
+        if self.kind == "check":
+            variable = tk.BooleanVar()
+            widget = tk.Checkbutton(self.canvas, variable=variable, font=self.font, bg=self.bg,
+                                    fg=self.fg, anchor="w")
+        elif self.kind == "button":
+            variable = None
+            widget = tk.Button(self.canvas, font=("Arial", 12, "bold"), bg="green", fg="white",
+                               cursor="hand2", relief=tk.RAISED, bd=2)
+        else:
+            variable = None
+            widget = tk.Label(self.canvas, font=self.font, bg=self.bg, fg=self.fg, anchor="w")
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self._wheel)
+        window = self.canvas.create_window(0, 0, window=widget, anchor="nw")
+        row = (widget, variable, window)
+        self._rows.append(row)
+        return row
+
+    def redraw(self):
+        """Bind the row pool to the items currently in view"""
+        height = max(self.canvas.winfo_height(), self.row_height)
+        width = max(self.canvas.winfo_width(), 1)
+        first = int(self.canvas.canvasy(0)) // self.row_height
+        needed = height // self.row_height + 2
+        while len(self._rows) < needed:
+            self._new_row()
+
+        for offset, (widget, variable, window) in enumerate(self._rows):
+            position = first + offset
+            if offset >= needed or position >= len(self.visible):
+                self.canvas.itemconfigure(window, state="hidden")
+                continue
+            key, text = self.visible[position]
+            if self.kind == "check":
+                variable.set(key in self.selected)
+                widget.configure(text=text, command=lambda k=key, v=variable: self._toggled(k, v))
+            elif self.kind == "button":
+                widget.configure(text=text, command=lambda k=key: self.command(k))
+            else:
+                header = key is None
+                widget.configure(text=text, font=self.font[:2] + ("bold",) if header else self.font,
+                                 padx=0 if header else 20)
+            self.canvas.coords(window, 0, position * self.row_height)
+            self.canvas.itemconfigure(window, state="normal", width=width,
+                                      height=self.row_height - 2)
+
+    def _toggled(self, key, variable):
+        if variable.get():
+            self.selected.add(key)
+        else:
+            self.selected.discard(key)
+        if self.on_toggle is not None:
+            self.on_toggle(key, variable.get())
@@ -1,4 +1,8 @@
 % health.pl
+% has/1 facts are asserted by single-user front ends; diagnose/2 below
+% takes the symptoms as an argument instead.
+:- dynamic has/1.
+
 symptom(fever).
 symptom(cough).
 symptom(headache).
@@ -6,3 +10,23 @@ symptom(headache).
 disease(flu) :- has(fever), has(cough).
 disease(cold) :- has(cough).
 disease(migraine) :- has(headache).
+
+% --- Session-scoped diagnosis ---
+% diagnose(+Symptoms, -Disease): Disease follows from the symptom list.
+% The disease/1 rule bodies are read with clause/2 and their has/1 goals
+% checked against Symptoms, so nothing is asserted and any number of
+% consultations can share the engine without seeing each other's answers.
+diagnose(Symptoms, Disease) :-
+    clause(disease(Disease), Body),
+    holds(Body, Symptoms).
+
+holds(true, _) :- !.
+holds((A, B), Symptoms) :- !,
+    holds(A, Symptoms),
+    holds(B, Symptoms).
+holds(has(Symptom), Symptoms) :- !,
+    memberchk(Symptom, Symptoms).
+holds(disease(Disease), Symptoms) :- !,
+    diagnose(Symptoms, Disease).
+holds(Goal, _) :-
+    call(Goal).
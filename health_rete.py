@@ -0,0 +1,379 @@
+"""Forward-chaining (Rete) engine for the health expert rules.
+
+Instead of asking Prolog ``disease(D)`` again after every answer, the
+rules of ``health.pl`` are compiled once into a Rete network:
+
+* alpha memories hold the working-memory facts matching one condition
+  pattern (``has(fever)``, ``has(X)``, ...), found by hashing the fact on
+  the pattern's constant arguments;
+* join nodes chain a rule's conditions left to right and keep the partial
+  matches (tokens) that got that far; rules starting with the same
+  conditions share those nodes;
+* a production node at the end of each chain counts the complete matches
+  of its rule and derives the rule head while there is at least one.
+
+Asserting or retracting a fact only touches the tokens that involve it, so
+each answer updates the diagnoses incrementally.  Derived facts are fed
+back into the network, so rules may build on other rules' conclusions.
+
+Facts are tuples ``(name, arg, ...)``; rule heads and conditions are
+``(name, args)`` pairs as read by ``prolog_reader.read_prolog_rules``, with
+``Var`` objects for variables.
+"""
+
+from prolog_reader import Var, read_prolog_facts, read_prolog_rules
+
+
+def _match(args, fact, bindings):
+    """Extend bindings so that condition args match the fact's arguments, or None"""
+    new = None
+    for arg, value in zip(args, fact[1:]):
+        if isinstance(arg, Var):
+            if arg.name == "_":
+                continue
+            bound = (new or bindings).get(arg.name, _UNBOUND)
+            if bound is _UNBOUND:
+                if new is None:
+                    new = dict(bindings)
+                new[arg.name] = value
+            elif bound != value:
+                return None
+        elif arg != value:
+            return None
+    return bindings if new is None else new
+
+
+_UNBOUND = object()
+
+
+def _instantiate(head, bindings):
+    name, args = head
+    values = []
+    for arg in args:
+        if isinstance(arg, Var):
+            if arg.name not in bindings:
+                raise ValueError(f"Head variable {arg.name} of {name} is not bound by the body")
+            values.append(bindings[arg.name])
+        else:
+            values.append(arg)
+    return (name, *values)
+
+
+def _pattern_key(condition):
+    """Alpha memory key of a condition: name, arity, constant arguments and repeated variables.
+
+    Conditions with the same key accept the same facts whatever their
+    variables are called, so they share one alpha memory.
+    """
+    name, args = condition
+    constants = tuple((i, arg) for i, arg in enumerate(args) if not isinstance(arg, Var))
+    first = {}
+    repeats = tuple((i, first.setdefault(arg.name, i)) for i, arg in enumerate(args)
+                    if isinstance(arg, Var) and arg.name != "_")
+    return name, len(args), constants, tuple(pair for pair in repeats if pair[0] != pair[1])
+
+
+def _condition_key(condition):
+    name, args = condition
+    return name, tuple(("?", arg.name) if isinstance(arg, Var) else arg for arg in args)
+
+
+class _Token:
+    """A partial match: the parent token plus one more fact and the bindings so far"""
+
+    __slots__ = ("parent", "fact", "bindings", "node", "children")
+
+    def __init__(self, parent, fact, bindings, node):
+        self.parent = parent
+        self.fact = fact
+        self.bindings = bindings
+        self.node = node
+        self.children = {}      # child token -> None
+
+
+class _AlphaMemory:
+    def __init__(self, args):
+        self.args = args        # the condition's arguments (constants and variables)
+        self.facts = {}         # matching facts, in assertion order
+        self.successors = []    # join nodes fed by this memory
+
+
+class _Node:
+    """Beta network node: the tokens that reached it and the nodes below it"""
+
+    def __init__(self):
+        self.tokens = {}        # token -> None, in creation order
+        self.children = []
+
+
+class _JoinNode(_Node):
+    def __init__(self, parent, alpha, args):
+        super().__init__()
+        self.parent = parent
+        self.alpha = alpha
+        self.args = args
+
+
+class _Production(_Node):
+    def __init__(self, head, rule):
+        super().__init__()
+        self.head = head
+        self.rule = rule        # position of the rule, for clause-order results
+
+
+class ReteNetwork:
+    """Rete network over conjunctive rules with incremental fact assertion and retraction"""
+
+    def __init__(self):
+        self.root = _Node()
+        self.root_token = _Token(None, None, {}, self.root)
+        self.root.tokens[self.root_token] = None
+        self.facts = {}           # asserted fact -> None
+        self.derived = {}         # derived fact -> number of complete matches producing it
+        self.rule_of = {}         # derived fact -> position of the first rule that derived it
+        self.rules = 0
+        self._alpha = {}          # (name, arity) -> {constant positions -> {constants -> [memory]}}
+        self._alpha_by_key = {}   # pattern key -> alpha memory
+        self._joins = {}          # (parent node, condition key) -> join node
+        self._fact_tokens = {}    # fact -> {token: None} for the tokens that joined it
+        self._working = {}        # (name, arity) -> {fact: None}, asserted and derived
+
+    ##################################################################################
+    #        Compiling rules
+    ##################################################################################
+
+    def add_rule(self, head, body):
+        """Compile one rule (head and a list of conditions) into the network"""
+        node = self.root
+        for condition in body:
+            node = self._join(node, condition)
+        production = _Production(head, self.rules)
+        self.rules += 1
+        node.children.append(production)
+        for token in list(node.tokens):
+            self._activate(production, token, None, token.bindings, [])
+
+    def _join(self, parent, condition):
+        key = (parent, _condition_key(condition))
+        join = self._joins.get(key)
+        if join is None:
+            alpha = self._alpha_memory(condition)
+            join = _JoinNode(parent, alpha, condition[1])
+            self._joins[key] = join
+            parent.children.append(join)
+            alpha.successors.append(join)
+            for token in list(parent.tokens):
+                for fact in list(alpha.facts):
+                    bindings = _match(join.args, fact, token.bindings)
+                    if bindings is not None:
+                        self._activate(join, token, fact, bindings, [])
+        return join
+
+    def _alpha_memory(self, condition):
+        key = _pattern_key(condition)
+        alpha = self._alpha_by_key.get(key)
+        if alpha is None:
+            name, arity, constants, _ = key
+            alpha = _AlphaMemory(condition[1])
+            positions = tuple(i for i, _ in constants)
+            values = tuple(value for _, value in constants)
+            self._alpha.setdefault((name, arity), {}).setdefault(positions, {}).setdefault(
+                values, []).append(alpha)
+            self._alpha_by_key[key] = alpha
+            for fact in self._working.get((name, arity), ()):
+                if _match(alpha.args, fact, {}) is not None:
+                    alpha.facts[fact] = None
+        return alpha
+
+    ##################################################################################
+    #        Working memory
+    ##################################################################################
+
+    def add_fact(self, fact):
+        """Assert a fact; returns the facts newly derived because of it"""
+        if fact in self.facts:
+            return []
+        self.facts[fact] = None
+        new = []
+        self._insert(fact, new)
+        return new
+
+    def remove_fact(self, fact):
+        """Retract an asserted fact; returns the derived facts that no longer hold.
+
+        Deletion and rederivation (DRed): the fact and everything derived
+        through it are removed first, then whatever still has a derivation
+        that does not rely on them is put back.  Plain derivation counts
+        alone would keep facts that only support each other in a cycle.
+        """
+        if fact not in self.facts:
+            return []
+        del self.facts[fact]
+        deleted = {}
+        self._delete(fact, deleted)
+        for candidate in deleted:
+            if self.derived.get(candidate) and not self._in_working(candidate):
+                self._insert(candidate, [])
+        return [candidate for candidate in deleted
+                if candidate != fact and not self._in_working(candidate)]
+
+    def reset(self):
+        """Retract every asserted fact"""
+        for fact in list(self.facts):
+            self.remove_fact(fact)
+
+    def holds(self, fact):
+        return self._in_working(fact)
+
+    def query(self, name, arity=None):
+        """Facts of predicate name currently true (asserted first, then derived in rule order)"""
+        found = [fact for fact in self.facts
+                 if fact[0] == name and (arity is None or len(fact) == arity + 1)]
+        derived = [fact for fact in self.derived
+                   if fact[0] == name and (arity is None or len(fact) == arity + 1)
+                   and fact not in self.facts]
+        derived.sort(key=self.rule_of.__getitem__)
+        return found + derived
+
+    def _in_working(self, fact):
+        return fact in self._working.get((fact[0], len(fact) - 1), ())
+
+    def _insert(self, fact, new):
+        """Add a fact to working memory and propagate it through the network"""
+        name, arity = fact[0], len(fact) - 1
+        working = self._working.setdefault((name, arity), {})
+        if fact in working:
+            return
+        working[fact] = None
+        for positions, memories in self._alpha.get((name, arity), {}).items():
+            for alpha in memories.get(tuple(fact[i + 1] for i in positions), ()):
+                if _match(alpha.args, fact, {}) is None:
+                    continue
+                alpha.facts[fact] = None
+                for join in alpha.successors:
+                    for token in list(join.parent.tokens):
+                        bindings = _match(join.args, fact, token.bindings)
+                        if bindings is not None:
+                            self._activate(join, token, fact, bindings, new)
+
+    def _delete(self, fact, deleted):
+        """Remove a fact from working memory with every token and derived fact built on it"""
+        working = self._working.get((fact[0], len(fact) - 1), {})
+        if working.pop(fact, _UNBOUND) is _UNBOUND:
+            return
+        deleted[fact] = None
+        for positions, memories in self._alpha.get((fact[0], len(fact) - 1), {}).items():
+            for alpha in memories.get(tuple(fact[i + 1] for i in positions), ()):
+                alpha.facts.pop(fact, None)
+        for token in list(self._fact_tokens.pop(fact, {})):
+            self._remove_token(token, deleted)
+
+    def _activate(self, node, parent, fact, bindings, new):
+        """A token reached node: store it and pass it on"""
+        token = _Token(parent, fact, bindings, node)
+        node.tokens[token] = None
+        parent.children[token] = None
+        if fact is not None:
+            self._fact_tokens.setdefault(fact, {})[token] = None
+
+        if isinstance(node, _Production):
+            derived = _instantiate(node.head, bindings)
+            self.derived[derived] = self.derived.get(derived, 0) + 1
+            self.rule_of[derived] = min(self.rule_of.get(derived, node.rule), node.rule)
+            if not self._in_working(derived):
+                new.append(derived)
+                self._insert(derived, new)
+            return
+
+        for child in node.children:
+            if isinstance(child, _Production):
+                self._activate(child, token, None, bindings, new)
+                continue
+            for other in list(child.alpha.facts):
+                joined = _match(child.args, other, bindings)
+                if joined is not None:
+                    self._activate(child, token, other, joined, new)
+
+    def _remove_token(self, token, deleted):
+        if token.node.tokens.pop(token, _UNBOUND) is _UNBOUND:
+            return    # already removed with an ancestor
+        token.parent.children.pop(token, None)
+        if token.fact is not None:
+            tokens = self._fact_tokens.get(token.fact)
+            if tokens is not None:
+                tokens.pop(token, None)
+        for child in list(token.children):
+            self._remove_token(child, deleted)
+        if isinstance(token.node, _Production):
+            derived = _instantiate(token.node.head, token.bindings)
+            count = self.derived[derived] - 1
+            if count:
+                self.derived[derived] = count
+            else:
+                del self.derived[derived]
+                del self.rule_of[derived]
+            # Over-delete: put back later if another derivation survives
+            if derived not in self.facts:
+                self._delete(derived, deleted)
+
+
+def read_health_kb(kb_file="health.pl", asserted=("has",)):
+    """The (rules, facts) of a KB file, as HealthExpertSystem loads them.
+
+    Only rules over facts, asserted predicates and other such rules are
+    kept: helpers built on Prolog built-ins (clause/2, call/1, ...) cannot
+    fire in the network.
+    """
+    rules, facts = read_prolog_rules(kb_file), read_prolog_facts(kb_file)
+    known = {name for name, _ in facts} | set(asserted)
+    while True:
+        heads = {head[0] for head, _ in rules}
+        kept = [(head, body) for head, body in rules
+                if all(goal[0] in known or goal[0] in heads for goal in body)]
+        if len(kept) == len(rules):
+            return rules, facts
+        rules = kept
+
+
+class HealthExpertSystem:
+    """health.pl diagnoses kept current by a Rete network as symptoms are answered"""
+
+    def __init__(self, kb_file="health.pl", goal="disease", kb=None):
+        """Compile the rules of kb_file and load its facts; goal is the predicate diagnosed.
+
+        kb is an already read (rules, facts) pair (see read_health_kb), to
+        skip parsing when many systems are built from one file.
+        """
+        rules, facts = kb or read_health_kb(kb_file)
+        self.goal = goal
+        self.network = ReteNetwork()
+        for head, body in rules:
+            self.network.add_rule(head, body)
+        for (name, _), rows in facts.items():
+            for args in rows:
+                self.network.add_fact((name, *args))
+        self._kb_facts = set(self.network.facts)
+
+    def get_symptoms(self):
+        """Symptoms the KB knows about"""
+        return [fact[1] for fact in self.network.query("symptom", 1)]
+
+    def assert_symptom(self, symptom):
+        """Record has(symptom); returns the diagnoses it newly makes possible"""
+        new = self.network.add_fact(("has", symptom))
+        return [fact[1] for fact in new if fact[0] == self.goal]
+
+    def retract_symptom(self, symptom):
+        """Withdraw has(symptom); returns the diagnoses no longer supported"""
+        lost = self.network.remove_fact(("has", symptom))
+        return [fact[1] for fact in lost if fact[0] == self.goal]
+
+    def diagnoses(self):
+        """Every diagnosis the current symptoms support, in rule order"""
+        return [fact[1] for fact in self.network.query(self.goal, 1)]
+
+    def reset(self):
+        """Forget every answered symptom (the KB's own facts stay)"""
+        for fact in list(self.network.facts):
+            if fact not in self._kb_facts:
+                self.network.remove_fact(fact)
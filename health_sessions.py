@@ -0,0 +1,166 @@
+"""Isolated consultations over one health knowledge base.
+
+Every consultation gets its own ``HealthSession`` holding its answers, so
+concurrent users never see each other's symptoms and closing a session is
+a single dictionary delete: nothing is asserted into a shared database and
+nothing has to be retracted fact by fact.
+
+Two backends answer the sessions:
+
+* "rete" (default): each session has its own Rete network (see
+  health_rete), compiled from rules parsed once by the manager;
+* "prolog": one SWI-Prolog engine serves every session through
+  ``diagnose/2``, which takes the session's symptom list as an argument.
+  Calls into the engine are serialized with a lock.
+"""
+
+import itertools
+import threading
+
+from health_rete import HealthExpertSystem, read_health_kb
+
+
+class HealthSession:
+    """One consultation: its answered symptoms and the diagnoses they support"""
+
+    def __init__(self, manager, session_id):
+        self.manager = manager
+        self.id = session_id
+        self.symptoms = {}     # answered "yes", in answer order
+        self._expert = manager._new_expert()
+
+    def assert_symptom(self, symptom):
+        """Record has(symptom); returns the diagnoses it newly makes possible"""
+        if symptom in self.symptoms:
+            return []
+        self.symptoms[symptom] = None
+        if self._expert is not None:
+            return self._expert.assert_symptom(symptom)
+        before = self.manager.diagnose(list(self.symptoms)[:-1])
+        return [d for d in self.manager.diagnose(list(self.symptoms)) if d not in before]
+
+    def retract_symptom(self, symptom):
+        """Withdraw has(symptom); returns the diagnoses no longer supported"""
+        if symptom not in self.symptoms:
+            return []
+        before = None if self._expert is not None else self.diagnoses()
+        del self.symptoms[symptom]
+        if self._expert is not None:
+            return self._expert.retract_symptom(symptom)
+        after = self.diagnoses()
+        return [d for d in before if d not in after]
+
+    def diagnoses(self):
+        """Every diagnosis this session's symptoms support, in rule order"""
+        if self._expert is not None:
+            return self._expert.diagnoses()
+        return self.manager.diagnose(list(self.symptoms))
+
+    def reset(self):
+        """Forget every answer of this session"""
+        self.symptoms = {}
+        if self._expert is not None:
+            self._expert.reset()
+
+    def close(self):
+        self.manager.close_session(self.id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class HealthSessionManager:
+    """Opens, finds and tears down isolated consultations on one KB"""
+
+    def __init__(self, kb_file="health.pl", backend="rete", goal="disease"):
+        self.kb_file = kb_file
+        self.backend = backend
+        self.goal = goal
+        self._sessions = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._engine_lock = threading.Lock()
+        if backend == "rete":
+            self._kb = read_health_kb(kb_file)
+            self.prolog = None
+        elif backend == "prolog":
+            from pyswip import Functor, Prolog
+            self._kb = None
+            self.prolog = Prolog()
+            self.prolog.consult(kb_file)
+            self._diagnose = Functor("diagnose", 2)
+            self._symptom = Functor("symptom", 1)
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _new_expert(self):
+        if self.backend == "rete":
+            return HealthExpertSystem(self.kb_file, self.goal, kb=self._kb)
+        return None
+
+    def open_session(self):
+        """Start a new, empty consultation"""
+        with self._lock:
+            session_id = next(self._ids)
+        session = HealthSession(self, session_id)
+        with self._lock:
+            self._sessions[session_id] = session
+        return session
+
+    def get_session(self, session_id):
+        """The open session with this ID, or None"""
+        return self._sessions.get(session_id)
+
+    def close_session(self, session_id):
+        """Drop a session and all its answers"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def get_symptoms(self):
+        """Symptoms the KB knows about"""
+        if self.prolog is None:
+            return [args[0] for args in self._kb[1].get(("symptom", 1), [])]
+        with self._engine_lock:
+            return self._solutions(self._symptom)
+
+    def diagnose(self, symptoms):
+        """Diagnoses a symptom list supports (one diagnose/2 query on the shared engine)"""
+        if self.prolog is None:
+            expert = HealthExpertSystem(self.kb_file, self.goal, kb=self._kb)
+            for symptom in symptoms:
+                expert.assert_symptom(symptom)
+            return expert.diagnoses()
+        with self._engine_lock:
+            found = self._solutions(self._diagnose, symptoms)
+        return list(dict.fromkeys(found))
+
+    def _solutions(self, functor, *args):
+        """Every binding of the last argument of functor(*args, Out).
+
+        The goal is built as a term (as in PizzaExpertSystem._solutions), so
+        symptom names always reach Prolog as atoms, never as query text.
+        """
+        from pyswip import Query, Variable
+        from pyswip.core import PL_discard_foreign_frame, PL_open_foreign_frame
+        from prolog_terms import from_prolog, to_prolog
+
+        self.prolog._init_prolog_thread()
+        frame = PL_open_foreign_frame()
+        query = None
+        try:
+            out = Variable()
+            query = Query(functor(*map(to_prolog, args), out))
+            found = []
+            while query.nextSolution():
+                found.append(from_prolog(out.value))
+            return found
+        finally:
+            if query is not None:
+                query.closeQuery()
+            PL_discard_foreign_frame(frame)
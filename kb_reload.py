@@ -0,0 +1,243 @@
+"""Hot reload of the knowledge base with an atomic, versioned swap.
+
+``ReloadingExpertSystem`` serves queries from one loaded KB version at a
+time.  ``reload()`` (or the file watcher) loads the new file into a fresh
+expert built by a factory, validates it, and only then swaps it in with a
+single reference assignment.  Queries that already started keep running
+against the version they began on; the old expert is closed once the last
+of them returns.  Every result comes back as a ``VersionedResult``
+carrying the ID of the KB version that produced it.
+
+SWI-Prolog has one engine per process, so a fresh Prolog KB needs fresh
+processes: the default factory for the "prolog" backend is a
+PooledPizzaExpertSystem, for "native" a new NativePizzaExpertSystem.
+"""
+
+import collections
+import hashlib
+import os
+import threading
+
+
+VersionedResult = collections.namedtuple("VersionedResult", ["value", "version"])
+
+# Query methods served with a version attached
+QUERY_METHODS = (
+    "get_essential_base_ingredients", "get_extra_base_ingredients", "get_topping_ingredients",
+    "check_essential_base", "find_missing_extra", "find_missing_essential",
+    "get_missing_extra_effect", "find_makeable_pizzas", "missing_toppings_by_pizza",
+    "closest_pizzas", "shopping_list", "plan_production", "find_makeable_pizzas_batch",
+    "missing_toppings_by_pizza_batch", "get_user_extras", "generate_steps", "get_steps_for",
+    "get_pizza_types", "get_pizza_ingredients",
+)
+
+
+class ReloadError(Exception):
+    pass
+
+
+def kb_version(kb_file):
+    """Version ID of a KB file: a digest of its contents"""
+    digest = hashlib.sha256()
+    with open(kb_file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def default_factory(backend="prolog", pool_size=1):
+    """Factory building a fresh expert (with its own engine) for a KB file"""
+    def factory(kb_file):
+        if backend == "prolog":
+            from pizza_pool import PooledPizzaExpertSystem
+            return PooledPizzaExpertSystem(kb_file, pool_size, backend)
+        if backend == "native":
+            from pizza_native import NativePizzaExpertSystem
+            return NativePizzaExpertSystem(kb_file)
+        from pizza_expert import create_expert_system
+        return create_expert_system(kb_file, backend)
+    return factory
+
+
+def validate_expert(expert):
+    """Smoke-test a freshly loaded KB; raises ReloadError if it looks broken.
+
+    Load errors are caught before this runs: both backends raise when the
+    file has clauses they cannot read (see ReloadingExpertSystem._load).
+    """
+    if not expert.get_essential_base_ingredients():
+        raise ReloadError("KB has no essential base ingredients")
+    pizzas = expert.get_pizza_types()
+    if not pizzas:
+        raise ReloadError("KB has no pizzas")
+    expert.find_makeable_pizzas(expert.get_topping_ingredients())
+    expert.get_steps_for(pizzas[0], expert.get_extra_base_ingredients())
+
+
+class _LoadedVersion:
+    """One loaded KB version and the number of queries running on it"""
+
+    def __init__(self, version, expert, mtime):
+        self.version = version
+        self.expert = expert
+        self.mtime = mtime
+        self.active = 0
+        self.retired = False
+
+
+class ReloadingExpertSystem:
+    """Expert system whose KB can be replaced while it keeps serving queries"""
+
+    def __init__(self, kb_file="pizza_expert.pl", factory=None, validate=validate_expert):
+        """factory(kb_file) must return a new, independent expert (default: default_factory())"""
+        self.kb_file = os.path.abspath(kb_file)
+        self.factory = factory or default_factory()
+        self.validate = validate
+        self.reloads = 0
+        self.last_error = None
+        self._lock = threading.Lock()          # guards active counts and retirement
+        self._reload_lock = threading.Lock()   # one reload at a time
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        self._current = self._load()
+
+    @property
+    def version(self):
+        """ID of the KB version new queries run against"""
+        return self._current.version
+
+    def _load(self):
+        mtime = os.stat(self.kb_file).st_mtime_ns
+        version = kb_version(self.kb_file)
+        try:
+            expert = self.factory(self.kb_file)
+        except Exception as e:
+            # Syntax errors and the like: the backend reports them while loading
+            raise ReloadError(f"KB failed to load: {e}") from e
+        try:
+            if self.validate is not None:
+                self.validate(expert)
+        except Exception:
+            _close(expert)
+            raise
+        return _LoadedVersion(version, expert, mtime)
+
+    def reload(self, force=False):
+        """Load, validate and swap in the KB file; returns True if the version changed.
+
+        On failure the current version keeps serving and the error is raised
+        (and kept in last_error).
+        """
+        with self._reload_lock:
+            if not force and kb_version(self.kb_file) == self._current.version:
+                return False
+            try:
+                loaded = self._load()
+            except Exception as e:
+                self.last_error = e
+                raise
+            with self._lock:
+                old, self._current = self._current, loaded
+                old.retired = True
+                idle = old.active == 0
+            self.reloads += 1
+            self.last_error = None
+        if idle:
+            _close(old.expert)
+        return True
+
+    def reload_async(self, force=False):
+        """Start reload() in a background thread and return the thread"""
+        def run():
+            try:
+                self.reload(force)
+            except Exception:
+                pass    # kept in last_error
+        thread = threading.Thread(target=run, name="kb-reload", daemon=True)
+        thread.start()
+        return thread
+
+    ##################################################################################
+    #        File watching
+    ##################################################################################
+
+    def watch(self, interval=1.0):
+        """Poll the KB file every interval seconds and reload it when it changes"""
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, args=(interval,),
+                                         name="kb-watch", daemon=True)
+        self._watcher.start()
+
+    def _watch_loop(self, interval):
+        while not self._stop_watching.wait(interval):
+            try:
+                mtime = os.stat(self.kb_file).st_mtime_ns
+            except OSError:
+                continue
+            if mtime != self._current.mtime:
+                try:
+                    if not self.reload():
+                        self._current.mtime = mtime   # touched, contents unchanged
+                except Exception:
+                    # Broken file: keep serving, retry once it changes again
+                    self._current.mtime = mtime
+
+    def stop_watching(self):
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def close(self):
+        self.stop_watching()
+        with self._lock:
+            current = self._current
+            current.retired = True
+            idle = current.active == 0
+        if idle:
+            _close(current.expert)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    ##################################################################################
+    #        Queries
+    ##################################################################################
+
+    def query(self, method, *args, **kwargs):
+        """Run one query method on the current version; returns a VersionedResult"""
+        with self._lock:
+            loaded = self._current
+            loaded.active += 1
+        try:
+            value = getattr(loaded.expert, method)(*args, **kwargs)
+        finally:
+            with self._lock:
+                loaded.active -= 1
+                idle = loaded.retired and loaded.active == 0
+            if idle:
+                _close(loaded.expert)
+        return VersionedResult(value, loaded.version)
+
+
+def _close(expert):
+    close = getattr(expert, "close", None)
+    if close is not None:
+        close()
+
+
+def _versioned(method):
+    def query(self, *args, **kwargs):
+        return self.query(method, *args, **kwargs)
+    query.__name__ = method
+    query.__doc__ = f"{method} on the current KB version, as a VersionedResult"
+    return query
+
+
+for _method in QUERY_METHODS:
+    setattr(ReloadingExpertSystem, _method, _versioned(_method))
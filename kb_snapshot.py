@@ -0,0 +1,93 @@
+"""Build step for fast-starting knowledge bases, and a startup timer.
+
+    python kb_snapshot.py build [--kb pizza_expert.pl] [--no-qlf]
+    python kb_snapshot.py timing [--kb pizza_expert.pl] [--backend prolog|native]
+
+``build`` writes two compiled forms next to the KB:
+
+* ``<kb>.qlf``     SWI-Prolog quick-load file, consulted by PizzaExpertSystem
+* ``<kb>.kbsnap``  pickled tables and recipe index for NativePizzaExpertSystem
+
+Both are only used while they are newer than (qlf) or fingerprint-match
+(kbsnap) the source; otherwise the .pl file is loaded as before.
+
+``timing`` starts a fresh interpreter and reports how long the import, the
+KB load and the first query take, and whether tkinter got imported.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from pizza_native import write_snapshot
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_TIMING_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+if {backend!r} == "native":
+    from pizza_native import NativePizzaExpertSystem as Expert
+else:
+    from pizza_expert import PizzaExpertSystem as Expert
+t1 = time.perf_counter()
+expert = Expert({kb_file!r})
+t2 = time.perf_counter()
+expert.find_makeable_pizzas(expert.get_topping_ingredients())
+t3 = time.perf_counter()
+print(json.dumps({{
+    "backend": {backend!r},
+    "import_s": t1 - t0,
+    "load_kb_s": t2 - t1,
+    "first_query_s": t3 - t2,
+    "total_s": t3 - t0,
+    "tkinter_imported": "tkinter" in sys.modules,
+}}))
+"""
+
+
+def build_qlf(kb_file):
+    """Compile kb_file to a SWI-Prolog .qlf file; returns its path"""
+    from pyswip import Functor, Prolog, call
+    Prolog()
+    if not call(Functor("qcompile", 1)(os.path.abspath(kb_file))):
+        raise RuntimeError(f"qcompile failed for {kb_file}")
+    return os.path.splitext(kb_file)[0] + ".qlf"
+
+
+def measure_startup(kb_file="pizza_expert.pl", backend="prolog"):
+    """Time import, KB load and first query in a fresh interpreter"""
+    script = _TIMING_SCRIPT.format(backend=backend, kb_file=os.path.abspath(kb_file))
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the pizza KB for fast startup")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="write .qlf and .kbsnap snapshots")
+    build.add_argument("--kb", default="pizza_expert.pl")
+    build.add_argument("--no-qlf", action="store_true", help="skip the SWI-Prolog .qlf build")
+    timing = sub.add_parser("timing", help="report startup timing")
+    timing.add_argument("--kb", default="pizza_expert.pl")
+    timing.add_argument("--backend", choices=("prolog", "native"), default="prolog")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(f"Wrote {write_snapshot(args.kb)}")
+        if not args.no_qlf:
+            print(f"Wrote {build_qlf(args.kb)}")
+    else:
+        timings = measure_startup(args.kb, args.backend)
+        for key, value in timings.items():
+            if key.endswith("_s"):
+                value = f"{value * 1000:.1f} ms"
+            print(f"{key:<18}{value}")
+
+
+if __name__ == "__main__":
+    main()
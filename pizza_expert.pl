@@ -1,3 +1,7 @@
+% Catalog facts can also be bulk-loaded at runtime (see catalog_loader.py)
+:- dynamic topping_ingredient/1, pizza_toppings/2, topping_quantity/3,
+           missing_extra_effect/2, topping_step/3.
+
 % Base ingredients
 essential_base(flour).
 essential_base(water).
@@ -21,6 +25,14 @@ pizza_toppings(margherita, [fresh_tomato_slices,fresh_mozzarella,olive_oil]).
 pizza_toppings(pepperoni, [tomato_sauce,mozzarella_cheese,pepperoni_slices]).
 pizza_toppings(vegetarian, [tomato_sauce,mozzarella_cheese,onions,mushrooms]).
 
+% Amount of a topping one pizza uses (1 for any topping not listed here)
+topping_quantity(margherita, fresh_tomato_slices, 6).
+topping_quantity(margherita, fresh_mozzarella, 2).
+topping_quantity(pepperoni, pepperoni_slices, 12).
+topping_quantity(pepperoni, mozzarella_cheese, 2).
+topping_quantity(vegetarian, mozzarella_cheese, 2).
+topping_quantity(vegetarian, mushrooms, 3).
+
 % Messages for missing extra ingredients
 missing_extra_effect(sugar, "Slower yeast rise, less browning").
 missing_extra_effect(semolina, "Crustless crisp, more doughy").
@@ -49,54 +61,232 @@ topping_step(vegetarian, 3, "Add onion rings").
 topping_step(vegetarian, 4, "Add mushroom slices").
 
 
+% --- Recipe index ---
+% Built when the KB is loaded:
+%  - essential_base_set/2, extra_base_set/2 and pizza_required_set/3 hold the
+%    base ingredients and each recipe's requirements as ordsets, so the
+%    queries below are linear ord_* merges instead of member/2 scans
+%    (pizza_required_set/3 is first-argument indexed on the pizza name).
+%    Each also keeps the list in clause or recipe order: results are
+%    reported in that order, as the member/2 versions did;
+%  - every topping used by a recipe gets a bit position and every recipe a
+%    requirement bitmask (numbered in clause order), plus an inverted index
+%    from topping to the recipes that use it.
+% User ingredient lists may come in any order; each query sorts them once
+% (the Python side already passes them sorted and deduplicated, except to
+% get_user_extras/2, whose result follows the user's order).
+:- dynamic essential_base_set/2, extra_base_set/2, pizza_required_set/3.
+:- dynamic ingredient_bit/2, recipe_mask/3, recipe_uses/2.
+
+build_recipe_index :-
+    retractall(essential_base_set(_, _)),
+    retractall(extra_base_set(_, _)),
+    retractall(pizza_required_set(_, _, _)),
+    retractall(ingredient_bit(_, _)),
+    retractall(recipe_mask(_, _, _)),
+    retractall(recipe_uses(_, _)),
+    findall(Ing, essential_base(Ing), Essential),
+    sort(Essential, EssentialSet),
+    assertz(essential_base_set(EssentialSet, Essential)),
+    findall(Ing, extra_base(Ing), Extra),
+    sort(Extra, ExtraSet),
+    assertz(extra_base_set(ExtraSet, Extra)),
+    findall(Ing, (pizza_toppings(_, Required), member(Ing, Required)), AllIngs),
+    sort(AllIngs, Ings),
+    forall(nth0(Bit, Ings, Ing), assertz(ingredient_bit(Ing, Bit))),
+    findall(Pizza-Required, pizza_toppings(Pizza, Required), Recipes),
+    forall(nth0(N, Recipes, Pizza-Required),
+           ( sort(Required, RequiredSet),
+             assertz(pizza_required_set(Pizza, RequiredSet, Required)),
+             ingredients_mask(RequiredSet, Mask),
+             assertz(recipe_mask(N, Pizza, Mask)),
+             forall(member(Ing, RequiredSet), assertz(recipe_uses(Ing, N)))
+           )),
+    build_step_plans.
+
+:- initialization(build_recipe_index).
+
+% Bitmask of the given ingredients (ingredients unknown to the index are ignored)
+ingredients_mask(Ingredients, Mask) :-
+    foldl(add_ingredient_bit, Ingredients, 0, Mask).
+
+add_ingredient_bit(Ing, Mask0, Mask) :-
+    (   ingredient_bit(Ing, Bit)
+    ->  Mask is Mask0 \/ (1 << Bit)
+    ;   Mask = Mask0
+    ).
+
+% The items of List that are in the ordset Set, in list order
+items_in_set(_, [], []) :- !.
+items_in_set([], _, []).
+items_in_set([X|Xs], Set, Items) :-
+    (   ord_memberchk(X, Set)
+    ->  Items = [X|Items1]
+    ;   Items = Items1
+    ),
+    items_in_set(Xs, Set, Items1).
+
 % Check if user has all essential base ingredients
 has_essential_base(UserIngredients) :-
-    member(flour, UserIngredients),
-    member(water, UserIngredients),
-    member(salt, UserIngredients).
+    sort(UserIngredients, UserSet),
+    essential_base_set(Essential, _),
+    ord_subset(Essential, UserSet).
 
 % Find missing essential base ingredients
 find_missing_essential(UserIngredients, MissingEssential) :-
-    findall(Ing, (essential_base(Ing), \+ member(Ing, UserIngredients)), MissingEssential).
+    sort(UserIngredients, UserSet),
+    essential_base_set(EssentialSet, Essential),
+    ord_subtract(EssentialSet, UserSet, Missing),
+    items_in_set(Essential, Missing, MissingEssential).
 
 % Find missing extra base ingredients
 find_missing_extra(UserIngredients, MissingExtra) :-
-    findall(Ing, (extra_base(Ing), \+ member(Ing, UserIngredients)), MissingExtra).
+    sort(UserIngredients, UserSet),
+    extra_base_set(ExtraSet, Extra),
+    ord_subtract(ExtraSet, UserSet, Missing),
+    items_in_set(Extra, Missing, MissingExtra).
 
 % Check if user can make a specific pizza topping
 can_make_topping(PizzaType, UserToppings) :-
-    pizza_toppings(PizzaType, RequiredToppings),
-    subset(RequiredToppings, UserToppings).
-
-% Helper: check if all elements of list1 are in list2
-subset([], _).
-subset([H|T], List) :-
-    member(H, List),
-    subset(T, List).
+    sort(UserToppings, UserSet),
+    pizza_required_set(PizzaType, Required, _),
+    ord_subset(Required, UserSet).
 
-% Find all makeable pizza toppings
+% Find all makeable pizza toppings: only recipes that use one of the user's
+% toppings (or need none at all) are visited, each with a single mask test
 find_makeable_pizzas(UserToppings, MakeablePizzas) :-
-    findall(Pizza, can_make_topping(Pizza, UserToppings), MakeablePizzas).
+    ingredients_mask(UserToppings, UserMask),
+    findall(N, ( member(Ing, UserToppings), recipe_uses(Ing, N)
+               ; recipe_mask(N, _, 0)
+               ), Touched),
+    sort(Touched, Candidates),
+    findall(Pizza, ( member(N, Candidates),
+                     recipe_mask(N, Pizza, Mask),
+                     Mask /\ \UserMask =:= 0
+                   ), MakeablePizzas).
 
-% Get extra ingredients user has
+% Non-deterministic version: one makeable pizza per solution, in clause
+% order, without collecting the candidates first
+makeable_pizza(UserToppings, Pizza) :-
+    ingredients_mask(UserToppings, UserMask),
+    recipe_mask(_, Pizza, Mask),
+    Mask /\ \UserMask =:= 0.
+
+% Get extra ingredients user has, in the user's order
 get_user_extras(UserBase, UserExtras) :-
-    findall(Ing, (member(Ing, UserBase), extra_base(Ing)), UserExtras).
+    sort(UserBase, UserSet),
+    extra_base_set(Extra, _),
+    ord_intersection(UserSet, Extra, Owned),
+    items_in_set(UserBase, Owned, UserExtras).
 
 % --- NEW: Missing toppings per pizza ---
-% Compute which required toppings are missing for a given pizza
+% Compute which required toppings are missing for a given pizza, in recipe order
 missing_toppings_for_pizza(UserToppings, PizzaType, MissingToppings) :-
-    pizza_toppings(PizzaType, RequiredToppings),
-    findall(Ing, (member(Ing, RequiredToppings), \+ member(Ing, UserToppings)), MissingToppings).
+    sort(UserToppings, UserSet),
+    pizza_required_set(PizzaType, Required, Listed),
+    ord_subtract(Required, UserSet, Missing),
+    items_in_set(Listed, Missing, MissingToppings).
+
+% One pizza that is not makeable and its missing toppings per solution
+missing_toppings(UserToppings, Pizza, MissingToppings) :-
+    sort(UserToppings, UserSet),
+    pizza_required_set(Pizza, Required, Listed),
+    ord_subtract(Required, UserSet, Missing),
+    Missing \= [],
+    items_in_set(Listed, Missing, MissingToppings).
 
 % Collect all pizzas that are not makeable and their missing toppings
 missing_toppings_by_pizza(UserToppings, MissingByPizza) :-
-    findall([Pizza, Missing],
-            ( pizza_toppings(Pizza, _),
-              missing_toppings_for_pizza(UserToppings, Pizza, Missing),
-              Missing \= []
-            ),
-            MissingByPizza).
+    findall([Pizza, Missing], missing_toppings(UserToppings, Pizza, Missing), MissingByPizza).
 
+% --- Bulk catalog loading ---
+% Assert every catalog fact read from Text (Prolog clause syntax, one
+% pizza_toppings/2, topping_quantity/3, topping_step/3 or
+% missing_extra_effect/2 fact per clause).
+% Toppings not yet known become topping_ingredient/1 facts. Call
+% build_recipe_index once the last chunk is in.
+add_catalog_facts(Text) :-
+    setup_call_cleanup(open_string(Text, In),
+                       assert_catalog_facts(In),
+                       close(In)).
+
+assert_catalog_facts(In) :-
+    read_term(In, Fact, []),
+    (   Fact == end_of_file
+    ->  true
+    ;   assert_catalog_fact(Fact),
+        assert_catalog_facts(In)
+    ).
+
+assert_catalog_fact(pizza_toppings(Pizza, Required)) :- !,
+    assertz(pizza_toppings(Pizza, Required)),
+    forall(( member(Ing, Required), \+ topping_ingredient(Ing) ),
+           assertz(topping_ingredient(Ing))).
+assert_catalog_fact(topping_quantity(Pizza, Ing, Qty)) :- !,
+    assertz(topping_quantity(Pizza, Ing, Qty)).
+assert_catalog_fact(topping_step(Pizza, N, Step)) :- !,
+    assertz(topping_step(Pizza, N, Step)).
+assert_catalog_fact(missing_extra_effect(Ing, Effect)) :- !,
+    assertz(missing_extra_effect(Ing, Effect)).
+assert_catalog_fact(Fact) :-
+    type_error(catalog_fact, Fact).
+
+% Remove every catalog fact (before loading a catalog that replaces the KB's)
+clear_catalog :-
+    retractall(topping_ingredient(_)),
+    retractall(pizza_toppings(_, _)),
+    retractall(topping_quantity(_, _, _)),
+    retractall(topping_step(_, _, _)),
+    retractall(missing_extra_effect(_, _)).
+
+% --- Batch queries: evaluate a list of pantries in one call ---
+find_makeable_pizzas_batch(Pantries, Results) :-
+    maplist(find_makeable_pizzas, Pantries, Results).
+
+missing_toppings_by_pizza_batch(Pantries, Results) :-
+    maplist(missing_toppings_by_pizza, Pantries, Results).
+
+
+% --- Step plans ---
+% Steps depend only on the pizza and which extras the user has, so the plan
+% for every pizza and every subset of extra_base_set/2 (an ordset) is built
+% with the recipe index. get_steps_for/3 is then one indexed lookup; with
+% more than max_plan_extras/1 extras no plans are stored and it falls back
+% to generate_steps/3.
+:- dynamic step_plan/3.
+
+max_plan_extras(8).
+
+build_step_plans :-
+    retractall(step_plan(_, _, _)),
+    extra_base_set(Extras, _),
+    length(Extras, NExtras),
+    max_plan_extras(Max),
+    (   NExtras =< Max
+    ->  findall(Pizza, pizza_toppings(Pizza, _), AllPizzas),
+        sort(AllPizzas, Pizzas),
+        forall(( member(Pizza, Pizzas), extras_subset(Extras, Subset) ),
+               ( generate_steps(Pizza, Subset, Steps),
+                 assertz(step_plan(Pizza, Subset, Steps))
+               ))
+    ;   true
+    ).
+
+% Enumerate the subsets of an ordset (each one an ordset too)
+extras_subset([], []).
+extras_subset([X|Xs], [X|Ys]) :- extras_subset(Xs, Ys).
+extras_subset([_|Xs], Ys) :- extras_subset(Xs, Ys).
+
+% Steps for a pizza given the user's base ingredients (extra steps in
+% extra_base_set/2 order, whatever order the user lists them in)
+get_steps_for(PizzaType, UserBase, Steps) :-
+    sort(UserBase, UserSet),
+    extra_base_set(ExtraSet, _),
+    ord_intersection(UserSet, ExtraSet, Extras),
+    (   step_plan(PizzaType, Extras, Plan)
+    ->  Steps = Plan
+    ;   generate_steps(PizzaType, Extras, Steps)
+    ).
 
 % Generate complete step list for a pizza
 generate_steps(PizzaType, UserExtras, Steps) :-
@@ -106,9 +296,13 @@ generate_steps(PizzaType, UserExtras, Steps) :-
     append(BaseSteps, ExtraSteps, TempSteps),
     append(TempSteps, ToppingSteps, Steps).
 
+% One available pizza type per solution
+pizza_type(Pizza) :-
+    pizza_toppings(Pizza, _).
+
 % Get all available pizza types
 get_pizza_types(PizzaTypes) :-
-    findall(Pizza, pizza_toppings(Pizza, _), PizzaTypes).
+    findall(Pizza, pizza_type(Pizza), PizzaTypes).
 
 % Get all ingredients needed for a specific pizza type
 get_pizza_ingredients(PizzaType, AllIngredients) :-
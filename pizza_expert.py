@@ -1,731 +1,367 @@
-from pyswip import Prolog
-import tkinter as tk
-from tkinter import ttk, messagebox
+import os
+from pyswip import Prolog, Functor, Query, Variable
+from pyswip.core import PL_discard_foreign_frame, PL_exception, PL_open_foreign_frame
+from pyswip.easy import getTerm
+from pyswip.prolog import PrologError
+
+from catalog_loader import prolog_facts
+from pizza_index import PantrySession, RecipeIndex
+from prolog_terms import from_prolog, to_prolog
+from shopping_list import cheapest_cover
+from query_cache import QueryCache, cached_query
+from query_metrics import instrumented_query
+
+class KBLoadError(ValueError):
+    """SWI-Prolog reported errors (syntax errors, ...) while loading the KB"""
+
 
 class PizzaExpertSystem:
-    def __init__(self, kb_file="pizza_expert.pl"):
-        """Initialize the Prolog engine and load knowledge base"""
+    def __init__(self, kb_file="pizza_expert.pl", cache_size=1024, cache_ttl=None, metrics=None):
+        """Initialize the Prolog engine and load knowledge base.
+
+        Query results are kept in an LRU cache of cache_size entries (each
+        expiring after cache_ttl seconds, if given); cache_size=0 disables it.
+        Pass a query_metrics.QueryMetrics as metrics to record every query
+        that reaches Prolog.
+        """
+        self.kb_file = kb_file
+        self.cache = QueryCache(cache_size, cache_ttl) if cache_size else None
+        self.metrics = metrics
         self.prolog = Prolog()
-        self.prolog.consult(kb_file)
+        self._functors = {}
+        self._consult(compiled_kb_path(kb_file))
+        self._index = None
+        self._planner = None
+
+    def reload(self, kb_file=None):
+        """Reconsult the knowledge base and invalidate cached results"""
+        if kb_file is not None:
+            self.kb_file = kb_file
+        self._consult(compiled_kb_path(self.kb_file))
+        self._kb_changed()
+
+    def _consult(self, path):
+        """Consult path; raises KBLoadError if SWI printed any error while loading it.
+
+        consult only prints syntax errors and goes on, so the error count
+        (statistics/2 key ``errors``, SWI-Prolog 8.5.4 and later) is compared
+        before and after.
+        """
+        try:
+            errors = self._solve("statistics", "errors")
+        except PrologError:
+            errors = None    # older SWI-Prolog without an error count
+        self.prolog.consult(path)
+        if errors is not None:
+            new_errors = self._solve("statistics", "errors") - errors
+            if new_errors:
+                raise KBLoadError(f"{new_errors} error(s) while loading {path}")
+
+    def clear_catalog(self):
+        """Remove every recipe, topping step and missing-extra effect from the KB"""
+        self._holds("clear_catalog")
+        self._kb_changed()
+
+    def add_catalog_records(self, records):
+        """Assert a chunk of catalog_loader records; call rebuild_index() after the last one"""
+        if not self._holds("add_catalog_facts", prolog_facts(records)):
+            raise RuntimeError("add_catalog_facts failed")
+
+    def rebuild_index(self):
+        """Rebuild the recipe index after the catalog facts changed"""
+        self._holds("build_recipe_index")
+        self._kb_changed()
+
+    def _kb_changed(self):
+        """Drop everything derived from the KB: the Python recipe index, planner and cached results"""
+        self._index = None
+        self._planner = None
+        if self.cache is not None:
+            self.cache.clear()
+
+    def cache_stats(self):
+        """Hit/miss statistics of the result cache (None when disabled)"""
+        if self.cache is None:
+            return None
+        return self.cache.stats()
     
+    @cached_query()
+    @instrumented_query
     def get_essential_base_ingredients(self):
         """Get list of essential base ingredients"""
-        ingredients = []
-        for result in self.prolog.query("essential_base(X)"):
-            ingredients.append(result["X"])
-        return ingredients
+        return self._solve_all("essential_base")
     
+    @cached_query()
+    @instrumented_query
     def get_extra_base_ingredients(self):
         """Get list of extra base ingredients"""
-        ingredients = []
-        for result in self.prolog.query("extra_base(X)"):
-            ingredients.append(result["X"])
-        return ingredients
+        return self._solve_all("extra_base")
     
+    @cached_query()
+    @instrumented_query
     def get_topping_ingredients(self):
         """Get list of all topping ingredients"""
-        ingredients = []
-        for result in self.prolog.query("topping_ingredient(X)"):
-            ingredients.append(result["X"])
-        return ingredients
+        return self._solve_all("topping_ingredient")
     
+    @cached_query()
+    @instrumented_query
     def check_essential_base(self, user_base):
         """Check if user has all essential base ingredients"""
-        prolog_list = self._python_list_to_prolog(user_base)
-        query = f"has_essential_base({prolog_list})"
-        result = list(self.prolog.query(query))
-        return len(result) > 0
+        return self._holds("has_essential_base", _ordset(user_base))
     
+    @cached_query()
+    @instrumented_query
     def find_missing_extra(self, user_base):
         """Find missing extra base ingredients"""
-        prolog_list = self._python_list_to_prolog(user_base)
-        query = f"find_missing_extra({prolog_list}, Missing)"
-        results = list(self.prolog.query(query))
-        if results:
-            return results[0]["Missing"]
-        return []
+        return self._solve("find_missing_extra", _ordset(user_base), default=[])
     
+    @cached_query()
+    @instrumented_query
     def find_missing_essential(self, user_base):
         """Find missing essential base ingredients"""
-        prolog_list = self._python_list_to_prolog(user_base)
-        query = f"find_missing_essential({prolog_list}, Missing)"
-        results = list(self.prolog.query(query))
-        if results:
-            return results[0]["Missing"]
-        return []
+        return self._solve("find_missing_essential", _ordset(user_base), default=[])
     
+    @cached_query()
+    @instrumented_query
     def get_missing_extra_effect(self, ingredient):
         """Get effect message for missing extra ingredient"""
-        query = f"missing_extra_effect({ingredient}, Effect)"
-        results = list(self.prolog.query(query))
-        if results:
-            effect = results[0]["Effect"]
-            # Handle bytes object returned by PySwip
-            if isinstance(effect, bytes):
-                effect = effect.decode('utf-8')
-            return effect
-        return None
+        return self._solve("missing_extra_effect", ingredient)
     
+    @cached_query()
+    @instrumented_query
     def find_makeable_pizzas(self, user_toppings):
         """Find all pizzas that can be made with given toppings"""
-        prolog_list = self._python_list_to_prolog(user_toppings)
-        query = f"find_makeable_pizzas({prolog_list}, Pizzas)"
-        results = list(self.prolog.query(query))
-        if results:
-            return results[0]["Pizzas"]
-        return []
+        return self._solve("find_makeable_pizzas", _ordset(user_toppings), default=[])
 
     # NEW: get missing toppings by pizza from Prolog
+    @cached_query()
+    @instrumented_query
     def missing_toppings_by_pizza(self, user_toppings):
-        prolog_list = self._python_list_to_prolog(user_toppings)
-        query = f"missing_toppings_by_pizza({prolog_list}, MissingByPizza)"
-        results = list(self.prolog.query(query))
-        if not results:
+        data = self._solve("missing_toppings_by_pizza", _ordset(user_toppings), default=[])
+        return self._normalize_missing(data)
+
+    @cached_query()
+    @instrumented_query
+    def closest_pizzas(self, user_toppings, k, max_missing=None):
+        """The k pizzas missing the fewest toppings (at most max_missing), as (pizza, missing)"""
+        return self.recipe_index().closest(user_toppings, k, max_missing)
+
+    @instrumented_query
+    def shopping_list(self, user_toppings, k, costs=None, pizzas=None, time_budget=None):
+        """Cheapest ingredients to buy so at least k pizzas can be made (see shopping_list.cheapest_cover)"""
+        return cheapest_cover(self.recipe_index(), user_toppings, k, costs, pizzas, time_budget)
+
+    def recipe_index(self):
+        """RecipeIndex over the pizza_toppings/2 facts, built on first use"""
+        if self._index is None:
+            self._index = RecipeIndex(self._solutions("pizza_toppings", outputs=2))
+        return self._index
+
+    def pantry_session(self, user_toppings=()):
+        """PantrySession that keeps makeable/closest pizzas current as toppings are toggled"""
+        return PantrySession(self.recipe_index(), user_toppings)
+
+    def production_planner(self):
+        """ProductionPlanner over the recipe index and topping_quantity/3, built on first use"""
+        if self._planner is None:
+            from production_planner import ProductionPlanner
+            quantities = {}
+            for pizza, ingredient, amount in self._solutions("topping_quantity", outputs=3):
+                quantities.setdefault((pizza, ingredient), amount)
+            self._planner = ProductionPlanner(self.recipe_index(), quantities)
+        return self._planner
+
+    @instrumented_query
+    def plan_production(self, stock, order):
+        """How much of an order mix (pizza -> count) the stock (topping -> amount) covers"""
+        return self.production_planner().plan(stock, order)
+
+    @instrumented_query
+    def find_makeable_pizzas_batch(self, pantries):
+        """Find makeable pizzas for many pantries in a single Prolog call"""
+        if not pantries:
             return []
-        data = results[0]["MissingByPizza"]
-        # PySwip may return bytes atoms; normalize to strings
-        normalized = []
-        for item in data:
-            # item is a structure missing(Pizza, MissingList)
-            if hasattr(item, 'args') and len(item.args) == 2:
-                pizza = item.args[0]
-                missing_list = item.args[1]
-            else:
-                # fallback if returned as tuple-like
-                pizza, missing_list = item
-            if isinstance(pizza, bytes):
-                pizza = pizza.decode('utf-8')
-            # Ensure list items decoded
-            decoded_missing = []
-            for m in missing_list:
-                if isinstance(m, bytes):
-                    decoded_missing.append(m.decode('utf-8'))
-                else:
-                    decoded_missing.append(m)
-            normalized.append((pizza, decoded_missing))
-        return normalized
+        pantries = [_ordset(p) for p in pantries]
+        results = self._solve("find_makeable_pizzas_batch", pantries)
+        if results is not None:
+            return results
+        return [[] for _ in pantries]
+
+    @instrumented_query
+    def missing_toppings_by_pizza_batch(self, pantries):
+        """Get missing toppings by pizza for many pantries in a single Prolog call"""
+        if not pantries:
+            return []
+        pantries = [_ordset(p) for p in pantries]
+        results = self._solve("missing_toppings_by_pizza_batch", pantries)
+        if results is not None:
+            return [self._normalize_missing(data) for data in results]
+        return [[] for _ in pantries]
+
+    def _normalize_missing(self, data):
+        """Convert a Prolog list of [Pizza, Missing] pairs to (pizza, missing) tuples"""
+        return [(pizza, list(missing_list)) for pizza, missing_list in data]
     
+    @cached_query(ordered=True)
+    @instrumented_query
     def get_user_extras(self, user_base):
-        """Get which extra ingredients user has"""
-        prolog_list = self._python_list_to_prolog(user_base)
-        query = f"get_user_extras({prolog_list}, Extras)"
-        results = list(self.prolog.query(query))
-        if results:
-            return results[0]["Extras"]
-        return []
+        """Get which extra ingredients user has, in the user's order"""
+        return self._solve("get_user_extras", list(user_base), default=[])
     
+    @cached_query(ordered=True)
+    @instrumented_query
     def generate_steps(self, pizza_type, user_extras):
         """Generate complete step list for chosen pizza"""
-        extras_list = self._python_list_to_prolog(user_extras)
-        query = f"generate_steps({pizza_type}, {extras_list}, Steps)"
-        results = list(self.prolog.query(query))
-        if results:
-            steps = results[0]["Steps"]
-            # Handle bytes objects in step list
-            decoded_steps = []
-            for step in steps:
-                if isinstance(step, bytes):
-                    decoded_steps.append(step.decode('utf-8'))
-                else:
-                    decoded_steps.append(step)
-            return decoded_steps
-        return []
+        return self._solve("generate_steps", pizza_type, list(user_extras), default=[])
+
+    @cached_query()
+    @instrumented_query
+    def get_steps_for(self, pizza_type, user_base):
+        """Steps for a pizza given the user's base ingredients, from the precomputed plans"""
+        return tuple(self._solve("get_steps_for", pizza_type, _ordset(user_base), default=[]))
     
+    @cached_query()
+    @instrumented_query
     def get_pizza_types(self):
         """Get list of available pizza types"""
-        query = "get_pizza_types(PizzaTypes)"
-        results = list(self.prolog.query(query))
-        if results:
-            return results[0]["PizzaTypes"]
-        return []
+        return self._solve("get_pizza_types", default=[])
     
+    @cached_query()
+    @instrumented_query
     def get_pizza_ingredients(self, pizza_type):
         """Get all ingredients needed for a specific pizza type"""
-        query = f"get_pizza_ingredients({pizza_type}, AllIngredients)"
-        results = list(self.prolog.query(query))
-        if results:
-            return results[0]["AllIngredients"]
-        return []
-    
-    def _python_list_to_prolog(self, py_list):
-        """Convert Python list to Prolog list format"""
-        return "[" + ",".join(py_list) + "]"
-
-
-class PizzaGUI:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("🍕 Pizza Maker Expert System")
-        self.root.geometry("600x600")
-        self.root.configure(bg="#f0f0f0")
-        
-        # Initialize expert system
-        try:
-            self.expert = PizzaExpertSystem("pizza_expert.pl")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load knowledge base:\n{e}")
-            root.destroy()
-            return
-        
-        self.user_base = []
-        self.user_toppings = []
-        self.chosen_pizza = None
-        
-        # Start with welcome screen
-        self.show_welcome_screen()
-    
-    def clear_window(self):
-        """Clear all widgets from window"""
-        for widget in self.root.winfo_children():
-            widget.destroy()
-    
+        return self._solve("get_pizza_ingredients", pizza_type, default=[])
+
     ##################################################################################
-    #        welcome screen
+    #        Streaming queries
     ##################################################################################
+    #
+    # The iter_* methods yield answers one at a time from non-deterministic
+    # predicates instead of findall lists. Each keeps its Prolog query open
+    # until the generator is exhausted or closed (break out of the loop, or
+    # use contextlib.closing), and pyswip allows only one open query per
+    # engine, so finish with a generator before running another query.
 
-    def show_welcome_screen(self):
-        """Welcome screen with two main choices"""
-        self.clear_window()
-        
-        # Title
-        title = tk.Label(self.root, text="🍕 Pizza Maker Expert System", 
-                        font=("Arial", 24, "bold"), bg="#f0f0f0", fg="#333")
-        title.pack(pady=50)
-        
-        
-        # Main choices frame
-        choices_frame = tk.Frame(self.root, bg="#f0f0f0")
-        choices_frame.pack(pady=10)
-        
-        # Option A: I already have ingredients
-        have_btn = tk.Button(choices_frame, 
-                            text="start making pizza", 
-                            command=self.show_base_ingredients,
-                            font=("Arial", 14, "bold"), bg="#4CAF50", fg="white",
-                            padx=40, pady=30, cursor="hand2", relief=tk.RAISED, bd=3,
-                            wraplength=300, justify="center")
-        have_btn.pack(pady=20)
-        
-        # Option B: Show me ingredients
-        show_btn = tk.Button(choices_frame, 
-                            text="show Me Ingredients", 
-                            command=self.show_ingredients_info,
-                            font=("Arial", 14, "bold"), bg="#2196F3", fg="white",
-                            padx=40, pady=30, cursor="hand2", relief=tk.RAISED, bd=3,
-                            wraplength=300, justify="center")
-        show_btn.pack(pady=20)
+    def iter_makeable_pizzas(self, user_toppings):
+        """Yield the pizzas that can be made with given toppings, one at a time"""
+        return self._solutions("makeable_pizza", _ordset(user_toppings))
 
+    def iter_missing_toppings(self, user_toppings):
+        """Yield (pizza, missing toppings) for each pizza that cannot be made"""
+        return self._solutions("missing_toppings", _ordset(user_toppings), outputs=2)
 
-    ##################################################################################
-    #         Pizza type selection for ingredients information
-    ##################################################################################
-    
-    def show_ingredients_info(self):
-        """Show pizza type selection for ingredients information"""
-        self.clear_window()
-        
-        # Title
-        title = tk.Label(self.root, text="Pizza Ingredients Information", 
-                        font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#666")
-        title.pack(pady=30)
-        
-        # Instruction
-        instruction = tk.Label(self.root, text="Select a pizza type :", 
-                              font=("Arial", 12), bg="#f0f0f0", fg="#666")
-        instruction.pack(pady=20)
-        
-        # Main content frame
-        frame = tk.Frame(self.root, bg="white", relief=tk.RIDGE, bd=2)
-        frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
-        
-        # Get available pizza types
-        pizza_types = self.expert.get_pizza_types()
-        
-        # Create buttons for each pizza type
-        for pizza_type in pizza_types:
-            btn = tk.Button(frame, 
-                           text=f"{pizza_type.replace('_', ' ').title()} Pizza", 
-                           command=lambda p=pizza_type: self.show_pizza_ingredients(p),
-                           font=("Arial", 12, "bold"), bg="green", fg="white",
-                           padx=30, pady=15, cursor="hand2", relief=tk.RAISED, bd=2)
-            btn.pack(pady=15, padx=20, fill=tk.X)
-        
-        # Navigation buttons
-        buttons_frame = tk.Frame(self.root, bg="#f0f0f0")
-        buttons_frame.pack(pady=20)
-        
-        # Back to welcome button
-        back_btn = tk.Button(buttons_frame, text="← Back", 
-                            command=self.show_welcome_screen,
-                            font=("Arial", 12, "bold"), bg="#4CAF50", fg="white",
-                            padx=20, pady=10, cursor="hand2")
-        back_btn.pack(side=tk.LEFT, padx=10)
-    
-    ##################################################################################
-    #        Show Ingredients Info
-    ##################################################################################
-    
-    def show_pizza_ingredients(self, pizza_type):
-        """Show all ingredients needed for selected pizza type"""
-        self.clear_window()
-        
-        # Title
-        title = tk.Label(self.root, 
-                        text=f"Ingredients for {pizza_type.replace('_', ' ').title()} Pizza", 
-                        font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#333")
-        title.pack(pady=20)
-        
-        # Main content frame (matching other views structure)
-        frame = tk.Frame(self.root, bg="white", relief=tk.RIDGE, bd=2)
-        frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
-        
-        # Get all ingredients for this pizza type
-        all_ingredients = self.expert.get_pizza_ingredients(pizza_type)
-        essential = self.expert.get_essential_base_ingredients()
-        extra = self.expert.get_extra_base_ingredients()
-        
-        # Essential Base Ingredients Section
-        essential_title = tk.Label(frame, text="Essentials:", 
-                                  font=("Arial", 12,"bold"), bg="white", fg="#666")
-        essential_title.pack(anchor="w", padx=20, pady=(20, 10))
-        
-        for ing in essential:
-            ingredient_label = tk.Label(frame, text=f"◦ {ing.replace('_', ' ').title()}", 
-                                       font=("Arial", 12), bg="white", fg="#666")
-            ingredient_label.pack(anchor="w", padx=40, pady=2)
-        
-        # Extra Base Ingredients Section
-        extra_title = tk.Label(frame, text="\nExtra:", 
-                              font=("Arial", 12, "bold"), bg="white", fg="#666")
-        extra_title.pack(anchor="w", padx=20, pady=(20, 10))
-        
-        for ing in extra:
-            ingredient_label = tk.Label(frame, text=f"◦ {ing.replace('_', ' ').title()}", 
-                                       font=("Arial", 12), bg="white", fg="#666")
-            ingredient_label.pack(anchor="w", padx=40, pady=2)
-        
-        # Required Toppings Section
-        pizza_toppings = [ing for ing in all_ingredients if ing not in essential and ing not in extra]
-        
-        if pizza_toppings:
-            toppings_title = tk.Label(frame, text=f"\nToppings for {pizza_type.replace('_', ' ').title()}:", 
-                                     font=("Arial", 12, "bold"), bg="white", fg="#666")
-            toppings_title.pack(anchor="w", padx=20, pady=(20, 10))
-            
-            for ing in pizza_toppings:
-                ingredient_label = tk.Label(frame, text=f"◦ {ing.replace('_', ' ').title()}", 
-                                           font=("Arial", 12), bg="white", fg="#666")
-                ingredient_label.pack(anchor="w", padx=40, pady=2)
-        
-        # Navigation buttons
-        buttons_frame = tk.Frame(self.root, bg="#f0f0f0")
-        buttons_frame.pack(pady=20)
-        
-        # Back button
-        back_btn = tk.Button(buttons_frame, text="← Back", 
-                            command=self.show_ingredients_info,
-                            font=("Arial", 12, "bold"), bg="#4CAF50", fg="white",
-                            padx=20, pady=10, cursor="hand2")
-        back_btn.pack(side=tk.LEFT, padx=10)
-    
-    ##########
-    ##   2
-    ##########
-    ##################################################################################
-    #        Show Base Ingredients
-    ##################################################################################
-    
-    def show_base_ingredients(self):
-        """Screen 1: Select base ingredients"""
-        self.clear_window()
-        
-        subtitle = tk.Label(self.root, text="STEP 1: Select Base Ingredients you have", 
-                           font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#666")
-        subtitle.pack(pady=10)
-        
-        # Frame for checkboxes
-        frame = tk.Frame(self.root, bg="white", relief=tk.RIDGE, bd=2)
-        frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
-        
-        # Get ingredients
-        essential = self.expert.get_essential_base_ingredients()
-        extra = self.expert.get_extra_base_ingredients()
-        
-        # Essential section        
-        self.base_vars = {}
-        for ing in essential:
-            var = tk.BooleanVar()
-            cb = tk.Checkbutton(frame, text=ing.replace("_", " ").title(), 
-                               variable=var, font=("Arial", 11), bg="white")
-            cb.pack(anchor="w", padx=40, pady=2)
-            self.base_vars[ing] = var
-        
-        # Extra section  
-        for ing in extra:
-            var = tk.BooleanVar()
-            cb = tk.Checkbutton(frame, text=ing.replace("_", " ").title(), 
-                               variable=var, font=("Arial", 11), bg="white")
-            cb.pack(anchor="w", padx=40, pady=2)
-            self.base_vars[ing] = var
-        
-        # Next button
-        next_btn = tk.Button(self.root, text="Next →", command=self.analyze_base,
-                            font=("Arial", 12, "bold"), bg="#4CAF50", fg="white",
-                            padx=30, pady=10, cursor="hand2")
-        next_btn.pack(pady=20)
+    def iter_pizza_types(self):
+        """Yield the available pizza types, one at a time"""
+        return self._solutions("pizza_type")
 
-    ##################################################################################
-    #        Analyze Base Ingredients
-    ##################################################################################
-    
-    def analyze_base(self):
-        """Analyze base ingredients and show results"""
-        # Get selected ingredients
-        self.user_base = [ing for ing, var in self.base_vars.items() if var.get()]
-        
-        if not self.user_base:
-            messagebox.showwarning("No Selection", "Please select at least one ingredient!")
-            return
-        
-        # Check essentials
-        has_essential = self.expert.check_essential_base(self.user_base)
-        
-        if not has_essential:
-            # Show missing ingredients view instead of popup
-            self.show_missing_ingredients_view()
-            return
-        
-        # Show results
-        self.show_base_results()
+    def _inferences(self):
+        """Prolog inference counter, used by the query metrics"""
+        return self._solve("statistics", "inferences")
 
     ##################################################################################
-    #        Show Missing base Ingredients View
+    #        Query layer
     ##################################################################################
-    
-    def show_missing_ingredients_view(self):
-        """Show view when user is missing essential base ingredients"""
-        self.clear_window()
-        
-        # Frame for missing ingredients
-        frame = tk.Frame(self.root, bg="white", relief=tk.RIDGE, bd=2)
-        frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
-
-        # missing message
-        miss = tk.Label(frame, text="❌ Missing Essential Ingredients", 
-                          font=("Arial", 12, "bold"), bg="white", fg="red")
-        miss.pack(pady=20)
-        
-        # Get missing essential ingredients based on user selection
-        missing_essential = self.expert.find_missing_essential(self.user_base)
-        
-        info_label = tk.Label(frame, text="You are missing these essential ingredients:", 
-                             font=("Arial", 12), bg="white", fg="#666")
-        info_label.pack(anchor="w", pady=(20, 10))
-
-        # List missing essential ingredients
-        for ing in missing_essential:
-            ingredient_label = tk.Label(frame, text=f"• {ing.replace('_', ' ').title()}", 
-                                       font=("Arial", 12), bg="white", fg="red")
-            ingredient_label.pack(anchor="w", padx=40, pady=5)
-        
-        # Additional info about essentials
-        additional_info = tk.Label(frame, text="\nTo make a pizza base, you need all essential ingredients.", 
-                                  font=("Arial", 11), bg="white", fg="#666")
-        additional_info.pack(anchor="w", pady=(20, 10))
-
-        # Buttons frame
-        buttons_frame = tk.Frame(self.root, bg="#f0f0f0")
-        buttons_frame.pack(pady=20)
-        
-        # Back button
-        back_btn = tk.Button(buttons_frame, text="← Back", 
-                            command=self.show_base_ingredients,
-                            font=("Arial", 12, "bold"), bg="#666", fg="white",
-                            padx=30, pady=10, cursor="hand2")
-        back_btn.pack(side=tk.LEFT, padx=10)
-        
-        # Quit button
-        quit_btn = tk.Button(buttons_frame, text="❌ Quit", 
-                            command=self.quit_application,
-                            font=("Arial", 12, "bold"), bg="#f44336", fg="white",
-                            padx=30, pady=10, cursor="hand2")
-        quit_btn.pack(side=tk.LEFT, padx=10)
-
-    def quit_application(self):
-        """Quit the application"""
-        self.root.quit()
-        self.root.destroy()
+    #
+    # Goals are built as terms with pyswip Functor/Variable instead of query
+    # text, so SWI never re-parses a goal and Python strings always become
+    # atoms (capitals and spaces included). Functor handles are created once
+    # per predicate and reused.
 
-    ##################################################################################
-    #        Show base results if ok
-    ##################################################################################
-    
-    def show_base_results(self):
-        """Show base analysis results"""
-        self.clear_window()
-        
-        # Results frame
-        frame = tk.Frame(self.root, bg="white", relief=tk.RIDGE, bd=2)
-        frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
-        
-        # Success message
-        success = tk.Label(frame, text="✅ A basic pizza base is fine", 
-                          font=("Arial", 12, "bold"), bg="white", fg="green")
-        success.pack(pady=20)
-        
-        # Check for missing extras
-        missing_extra = self.expert.find_missing_extra(self.user_base)
-        
-        if missing_extra:
-            warning = tk.Label(frame, text="⚠️ Missing Extra Ingredients:", 
-                             font=("Arial", 12, "bold"), bg="white", fg="orange")
-            warning.pack(anchor="w", padx=20, pady=(20, 10))
-            
-            for ing in missing_extra:
-                effect = self.expert.get_missing_extra_effect(ing)
-                text = f"• {ing.replace('_', ' ').title()}: {effect}"
-                label = tk.Label(frame, text=text, font=("Arial", 10), 
-                               bg="white", fg="#666", wraplength=500, justify="left")
-                label.pack(anchor="w", padx=40, pady=2)
-        
-        # Buttons frame
-        buttons_frame = tk.Frame(self.root, bg="#f0f0f0")
-        buttons_frame.pack(pady=20)
-        
-        # Back button
-        back_btn = tk.Button(buttons_frame, text="← Back", 
-                            command=self.show_base_ingredients,
-                            font=("Arial", 12, "bold"), bg="#666", fg="white",
-                            padx=30, pady=10, cursor="hand2")
-        back_btn.pack(side=tk.LEFT, padx=10)
-
-        # Continue button
-        continue_btn = tk.Button(buttons_frame, text="Next →", 
-                                command=self.show_topping_ingredients,
-                                font=("Arial", 12, "bold"), bg="#4CAF50", fg="white",
-                                padx=30, pady=10, cursor="hand2")
-        continue_btn.pack(side=tk.LEFT, padx=10)
+    def _functor(self, name, arity):
+        """Get the cached Functor handle for name/arity"""
+        functor = self._functors.get((name, arity))
+        if functor is None:
+            functor = Functor(name, arity)
+            self._functors[(name, arity)] = functor
+        return functor
 
-    
-    ##################################################################################
-    #        Show Topping Ingredients Selection
-    ##################################################################################
+    def _solutions(self, name, *args, outputs=1):
+        """Call name(*args, Out1, ..., OutN) and yield the outputs of each solution.
 
-    def show_topping_ingredients(self):
-        """Screen 2: Select topping ingredients"""
-        self.clear_window()
-        
-        # Title
-        title = tk.Label(self.root, text="STEP 2: Select Topping Ingredients you have", 
-                        font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#333")
-        title.pack(pady=20)
-        
-        # Frame for checkboxes
-        frame = tk.Frame(self.root, bg="white", relief=tk.RIDGE, bd=2)
-        frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
-        
-        # Get topping ingredients
-        toppings = self.expert.get_topping_ingredients()
-        
-        
-        self.topping_vars = {}
-        for ing in toppings:
-            var = tk.BooleanVar()
-            cb = tk.Checkbutton(frame, text=ing.replace("_", " ").title(), 
-                               variable=var, font=("Arial", 11), bg="white")
-            cb.pack(anchor="w", padx=40, pady=2)
-            self.topping_vars[ing] = var
-        
-        # Analyze button
-        analyze_btn = tk.Button(self.root, text="Next →", 
-                               command=self.analyze_toppings,
-                               font=("Arial", 12, "bold"), bg="#4CAF50", fg="white",
-                               padx=30, pady=10, cursor="hand2")
-        analyze_btn.pack(pady=20)
-    
-    def analyze_toppings(self):
-        """Analyze toppings and show makeable pizzas"""
-        # Get selected toppings
-        self.user_toppings = [ing for ing, var in self.topping_vars.items() if var.get()]
-        
-        if not self.user_toppings:
-            messagebox.showwarning("No Selection", "Please select at least one topping!")
-            return
-        
-        # Find makeable pizzas
-        makeable_pizzas = self.expert.find_makeable_pizzas(self.user_toppings)
-        
-        if not makeable_pizzas:
-            # Navigate to missing toppings view instead of popup
-            self.show_missing_toppings_view()
-            return
-        
-        self.show_pizza_selection(makeable_pizzas)
+        The query stays open while the generator is suspended; closing the
+        generator (or exhausting it) closes the query and frees its terms.
+        """
+        Prolog._init_prolog_thread()
+        frame = PL_open_foreign_frame()
+        query = None
+        try:
+            out = [Variable() for _ in range(outputs)]
+            goal = self._functor(name, len(args) + outputs)(*map(to_prolog, args), *out)
+            query = Query(goal)
+            while query.nextSolution():
+                values = tuple(from_prolog(var.value) for var in out)
+                yield values[0] if outputs == 1 else values
+            exception = PL_exception(Query.qid)
+            if exception:
+                raise PrologError(f"Caused by: '{name}/{len(args) + outputs}'. "
+                                  f"Returned: '{getTerm(exception)}'.")
+        finally:
+            if query is not None:
+                query.closeQuery()
+            PL_discard_foreign_frame(frame)
 
-    ##################################################################################
-    #        If toppings missing view
-    ##################################################################################
-    
-    def show_missing_toppings_view(self):
-        """Show view when user is missing required toppings"""
-        self.clear_window()
-        
-        # Frame for information
-        frame = tk.Frame(self.root, bg="white", relief=tk.RIDGE, bd=2)
-        frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
-        
-        title = tk.Label(frame, text="❌ You can't make any pizza with selected toppings", 
-                         font=("Arial", 12, "bold"), bg="white", fg="red")
-        title.pack(pady=10)
-
-        # Query Prolog for each pizza's missing toppings
-        missing_by_pizza = self.expert.missing_toppings_by_pizza(self.user_toppings)
-
-        if missing_by_pizza:
-            info = tk.Label(frame, text="Missing toppings by pizza:", 
-                            font=("Arial", 12), bg="white", fg="#666")
-            info.pack(anchor="w", padx=20, pady=(10, 5))
-
-            for pizza, missing_list in missing_by_pizza:
-                pizza_name = pizza.replace('_', ' ').title() if isinstance(pizza, str) else str(pizza)
-                pizza_label = tk.Label(frame, text=f"• {pizza_name}", 
-                                       font=("Arial", 12, "bold"), bg="white", fg="#333")
-                pizza_label.pack(anchor="w", padx=30, pady=(8, 2))
-                for ing in missing_list:
-                    ing_name = ing.replace('_', ' ').title() if isinstance(ing, str) else str(ing)
-                    ing_label = tk.Label(frame, text=f"   - {ing_name}", 
-                                         font=("Arial", 11), bg="white", fg="#666")
-                    ing_label.pack(anchor="w", padx=50, pady=1)
-        else:
-            # Fallback message
-            info = tk.Label(frame, text="No pizza definitions found in knowledge base.", 
-                            font=("Arial", 12), bg="white", fg="#666")
-            info.pack(anchor="w", padx=20, pady=(10, 5))
-        
-        # Buttons frame
-        buttons_frame = tk.Frame(self.root, bg="#f0f0f0")
-        buttons_frame.pack(pady=20)
-        
-        # Back button to reselect toppings
-        back_btn = tk.Button(buttons_frame, text="← Back", 
-                            command=self.show_topping_ingredients,
-                            font=("Arial", 12, "bold"), bg="#666", fg="white",
-                            padx=30, pady=10, cursor="hand2")
-        back_btn.pack(side=tk.LEFT, padx=10)
-
-        # See ingredients button
-        see_ingredients_btn = tk.Button(buttons_frame, text="📋 See Ingredients", 
-                                       command=self.show_ingredients_info,
-                                       font=("Arial", 12, "bold"), bg="#2196F3", fg="white",
-                                       padx=20, pady=10, cursor="hand2")
-        see_ingredients_btn.pack(side=tk.LEFT, padx=10)
-    
-        # Quit button
-        quit_btn = tk.Button(buttons_frame, text="❌ Quit", 
-                            command=self.quit_application,
-                            font=("Arial", 12, "bold"), bg="#f44336", fg="white",
-                            padx=30, pady=10, cursor="hand2")
-        quit_btn.pack(side=tk.LEFT, padx=10)
+    def _solve(self, name, *args, default=None):
+        """Call name(*args, Result) and return the first binding of Result"""
+        solutions = self._solutions(name, *args)
+        try:
+            return next(solutions, default)
+        finally:
+            solutions.close()
 
-    ##################################################################################
-    #        Show pizza topping selection
-    ##################################################################################
+    def _solve_all(self, name, *args):
+        """Call name(*args, Result) and return every binding of Result"""
+        return list(self._solutions(name, *args))
 
-    def show_pizza_selection(self, makeable_pizzas):
-        """Screen 3: Choose pizza type"""
-        self.clear_window()
-        
-        # Title
-        title = tk.Label(self.root, text="STEP 3: Select Pizza Type you want", 
-                        font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#666")
-        title.pack(pady=20)
-        
-        subtitle = tk.Label(self.root, 
-                           text=f"✅ You can make {len(makeable_pizzas)} pizza type(s):", 
-                           font=("Arial", 12), bg="#f0f0f0", fg="green")
-        subtitle.pack(pady=10)
-        
-        # Frame for pizza buttons
-        frame = tk.Frame(self.root, bg="white", relief=tk.RIDGE, bd=2)
-        frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
-        
-        # Create button for each pizza
-        for pizza in makeable_pizzas:
-            btn = tk.Button(frame, text=pizza.replace("_", " ").title() + " Pizza", 
-                           command=lambda p=pizza: self.select_pizza(p),
-                           font=("Arial", 12, "bold"), bg="green", fg="white",
-                           padx=20, pady=15, cursor="hand2", relief=tk.RAISED, bd=3)
-            btn.pack(pady=10, padx=30, fill=tk.X)
-        
-        # Navigation buttons
-        buttons_frame = tk.Frame(self.root, bg="#f0f0f0")
-        buttons_frame.pack(pady=20)
-        
-        # Back button
-        back_btn = tk.Button(buttons_frame, text="← Back", 
-                            command=self.show_topping_ingredients,
-                            font=("Arial", 12, "bold"), bg="#666", fg="white",
-                            padx=30, pady=10, cursor="hand2")
-        back_btn.pack(side=tk.LEFT, padx=10)
-    
-    def select_pizza(self, pizza_type):
-        """Select pizza and show steps"""
-        self.chosen_pizza = pizza_type
-        self.show_steps()
+    def _holds(self, name, *args):
+        """Check whether name(*args) succeeds"""
+        solutions = self._solutions(name, *args, outputs=0)
+        try:
+            return next(solutions, None) is not None
+        finally:
+            solutions.close()
 
-    ##################################################################################
-    #        Show pizza preparation steps
-    ##################################################################################
-    
-    def show_steps(self):
-        """Screen 4: Show preparation steps"""
-        self.clear_window()
-        
-        # Title
-        title = tk.Label(self.root, 
-                        text=f"Steps to Make {self.chosen_pizza.replace('_', ' ').title()} pizza", 
-                        font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#666")
-        title.pack(pady=20)
-        
-        # Frame for steps
-        frame = tk.Frame(self.root, bg="white", relief=tk.RIDGE, bd=2)
-        frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
-        
-        # Get steps from Prolog
-        user_extras = self.expert.get_user_extras(self.user_base)
-        steps = self.expert.generate_steps(self.chosen_pizza, user_extras)
-        
-        # Display each step
-        for i, step in enumerate(steps, 1):
-            step_label = tk.Label(frame, text=f"{i}. {step}", 
-                                 font=("Arial", 11), bg="white", fg="#333",
-                                 wraplength=500, justify="left")
-            step_label.pack(anchor="w", padx=20, pady=8)
-        
-        # Navigation buttons
-        buttons_frame = tk.Frame(self.root, bg="#f0f0f0")
-        buttons_frame.pack(pady=20)
-        
-        # Back button
-        back_btn = tk.Button(buttons_frame, text="← Back", 
-                            command=lambda: self.show_pizza_selection(self.expert.find_makeable_pizzas(self.user_toppings)),
-                            font=("Arial", 12, "bold"), bg="#666", fg="white",
-                            padx=30, pady=10, cursor="hand2")
-        back_btn.pack(side=tk.LEFT, padx=10)
-        
-        # Restart button
-        restart_btn = tk.Button(buttons_frame, text="🔄 Start Over", 
-                               command=self.show_base_ingredients,
-                               font=("Arial", 12, "bold"), bg="#f44336", fg="white",
-                               padx=30, pady=10, cursor="hand2")
-        restart_btn.pack(side=tk.LEFT, padx=10)
+
+def compiled_kb_path(kb_file):
+    """Path of the SWI quick-load (.qlf) build of kb_file if it is up to date, else kb_file"""
+    qlf_file = os.path.splitext(kb_file)[0] + ".qlf"
+    try:
+        if os.path.getmtime(qlf_file) >= os.path.getmtime(kb_file):
+            return qlf_file
+    except OSError:
+        pass
+    return kb_file
+
+
+def _ordset(items):
+    """Sorted, duplicate-free list: the form the KB's ord_* predicates work on"""
+    return sorted(set(items))
+
+
+def create_expert_system(kb_file="pizza_expert.pl", backend="prolog"):
+    """Create an expert system using the given backend ("prolog", "native" or "compact")"""
+    if backend == "native":
+        from pizza_native import NativePizzaExpertSystem
+        return NativePizzaExpertSystem(kb_file)
+    if backend == "compact":
+        from pizza_native import CompactPizzaExpertSystem
+        return CompactPizzaExpertSystem(kb_file)
+    if backend == "prolog":
+        return PizzaExpertSystem(kb_file)
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def __getattr__(name):
+    # PizzaGUI lives in pizza_gui so that headless users never import tkinter
+    if name == "PizzaGUI":
+        from pizza_gui import PizzaGUI
+        return PizzaGUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main():
-    root = tk.Tk()
-    app = PizzaGUI(root)
-    root.mainloop()
+    from pizza_gui import main as gui_main
+    gui_main()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,599 @@
+import sys
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from gui_executor import GuiQueryExecutor
+from gui_widgets import VirtualList
+from pizza_expert import create_expert_system
+
+# How many pizzas the missing-toppings view lists
+CLOSEST_PIZZAS_SHOWN = 5
+
+# How many makeable pizzas the live status line names before "and N more"
+LIVE_PIZZAS_NAMED = 3
+
+
+def display_name(name):
+    """KB atom as shown to the user: fresh_mozzarella -> Fresh Mozzarella"""
+    return name.replace("_", " ").title() if isinstance(name, str) else str(name)
+
+
+class PizzaGUI:
+    def __init__(self, root, backend="prolog"):
+        self.root = root
+        self.root.title("🍕 Pizza Maker Expert System")
+        self.root.geometry("600x600")
+        self.root.configure(bg="#f0f0f0")
+
+        # Status bar, kept across screens: shows when a query is running
+        self.status_bar = tk.Label(self.root, text="", font=("Arial", 10),
+                                   bg="#f0f0f0", fg="#666", anchor="w")
+        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+
+        # Expert system queries run on a worker thread that owns the engine
+        self.executor = GuiQueryExecutor(
+            root, lambda: create_expert_system("pizza_expert.pl", backend),
+            on_busy=self.set_busy, on_load_error=self.load_failed)
+
+        # Screens are built once, on first use, then updated in place
+        self.screens = {}
+        self.current_screen = None
+
+        self.user_base = []
+        self.user_toppings = []
+        self.topping_session = None
+        self.chosen_pizza = None
+
+        # Start with welcome screen
+        self.show_welcome_screen()
+
+    def screen(self, name):
+        """Frame of the named screen, built by build_<name> the first time"""
+        frame = self.screens.get(name)
+        if frame is None:
+            frame = tk.Frame(self.root, bg="#f0f0f0")
+            getattr(self, f"build_{name}")(frame)
+            self.screens[name] = frame
+        return frame
+
+    def raise_screen(self, name):
+        """Switch to the named screen, dropping any query the old screen started"""
+        self.executor.cancel()
+        frame = self.screen(name)
+        if frame is not self.current_screen:
+            if self.current_screen is not None:
+                self.current_screen.pack_forget()
+            frame.pack(fill=tk.BOTH, expand=True)
+            self.current_screen = frame
+
+    def query(self, job, on_done):
+        """Run job(expert) in the background, then on_done(result); replaces any pending query"""
+        self.executor.submit(job, on_done, self.query_failed)
+
+    def set_busy(self, busy):
+        """Show whether a query is running"""
+        self.status_bar.config(text="⏳ Working..." if busy else "")
+        self.root.config(cursor="watch" if busy else "")
+
+    def query_failed(self, error):
+        messagebox.showerror("Error", f"Query failed:\n{error}")
+
+    def load_failed(self, error):
+        messagebox.showerror("Error", f"Failed to load knowledge base:\n{error}")
+        self.quit_application()
+
+    def content_frame(self, parent):
+        """The white panel holding a screen's main content"""
+        frame = tk.Frame(parent, bg="white", relief=tk.RIDGE, bd=2)
+        frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
+        return frame
+
+    def nav_button(self, parent, text, command, bg="#666", padx=30):
+        btn = tk.Button(parent, text=text, command=command,
+                        font=("Arial", 12, "bold"), bg=bg, fg="white",
+                        padx=padx, pady=10, cursor="hand2")
+        btn.pack(side=tk.LEFT, padx=10)
+        return btn
+
+    ##################################################################################
+    #        welcome screen
+    ##################################################################################
+
+    def build_welcome(self, screen):
+        # Title
+        title = tk.Label(screen, text="🍕 Pizza Maker Expert System",
+                        font=("Arial", 24, "bold"), bg="#f0f0f0", fg="#333")
+        title.pack(pady=50)
+
+        # Main choices frame
+        choices_frame = tk.Frame(screen, bg="#f0f0f0")
+        choices_frame.pack(pady=10)
+
+        # Option A: I already have ingredients
+        have_btn = tk.Button(choices_frame,
+                            text="start making pizza",
+                            command=self.show_base_ingredients,
+                            font=("Arial", 14, "bold"), bg="#4CAF50", fg="white",
+                            padx=40, pady=30, cursor="hand2", relief=tk.RAISED, bd=3,
+                            wraplength=300, justify="center")
+        have_btn.pack(pady=20)
+
+        # Option B: Show me ingredients
+        show_btn = tk.Button(choices_frame,
+                            text="show Me Ingredients",
+                            command=self.show_ingredients_info,
+                            font=("Arial", 14, "bold"), bg="#2196F3", fg="white",
+                            padx=40, pady=30, cursor="hand2", relief=tk.RAISED, bd=3,
+                            wraplength=300, justify="center")
+        show_btn.pack(pady=20)
+
+    def show_welcome_screen(self):
+        """Welcome screen with two main choices"""
+        self.raise_screen("welcome")
+
+    ##################################################################################
+    #         Pizza type selection for ingredients information
+    ##################################################################################
+
+    def build_ingredients_info(self, screen):
+        # Title
+        title = tk.Label(screen, text="Pizza Ingredients Information",
+                        font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#666")
+        title.pack(pady=(20, 5))
+
+        # Instruction
+        instruction = tk.Label(screen, text="Select a pizza type :",
+                              font=("Arial", 12), bg="#f0f0f0", fg="#666")
+        instruction.pack(pady=5)
+
+        # One button per pizza type, only for the rows in view
+        self.pizza_type_list = VirtualList(self.content_frame(screen), kind="button",
+                                           command=self.show_pizza_ingredients,
+                                           searchable=True, row_height=44)
+        self.pizza_type_list.pack(fill=tk.BOTH, expand=True)
+
+        # Navigation buttons
+        buttons_frame = tk.Frame(screen, bg="#f0f0f0")
+        buttons_frame.pack(pady=20)
+
+        # Back to welcome button
+        self.nav_button(buttons_frame, "← Back", self.show_welcome_screen, bg="#4CAF50", padx=20)
+
+    def show_ingredients_info(self):
+        """Show pizza type selection for ingredients information"""
+        self.query(lambda expert: expert.get_pizza_types(), self.render_ingredients_info)
+
+    def render_ingredients_info(self, pizza_types):
+        self.screen("ingredients_info")
+        self.pizza_type_list.set_items((p, f"{display_name(p)} Pizza") for p in pizza_types)
+        self.raise_screen("ingredients_info")
+
+    ##################################################################################
+    #        Show Ingredients Info
+    ##################################################################################
+
+    def build_pizza_ingredients(self, screen):
+        # Title
+        self.pizza_ingredients_title = tk.Label(screen, font=("Arial", 12, "bold"),
+                                                bg="#f0f0f0", fg="#333")
+        self.pizza_ingredients_title.pack(pady=20)
+
+        # Section headers and ingredients, one row each
+        self.pizza_ingredients_list = VirtualList(self.content_frame(screen), font=("Arial", 12),
+                                                  fg="#666")
+        self.pizza_ingredients_list.pack(fill=tk.BOTH, expand=True)
+
+        # Navigation buttons
+        buttons_frame = tk.Frame(screen, bg="#f0f0f0")
+        buttons_frame.pack(pady=20)
+
+        # Back button
+        self.nav_button(buttons_frame, "← Back", self.show_ingredients_info, bg="#4CAF50", padx=20)
+
+    def show_pizza_ingredients(self, pizza_type):
+        """Show all ingredients needed for selected pizza type"""
+        self.query(lambda expert: (expert.get_pizza_ingredients(pizza_type),
+                                   expert.get_essential_base_ingredients(),
+                                   expert.get_extra_base_ingredients()),
+                   lambda result: self.render_pizza_ingredients(pizza_type, *result))
+
+    def render_pizza_ingredients(self, pizza_type, all_ingredients, essential, extra):
+        self.screen("pizza_ingredients")
+        self.pizza_ingredients_title.config(text=f"Ingredients for {display_name(pizza_type)} Pizza")
+
+        rows = [(None, "Essentials:")]
+        rows += [(ing, f"◦ {display_name(ing)}") for ing in essential]
+        rows.append((None, "Extra:"))
+        rows += [(ing, f"◦ {display_name(ing)}") for ing in extra]
+
+        # Required Toppings Section
+        base = set(essential) | set(extra)
+        pizza_toppings = [ing for ing in all_ingredients if ing not in base]
+        if pizza_toppings:
+            rows.append((None, f"Toppings for {display_name(pizza_type)}:"))
+            rows += [(ing, f"◦ {display_name(ing)}") for ing in pizza_toppings]
+
+        self.pizza_ingredients_list.set_items(rows)
+        self.raise_screen("pizza_ingredients")
+
+    ##########
+    ##   2
+    ##########
+    ##################################################################################
+    #        Show Base Ingredients
+    ##################################################################################
+
+    def build_base_ingredients(self, screen):
+        subtitle = tk.Label(screen, text="STEP 1: Select Base Ingredients you have",
+                           font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#666")
+        subtitle.pack(pady=10)
+
+        # Checkboxes; the selection is kept when the user comes back
+        self.base_list = VirtualList(self.content_frame(screen), kind="check")
+        self.base_list.pack(fill=tk.BOTH, expand=True)
+
+        # Next button
+        next_btn = tk.Button(screen, text="Next →", command=self.analyze_base,
+                            font=("Arial", 12, "bold"), bg="#4CAF50", fg="white",
+                            padx=30, pady=10, cursor="hand2")
+        next_btn.pack(pady=20)
+
+    def show_base_ingredients(self):
+        """Screen 1: Select base ingredients"""
+        self.query(lambda expert: (expert.get_essential_base_ingredients(),
+                                   expert.get_extra_base_ingredients()),
+                   lambda result: self.render_base_ingredients(*result))
+
+    def render_base_ingredients(self, essential, extra):
+        self.screen("base_ingredients")
+        # Essential section, then extra section
+        self.base_list.set_items((ing, display_name(ing)) for ing in list(essential) + list(extra))
+        self.raise_screen("base_ingredients")
+
+    ##################################################################################
+    #        Analyze Base Ingredients
+    ##################################################################################
+
+    def analyze_base(self):
+        """Analyze base ingredients and show results"""
+        # Get selected ingredients, in list order
+        self.user_base = [ing for ing, _ in self.base_list.items if ing in self.base_list.selected]
+
+        if not self.user_base:
+            messagebox.showwarning("No Selection", "Please select at least one ingredient!")
+            return
+
+        # Check essentials
+        user_base = self.user_base
+        self.query(lambda expert: expert.check_essential_base(user_base), self.base_checked)
+
+    def base_checked(self, has_essential):
+        if not has_essential:
+            # Show missing ingredients view instead of popup
+            self.show_missing_ingredients_view()
+            return
+
+        # Show results
+        self.show_base_results()
+
+    ##################################################################################
+    #        Show Missing base Ingredients View
+    ##################################################################################
+
+    def build_missing_ingredients(self, screen):
+        frame = self.content_frame(screen)
+
+        # missing message
+        miss = tk.Label(frame, text="❌ Missing Essential Ingredients",
+                          font=("Arial", 12, "bold"), bg="white", fg="red")
+        miss.pack(pady=20)
+
+        info_label = tk.Label(frame, text="You are missing these essential ingredients:",
+                             font=("Arial", 12), bg="white", fg="#666")
+        info_label.pack(anchor="w", pady=(20, 10))
+
+        # List missing essential ingredients
+        self.missing_essential_list = VirtualList(frame, font=("Arial", 12), fg="red")
+        self.missing_essential_list.pack(fill=tk.BOTH, expand=True)
+
+        # Additional info about essentials
+        additional_info = tk.Label(frame, text="To make a pizza base, you need all essential ingredients.",
+                                  font=("Arial", 11), bg="white", fg="#666")
+        additional_info.pack(anchor="w", pady=(20, 10))
+
+        # Buttons frame
+        buttons_frame = tk.Frame(screen, bg="#f0f0f0")
+        buttons_frame.pack(pady=20)
+
+        self.nav_button(buttons_frame, "← Back", self.show_base_ingredients)
+        self.nav_button(buttons_frame, "❌ Quit", self.quit_application, bg="#f44336")
+
+    def show_missing_ingredients_view(self):
+        """Show view when user is missing essential base ingredients"""
+        user_base = self.user_base
+        self.query(lambda expert: expert.find_missing_essential(user_base),
+                   self.render_missing_ingredients_view)
+
+    def render_missing_ingredients_view(self, missing_essential):
+        self.screen("missing_ingredients")
+        self.missing_essential_list.set_items((ing, f"• {display_name(ing)}")
+                                              for ing in missing_essential)
+        self.raise_screen("missing_ingredients")
+
+    def quit_application(self):
+        """Quit the application"""
+        self.executor.close()
+        self.root.quit()
+        self.root.destroy()
+
+    ##################################################################################
+    #        Show base results if ok
+    ##################################################################################
+
+    def build_base_results(self, screen):
+        frame = self.content_frame(screen)
+
+        # Success message
+        success = tk.Label(frame, text="✅ A basic pizza base is fine",
+                          font=("Arial", 12, "bold"), bg="white", fg="green")
+        success.pack(pady=20)
+
+        self.missing_extra_warning = tk.Label(frame, text="⚠️ Missing Extra Ingredients:",
+                                              font=("Arial", 12, "bold"), bg="white", fg="orange")
+        self.missing_extra_list = VirtualList(frame, font=("Arial", 10), fg="#666")
+
+        # Buttons frame
+        buttons_frame = tk.Frame(screen, bg="#f0f0f0")
+        buttons_frame.pack(pady=20)
+
+        self.nav_button(buttons_frame, "← Back", self.show_base_ingredients)
+        self.nav_button(buttons_frame, "Next →", self.show_topping_ingredients, bg="#4CAF50")
+
+    def show_base_results(self):
+        """Show base analysis results"""
+        user_base = self.user_base
+        self.query(lambda expert: [(ing, expert.get_missing_extra_effect(ing))
+                                   for ing in expert.find_missing_extra(user_base)],
+                   self.render_base_results)
+
+    def render_base_results(self, missing_extra):
+        """missing_extra: (ingredient, effect) for each missing extra ingredient"""
+        self.screen("base_results")
+        if missing_extra:
+            self.missing_extra_warning.pack(anchor="w", padx=20, pady=(20, 10))
+            self.missing_extra_list.pack(fill=tk.BOTH, expand=True)
+        else:
+            self.missing_extra_warning.pack_forget()
+            self.missing_extra_list.pack_forget()
+        self.missing_extra_list.set_items((ing, f"• {display_name(ing)}: {effect}")
+                                          for ing, effect in missing_extra)
+        self.raise_screen("base_results")
+
+
+    ##################################################################################
+    #        Show Topping Ingredients Selection
+    ##################################################################################
+
+    def build_topping_ingredients(self, screen):
+        # Title
+        title = tk.Label(screen, text="STEP 2: Select Topping Ingredients you have",
+                        font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#333")
+        title.pack(pady=(20, 0))
+
+        # Checkboxes, only for the rows in view; each click updates the session
+        self.topping_list = VirtualList(self.content_frame(screen), kind="check",
+                                        on_toggle=self.toggle_topping, searchable=True)
+        self.topping_list.pack(fill=tk.BOTH, expand=True)
+
+        # Live feedback on what the current selection makes
+        self.live_status = tk.Label(screen, font=("Arial", 11), bg="#f0f0f0", fg="#666",
+                                    wraplength=500, justify="center")
+        self.live_status.pack()
+
+        # Analyze button
+        analyze_btn = tk.Button(screen, text="Next →",
+                               command=self.analyze_toppings,
+                               font=("Arial", 12, "bold"), bg="#4CAF50", fg="white",
+                               padx=30, pady=10, cursor="hand2")
+        analyze_btn.pack(pady=20)
+
+    def show_topping_ingredients(self):
+        """Screen 2: Select topping ingredients"""
+        selected = list(self.topping_list.selected) if "topping_ingredients" in self.screens else []
+        self.query(lambda expert: (expert.get_topping_ingredients(), expert.pantry_session(selected)),
+                   lambda result: self.render_topping_ingredients(*result))
+
+    def render_topping_ingredients(self, toppings, session):
+        self.screen("topping_ingredients")
+        # The session starts from the toppings still checked and is plain
+        # Python, so it is used directly on this thread
+        self.topping_session = session
+        self.topping_list.set_items((ing, display_name(ing)) for ing in toppings)
+        self.update_live_status()
+        self.raise_screen("topping_ingredients")
+
+    def toggle_topping(self, ing, checked):
+        """Apply one checkbox change to the topping session"""
+        if checked:
+            self.topping_session.add_ingredient(ing)
+        else:
+            self.topping_session.remove_ingredient(ing)
+        self.update_live_status()
+
+    def update_live_status(self):
+        """Show the pizzas the current selection makes, or the closest one"""
+        if not self.topping_session.pantry:
+            text, color = "Select toppings to see which pizzas you can make", "#666"
+        else:
+            makeable = self.topping_session.find_makeable()
+            if makeable:
+                names = [display_name(p) for p in makeable[:LIVE_PIZZAS_NAMED]]
+                more = len(makeable) - len(names)
+                text = "✅ You can make: " + ", ".join(names) + (f" and {more} more" if more else "")
+                color = "green"
+            else:
+                closest = self.topping_session.closest(1)
+                if closest:
+                    pizza, missing = closest[0]
+                    text = (f"Closest: {display_name(pizza)} "
+                            f"(missing {len(missing)} topping{'s' if len(missing) != 1 else ''})")
+                else:
+                    text = "No pizza definitions found in knowledge base."
+                color = "#666"
+        self.live_status.config(text=text, fg=color)
+
+    def analyze_toppings(self):
+        """Analyze toppings and show makeable pizzas"""
+        # Get selected toppings, in list order
+        self.user_toppings = [ing for ing, _ in self.topping_list.items
+                              if ing in self.topping_list.selected]
+
+        if not self.user_toppings:
+            messagebox.showwarning("No Selection", "Please select at least one topping!")
+            return
+
+        # Makeable pizzas are already current in the session
+        makeable_pizzas = self.topping_session.find_makeable()
+
+        if not makeable_pizzas:
+            # Navigate to missing toppings view instead of popup
+            self.show_missing_toppings_view()
+            return
+
+        self.show_pizza_selection(makeable_pizzas)
+
+    ##################################################################################
+    #        If toppings missing view
+    ##################################################################################
+
+    def build_missing_toppings(self, screen):
+        frame = self.content_frame(screen)
+
+        title = tk.Label(frame, text="❌ You can't make any pizza with selected toppings",
+                         font=("Arial", 12, "bold"), bg="white", fg="red")
+        title.pack(pady=10)
+
+        self.closest_info = tk.Label(frame, font=("Arial", 12), bg="white", fg="#666")
+        self.closest_info.pack(anchor="w", padx=20, pady=(10, 5))
+
+        # Pizza names as headers, each followed by its missing toppings
+        self.closest_list = VirtualList(frame, font=("Arial", 11), fg="#666")
+        self.closest_list.pack(fill=tk.BOTH, expand=True)
+
+        # Buttons frame
+        buttons_frame = tk.Frame(screen, bg="#f0f0f0")
+        buttons_frame.pack(pady=20)
+
+        self.nav_button(buttons_frame, "← Back", self.show_topping_ingredients)
+        self.nav_button(buttons_frame, "📋 See Ingredients", self.show_ingredients_info,
+                        bg="#2196F3", padx=20)
+        self.nav_button(buttons_frame, "❌ Quit", self.quit_application, bg="#f44336")
+
+    def show_missing_toppings_view(self):
+        """Show view when user is missing required toppings"""
+        self.screen("missing_toppings")
+
+        # Only the pizzas closest to makeable are listed
+        missing_by_pizza = self.topping_session.closest(CLOSEST_PIZZAS_SHOWN)
+
+        if missing_by_pizza:
+            self.closest_info.config(text="Closest pizzas and their missing toppings:")
+        else:
+            # Fallback message
+            self.closest_info.config(text="No pizza definitions found in knowledge base.")
+        rows = []
+        for pizza, missing_list in missing_by_pizza:
+            rows.append((None, f"• {display_name(pizza)}"))
+            rows += [(ing, f"- {display_name(ing)}") for ing in missing_list]
+        self.closest_list.set_items(rows)
+        self.raise_screen("missing_toppings")
+
+    ##################################################################################
+    #        Show pizza topping selection
+    ##################################################################################
+
+    def build_pizza_selection(self, screen):
+        # Title
+        title = tk.Label(screen, text="STEP 3: Select Pizza Type you want",
+                        font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#666")
+        title.pack(pady=(20, 5))
+
+        self.pizza_selection_count = tk.Label(screen, font=("Arial", 12), bg="#f0f0f0", fg="green")
+        self.pizza_selection_count.pack(pady=5)
+
+        # One button per makeable pizza, only for the rows in view
+        self.makeable_list = VirtualList(self.content_frame(screen), kind="button",
+                                         command=self.select_pizza, searchable=True,
+                                         row_height=48)
+        self.makeable_list.pack(fill=tk.BOTH, expand=True)
+
+        # Navigation buttons
+        buttons_frame = tk.Frame(screen, bg="#f0f0f0")
+        buttons_frame.pack(pady=20)
+
+        self.nav_button(buttons_frame, "← Back", self.show_topping_ingredients)
+
+    def show_pizza_selection(self, makeable_pizzas):
+        """Screen 3: Choose pizza type"""
+        self.screen("pizza_selection")
+        self.pizza_selection_count.config(
+            text=f"✅ You can make {len(makeable_pizzas)} pizza type(s):")
+        self.makeable_list.set_items((p, display_name(p) + " Pizza") for p in makeable_pizzas)
+        self.raise_screen("pizza_selection")
+
+    def select_pizza(self, pizza_type):
+        """Select pizza and show steps"""
+        self.chosen_pizza = pizza_type
+        self.show_steps()
+
+    ##################################################################################
+    #        Show pizza preparation steps
+    ##################################################################################
+
+    def build_steps(self, screen):
+        # Title
+        self.steps_title = tk.Label(screen, font=("Arial", 12, "bold"), bg="#f0f0f0", fg="#666")
+        self.steps_title.pack(pady=20)
+
+        self.steps_list = VirtualList(self.content_frame(screen), row_height=36)
+        self.steps_list.pack(fill=tk.BOTH, expand=True)
+
+        # Navigation buttons
+        buttons_frame = tk.Frame(screen, bg="#f0f0f0")
+        buttons_frame.pack(pady=20)
+
+        self.nav_button(buttons_frame, "← Back",
+                        lambda: self.show_pizza_selection(self.topping_session.find_makeable()))
+        self.nav_button(buttons_frame, "🔄 Start Over", self.start_over, bg="#f44336")
+
+    def show_steps(self):
+        """Screen 4: Show preparation steps"""
+        pizza, user_base = self.chosen_pizza, self.user_base
+        # Precomputed plan for this pizza and the user's extras
+        self.query(lambda expert: expert.get_steps_for(pizza, user_base), self.render_steps)
+
+    def render_steps(self, steps):
+        self.screen("steps")
+        self.steps_title.config(text=f"Steps to Make {display_name(self.chosen_pizza)} pizza")
+        self.steps_list.set_items((i, f"{i}. {step}") for i, step in enumerate(steps, 1))
+        self.raise_screen("steps")
+
+    def start_over(self):
+        """Clear every selection and go back to the first step"""
+        for name, selection in (("base_ingredients", "base_list"),
+                                ("topping_ingredients", "topping_list")):
+            if name in self.screens:
+                getattr(self, selection).clear_selection()
+        self.user_base, self.user_toppings = [], []
+        self.show_base_ingredients()
+
+
+def main():
+    backend = "native" if "--native" in sys.argv[1:] else "prolog"
+    root = tk.Tk()
+    app = PizzaGUI(root, backend)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Bitset index over pizza recipes.
+
+Every ingredient is interned to an ID, which is also its bit position, and
+every recipe's requirements are stored as an integer bitmask, together
+with an inverted index from ingredient ID to the recipes that use it.  A
+recipe can be made when ``mask & ~pantry_mask == 0``.
+
+Methods ending in ``_ids`` take and return IDs instead of names (see
+pizza_registry): ingredient IDs in, recipe positions or name IDs out.
+"""
+
+import heapq
+from array import array
+
+from pizza_registry import NameRegistry, Recipe
+
+
+class RecipeIndex:
+    """Bitmask and inverted index over (name, required ingredients) recipes"""
+
+    def __init__(self, recipes=(), ingredients=()):
+        """ingredients are interned before the recipes', so they get the lowest IDs"""
+        self.ingredient_ids = NameRegistry(ingredients)        # ingredient <-> ID (= bit)
+        self.recipe_ids = NameRegistry(typecode="I")           # pizza name <-> name ID
+        self.recipes = []         # recipe position -> Recipe
+        self.names = []           # recipe position -> pizza name
+        self.masks = []           # recipe position -> requirement bitmask
+        self.listed = {}          # recipe position -> ingredient IDs in recipe order,
+                                  # for recipes not listed sorted and duplicate-free
+        self.by_ingredient = {}   # ingredient ID -> [recipe positions], ascending
+        self.unconditional = []   # recipes with no requirements at all
+        self._sizes = None        # recipe position -> requirement count
+        self._by_size = None      # recipe positions sorted by requirement count
+        for name, required in recipes:
+            self.add_recipe(name, required)
+
+    @property
+    def bits(self):
+        """ingredient -> bit position"""
+        return self.ingredient_ids.ids
+
+    @property
+    def ingredients(self):
+        """bit position -> ingredient"""
+        return self.ingredient_ids.names
+
+    def intern(self, ingredient):
+        """Return the bit position of an ingredient, assigning one if needed"""
+        return self.ingredient_ids.intern(ingredient)
+
+    def add_recipe(self, name, required):
+        """Append a recipe to the index and return its position"""
+        position = len(self.recipes)
+        required = list(required)
+        requires = self.ingredient_ids.intern_all(sorted(set(required)))
+        listed = self.ingredient_ids.intern_all(required)
+        if listed != requires:
+            self.listed[position] = listed
+        mask = 0
+        for bit in requires:
+            mask |= 1 << bit
+            self.by_ingredient.setdefault(bit, []).append(position)
+        name_id = self.recipe_ids.intern(name)
+        self.recipes.append(Recipe(name_id, requires))
+        self.names.append(self.recipe_ids.names[name_id])
+        self.masks.append(mask)
+        if not mask:
+            self.unconditional.append(position)
+        self._by_size = None
+        return position
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def pantry_mask(self, pantry):
+        """Bitmask of the pantry ingredients known to the index"""
+        mask = 0
+        bits = self.ingredient_ids.ids
+        for ingredient in pantry:
+            bit = bits.get(ingredient)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def pantry_ids(self, pantry):
+        """IDs of the pantry ingredients known to the index"""
+        bits = self.ingredient_ids.ids
+        return [bits[ing] for ing in pantry if ing in bits]
+
+    def mask_ingredients(self, mask):
+        """Ingredients whose bits are set in mask, in bit order"""
+        return [self.ingredients[bit] for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+    def candidates(self, pantry):
+        """Positions of recipes touched by the pantry, plus unconditional ones, ascending"""
+        return self.candidates_ids(self.pantry_ids(pantry))
+
+    def makeable(self, pantry):
+        """Positions of the recipes whose requirements are all in the pantry"""
+        return self.makeable_ids(self.pantry_ids(pantry))
+
+    def find_makeable(self, pantry):
+        """Names of makeable recipes, in catalog order"""
+        names = self.names
+        return [names[pos] for pos in self.makeable(pantry)]
+
+    def listed_ids(self, position):
+        """IDs of one recipe's required ingredients as the recipe lists them"""
+        listed = self.listed.get(position)
+        return self.recipes[position].requires if listed is None else listed
+
+    def missing(self, position, pantry_set):
+        """Required ingredients of one recipe that are not in the pantry, in recipe order"""
+        names = self.ingredient_ids.names
+        return [names[bit] for bit in self.listed_ids(position) if names[bit] not in pantry_set]
+
+    def iter_makeable(self, pantry):
+        """Yield the names of makeable recipes in catalog order, one mask test each"""
+        have = self.pantry_mask(pantry)
+        for name, mask in zip(self.names, self.masks):
+            if not mask & ~have:
+                yield name
+
+    def iter_missing_by_recipe(self, pantry):
+        """Yield (name, missing ingredients) for each recipe that cannot be made"""
+        pantry_set = set(pantry)
+        have = self.pantry_mask(pantry_set)
+        for position, mask in enumerate(self.masks):
+            if mask & ~have:
+                yield self.names[position], self.missing(position, pantry_set)
+
+    def missing_by_recipe(self, pantry):
+        """(name, missing ingredients) for every recipe that cannot be made"""
+        return list(self.iter_missing_by_recipe(pantry))
+
+    def closest(self, pantry, k, max_missing=None):
+        """The k non-makeable recipes missing the fewest ingredients, as (name, missing).
+
+        Ties are broken by catalog position.
+        """
+        pantry_set = set(pantry)
+        return [(self.names[position], self.missing(position, pantry_set))
+                for position in self.closest_ids(self.pantry_ids(pantry_set), k, max_missing)]
+
+    ##################################################################################
+    #        ID-based queries
+    ##################################################################################
+
+    def ids_mask(self, ingredient_ids):
+        """Bitmask of a sequence of ingredient IDs"""
+        mask = 0
+        for bit in ingredient_ids:
+            mask |= 1 << bit
+        return mask
+
+    def candidates_ids(self, ingredient_ids):
+        """Positions of recipes using any of the ingredients, plus unconditional ones, ascending"""
+        touched = set(self.unconditional)
+        by_ingredient = self.by_ingredient
+        for bit in set(ingredient_ids):
+            touched.update(by_ingredient.get(bit, ()))
+        return sorted(touched)
+
+    def makeable_ids(self, ingredient_ids):
+        """Positions of the recipes whose requirements are all among the ingredient IDs"""
+        have = self.ids_mask(ingredient_ids)
+        masks = self.masks
+        return [pos for pos in self.candidates_ids(ingredient_ids) if not masks[pos] & ~have]
+
+    def missing_ids(self, position, have):
+        """IDs of one recipe's required ingredients whose bits are not set in have"""
+        return array("H", [bit for bit in self.listed_ids(position) if not have >> bit & 1])
+
+    def closest_ids(self, ingredient_ids, k, max_missing=None):
+        """Positions of the k non-makeable recipes missing the fewest ingredients.
+
+        Ties are broken by catalog position.  The recipes that share an
+        ingredient with the pantry are found through the inverted index and
+        their overlaps counted; every other recipe misses all it requires,
+        so those are visited in order of requirement count and the scan
+        stops as soon as one ranks below the worst recipe kept in the
+        size-k heap (or needs more than max_missing).
+        """
+        if k <= 0:
+            return []
+        if self._by_size is None:
+            self._sizes = [mask.bit_count() for mask in self.masks]
+            self._by_size = sorted(range(len(self.masks)), key=lambda pos: (self._sizes[pos], pos))
+        sizes = self._sizes
+        limit = max_missing if max_missing is not None else float("inf")
+
+        overlaps = {}   # recipe position -> pantry ingredients it requires
+        by_ingredient = self.by_ingredient
+        for bit in set(ingredient_ids):
+            for position in by_ingredient.get(bit, ()):
+                overlaps[position] = overlaps.get(position, 0) + 1
+
+        heap = []   # max-heap on (missing count, position) via negation
+
+        def offer(missing, position):
+            if missing == 0 or missing > limit:
+                return
+            entry = (-missing, -position)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        for position, shared in overlaps.items():
+            offer(sizes[position] - shared, position)
+        for position in self._by_size:
+            size = sizes[position]
+            if size > limit or (len(heap) == k and (-size, -position) < heap[0]):
+                break
+            if position not in overlaps:
+                offer(size, position)
+
+        return [position for _, position in sorted((-missing, -position)
+                                                   for missing, position in heap)]
+
+
+class PantrySession:
+    """A pantry that is edited one ingredient at a time over a RecipeIndex.
+
+    For every recipe the session keeps the number of required ingredients
+    still missing, and groups recipes by that count.  Adding or removing an
+    ingredient only touches the recipes that use it (via the inverted
+    index), so the makeable set (count 0) and the closest recipes (lowest
+    non-zero counts) are always current.  The index must not gain recipes
+    while sessions over it are in use.
+    """
+
+    def __init__(self, index, pantry=()):
+        self.index = index
+        self.pantry = set()
+        self.missing_counts = [mask.bit_count() for mask in index.masks]
+        self._by_missing = {}   # missing count -> set of recipe positions
+        for position, count in enumerate(self.missing_counts):
+            self._by_missing.setdefault(count, set()).add(position)
+        for ingredient in pantry:
+            self.add_ingredient(ingredient)
+
+    def _shift(self, ingredient, delta):
+        counts = self.missing_counts
+        by_missing = self._by_missing
+        bit = self.index.ingredient_ids.get(ingredient)
+        for position in self.index.by_ingredient.get(bit, ()):
+            count = counts[position]
+            bucket = by_missing[count]
+            bucket.discard(position)
+            if not bucket:
+                del by_missing[count]
+            count += delta
+            counts[position] = count
+            by_missing.setdefault(count, set()).add(position)
+
+    def add_ingredient(self, ingredient):
+        """Add an ingredient to the pantry; False if it was already there"""
+        if ingredient in self.pantry:
+            return False
+        self.pantry.add(ingredient)
+        self._shift(ingredient, -1)
+        return True
+
+    def remove_ingredient(self, ingredient):
+        """Remove an ingredient from the pantry; False if it was not there"""
+        if ingredient not in self.pantry:
+            return False
+        self.pantry.discard(ingredient)
+        self._shift(ingredient, 1)
+        return True
+
+    def makeable(self):
+        """Positions of the recipes that can be made, ascending"""
+        return sorted(self._by_missing.get(0, ()))
+
+    def find_makeable(self):
+        """Names of makeable recipes, in catalog order"""
+        names = self.index.names
+        return [names[pos] for pos in self.makeable()]
+
+    def closest(self, k, max_missing=None):
+        """The k non-makeable recipes missing the fewest ingredients, as (name, missing).
+
+        Same result as ``RecipeIndex.closest`` for the current pantry.
+        """
+        result = []
+        if k <= 0:
+            return result
+        for count in sorted(self._by_missing):
+            if count == 0:
+                continue
+            if max_missing is not None and count > max_missing:
+                break
+            for position in heapq.nsmallest(k - len(result), self._by_missing[count]):
+                result.append((self.index.names[position],
+                               self.index.missing(position, self.pantry)))
+                if len(result) == k:
+                    return result
+        return result
@@ -0,0 +1,475 @@
+"""Pure-Python backend for the pizza expert system.
+
+Reads the facts of ``pizza_expert.pl`` once and answers the same questions
+as ``PizzaExpertSystem`` from plain Python tables, without going through
+pyswip/SWI-Prolog.
+"""
+
+import os
+import pickle
+from array import array
+
+from pizza_index import PantrySession, RecipeIndex
+from prolog_reader import read_prolog_facts
+from shopping_list import cheapest_cover
+
+
+# Step plans are precomputed for every subset of up to this many extras
+MAX_PLAN_EXTRAS = 8
+
+
+class PizzaKnowledgeBase:
+    """Fact tables of the pizza knowledge base, kept in Prolog clause order"""
+
+    def __init__(self, facts):
+        self.essential_base = [a[0] for a in facts.get(("essential_base", 1), [])]
+        self.extra_base = [a[0] for a in facts.get(("extra_base", 1), [])]
+        self.topping_ingredients = [a[0] for a in facts.get(("topping_ingredient", 1), [])]
+
+        # A list of pairs rather than a dict: the KB may repeat a pizza name
+        self.pizza_toppings = [(pizza, tuple(toppings))
+                               for pizza, toppings in facts.get(("pizza_toppings", 2), [])]
+
+        # (pizza, topping) -> amount one pizza uses; toppings not listed use 1
+        self.topping_quantities = {}
+        for pizza, ingredient, amount in facts.get(("topping_quantity", 3), []):
+            self.topping_quantities.setdefault((pizza, ingredient), amount)
+
+        self.missing_extra_effect = {}
+        for ingredient, effect in facts.get(("missing_extra_effect", 2), []):
+            self.missing_extra_effect.setdefault(ingredient, effect)
+
+        self.base_steps = [step for _, step in facts.get(("base_step", 2), [])]
+
+        self.extra_steps = {}
+        for ingredient, step in facts.get(("extra_step", 2), []):
+            self.extra_steps.setdefault(ingredient, []).append(step)
+
+        self.topping_steps = {}
+        for pizza, _, step in facts.get(("topping_step", 3), []):
+            self.topping_steps.setdefault(pizza, []).append(step)
+
+    @classmethod
+    def from_file(cls, kb_file):
+        """Parse a Prolog KB file into fact tables"""
+        return cls(read_prolog_facts(kb_file))
+
+    def build_index(self):
+        """RecipeIndex over the recipes, with every KB ingredient interned first (in KB order)"""
+        return RecipeIndex(self.pizza_toppings,
+                           self.essential_base + self.extra_base + self.topping_ingredients)
+
+
+# --- Compiled snapshots ---
+# A snapshot is a pickle of the parsed tables and recipe index stored next to
+# the KB as <kb>.kbsnap. It records the size and mtime of the source it was
+# built from and is ignored (the source is parsed instead) once they differ.
+
+SNAPSHOT_VERSION = 6
+
+
+def snapshot_path(kb_file):
+    """Default snapshot location for a KB file"""
+    return os.path.splitext(kb_file)[0] + ".kbsnap"
+
+
+def _source_fingerprint(kb_file):
+    stat = os.stat(kb_file)
+    return (SNAPSHOT_VERSION, stat.st_size, stat.st_mtime_ns)
+
+
+def compile_kb(kb_file):
+    """Parse a KB file into (PizzaKnowledgeBase, RecipeIndex)"""
+    kb = PizzaKnowledgeBase.from_file(kb_file)
+    return kb, kb.build_index()
+
+
+def write_snapshot(kb_file, path=None):
+    """Compile kb_file and save it as a snapshot; returns the snapshot path"""
+    path = path or snapshot_path(kb_file)
+    fingerprint = _source_fingerprint(kb_file)
+    kb, index = compile_kb(kb_file)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"fingerprint": fingerprint, "kb": kb, "index": index}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot(kb_file, path=None):
+    """Return (kb, index) from a snapshot, or None if it is missing or stale"""
+    path = path or snapshot_path(kb_file)
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if data.get("fingerprint") != _source_fingerprint(kb_file):
+        return None
+    return data["kb"], data["index"]
+
+
+def load_kb(kb_file, use_snapshot=True):
+    """Load (kb, index) from a fresh snapshot when there is one, else from source"""
+    if use_snapshot:
+        compiled = read_snapshot(kb_file)
+        if compiled is not None:
+            return compiled
+    return compile_kb(kb_file)
+
+
+class NativePizzaExpertSystem:
+    """Drop-in replacement for PizzaExpertSystem that never calls into Prolog"""
+
+    def __init__(self, kb_file="pizza_expert.pl", use_snapshot=True):
+        """Read the knowledge base (from its snapshot when fresh) into Python tables"""
+        self.kb, self.index = load_kb(kb_file, use_snapshot)
+        # Base ingredient sets, sorted like the KB's ordsets
+        self._essential_set = sorted(set(self.kb.essential_base))
+        self._extra_set = sorted(set(self.kb.extra_base))
+        self._planner = None
+        self._build_step_plans()
+
+    def _build_step_plans(self):
+        """Materialize the steps of every pizza for every subset of extras.
+
+        Plans are keyed by (pizza, extras bitmask) over _extra_set, so
+        get_steps_for is a dict lookup; with more than MAX_PLAN_EXTRAS extras
+        nothing is stored and steps are generated on demand.
+        """
+        self._extra_bits = {ing: 1 << i for i, ing in enumerate(self._extra_set)}
+        self._step_plans = {}
+        if len(self._extra_set) > MAX_PLAN_EXTRAS:
+            return
+        kb = self.kb
+        extra_steps = [kb.extra_steps.get(ing, []) for ing in self._extra_set]
+        for pizza in {pizza for pizza, _ in kb.pizza_toppings}:
+            topping_steps = kb.topping_steps.get(pizza, [])
+            for mask in range(1 << len(self._extra_set)):
+                steps = list(kb.base_steps)
+                for i, steps_for_extra in enumerate(extra_steps):
+                    if mask >> i & 1:
+                        steps.extend(steps_for_extra)
+                steps.extend(topping_steps)
+                self._step_plans[pizza, mask] = tuple(steps)
+
+    def clear_catalog(self):
+        """Remove every recipe, topping step and missing-extra effect from the tables"""
+        self.kb.topping_ingredients = []
+        self.kb.pizza_toppings = []
+        self.kb.topping_quantities = {}
+        self.kb.topping_steps = {}
+        self.kb.missing_extra_effect = {}
+        self.rebuild_index()
+
+    def add_catalog_records(self, records):
+        """Append a chunk of catalog_loader records; call rebuild_index() after the last one"""
+        kb = self.kb
+        known = set(kb.topping_ingredients)
+        for record in records:
+            if record[0] == "recipe":
+                _, pizza, toppings, steps, quantities = record
+                kb.pizza_toppings.append((pizza, tuple(toppings)))
+                for ing, amount in quantities.items():
+                    kb.topping_quantities.setdefault((pizza, ing), amount)
+                for ing in toppings:
+                    if ing not in known:
+                        known.add(ing)
+                        kb.topping_ingredients.append(ing)
+                if steps:
+                    kb.topping_steps.setdefault(pizza, []).extend(steps)
+            else:
+                _, extra, effect = record
+                kb.missing_extra_effect.setdefault(extra, effect)
+
+    def rebuild_index(self):
+        """Rebuild the recipe index and step plans after the catalog tables changed"""
+        self.index = self.kb.build_index()
+        self._planner = None
+        self._build_step_plans()
+
+    def get_essential_base_ingredients(self):
+        """Get list of essential base ingredients"""
+        return list(self.kb.essential_base)
+
+    def get_extra_base_ingredients(self):
+        """Get list of extra base ingredients"""
+        return list(self.kb.extra_base)
+
+    def get_topping_ingredients(self):
+        """Get list of all topping ingredients"""
+        return list(self.kb.topping_ingredients)
+
+    def check_essential_base(self, user_base):
+        """Check if user has all essential base ingredients"""
+        owned = set(user_base)
+        return all(ing in owned for ing in self._essential_set)
+
+    def find_missing_extra(self, user_base):
+        """Find missing extra base ingredients, in KB order"""
+        owned = set(user_base)
+        return [ing for ing in self.kb.extra_base if ing not in owned]
+
+    def find_missing_essential(self, user_base):
+        """Find missing essential base ingredients, in KB order"""
+        owned = set(user_base)
+        return [ing for ing in self.kb.essential_base if ing not in owned]
+
+    def get_missing_extra_effect(self, ingredient):
+        """Get effect message for missing extra ingredient"""
+        return self.kb.missing_extra_effect.get(ingredient)
+
+    def find_makeable_pizzas(self, user_toppings):
+        """Find all pizzas that can be made with given toppings"""
+        return self.index.find_makeable(user_toppings)
+
+    def missing_toppings_by_pizza(self, user_toppings):
+        """List (pizza, missing toppings) for every pizza that cannot be made"""
+        return self.index.missing_by_recipe(user_toppings)
+
+    def closest_pizzas(self, user_toppings, k, max_missing=None):
+        """The k pizzas missing the fewest toppings (at most max_missing), as (pizza, missing)"""
+        return self.index.closest(user_toppings, k, max_missing)
+
+    def shopping_list(self, user_toppings, k, costs=None, pizzas=None, time_budget=None):
+        """Cheapest ingredients to buy so at least k pizzas can be made (see shopping_list.cheapest_cover)"""
+        return cheapest_cover(self.index, user_toppings, k, costs, pizzas, time_budget)
+
+    def pantry_session(self, user_toppings=()):
+        """PantrySession that keeps makeable/closest pizzas current as toppings are toggled"""
+        return PantrySession(self.index, user_toppings)
+
+    def production_planner(self):
+        """ProductionPlanner over the recipes and topping quantities, built on first use"""
+        if self._planner is None:
+            from production_planner import ProductionPlanner
+            self._planner = ProductionPlanner(self.index, self.kb.topping_quantities)
+        return self._planner
+
+    def plan_production(self, stock, order):
+        """How much of an order mix (pizza -> count) the stock (topping -> amount) covers"""
+        return self.production_planner().plan(stock, order)
+
+    def find_makeable_pizzas_batch(self, pantries):
+        """Find makeable pizzas for each pantry in a list"""
+        return [self.index.find_makeable(pantry) for pantry in pantries]
+
+    def missing_toppings_by_pizza_batch(self, pantries):
+        """Get missing toppings by pizza for each pantry in a list"""
+        return [self.index.missing_by_recipe(pantry) for pantry in pantries]
+
+    def get_user_extras(self, user_base):
+        """Get which extra ingredients user has, in the user's order"""
+        return [ing for ing in user_base if ing in self._extra_bits]
+
+    def generate_steps(self, pizza_type, user_extras):
+        """Generate complete step list for chosen pizza"""
+        steps = list(self.kb.base_steps)
+        for extra in user_extras:
+            steps.extend(self.kb.extra_steps.get(extra, []))
+        steps.extend(self.kb.topping_steps.get(pizza_type, []))
+        return steps
+
+    def get_steps_for(self, pizza_type, user_base):
+        """Steps for a pizza given the user's base ingredients, from the precomputed plans"""
+        bits = self._extra_bits
+        mask = 0
+        for ing in user_base:
+            mask |= bits.get(ing, 0)
+        plan = self._step_plans.get((pizza_type, mask))
+        if plan is None:
+            extras = [ing for ing in self._extra_set if mask & bits[ing]]
+            plan = tuple(self.generate_steps(pizza_type, extras))
+        return plan
+
+    def get_pizza_types(self):
+        """Get list of available pizza types"""
+        return [pizza for pizza, _ in self.kb.pizza_toppings]
+
+    def iter_makeable_pizzas(self, user_toppings):
+        """Yield the pizzas that can be made with given toppings, one at a time"""
+        return self.index.iter_makeable(user_toppings)
+
+    def iter_missing_toppings(self, user_toppings):
+        """Yield (pizza, missing toppings) for each pizza that cannot be made"""
+        return self.index.iter_missing_by_recipe(user_toppings)
+
+    def iter_pizza_types(self):
+        """Yield the available pizza types, one at a time"""
+        return (pizza for pizza, _ in self.kb.pizza_toppings)
+
+    def get_pizza_ingredients(self, pizza_type):
+        """Get all ingredients needed for a specific pizza type"""
+        for pizza, required in self.kb.pizza_toppings:
+            if pizza == pizza_type:
+                return self.kb.essential_base + self.kb.extra_base + list(required)
+        return []
+
+
+class CompactPizzaExpertSystem(NativePizzaExpertSystem):
+    """NativePizzaExpertSystem in compact mode: every method takes and returns IDs.
+
+    Ingredients are IDs from ``index.ingredient_ids`` and pizzas are name IDs
+    from ``index.recipe_ids``; ID lists come back as arrays.  Step and effect
+    texts are returned as the KB's own str objects.  Convert names at the
+    edges with ingredient_id/ingredient_name and pizza_id/pizza_name (pantry
+    sessions, production planning and catalog loading still take names).
+    """
+
+    def __init__(self, kb_file="pizza_expert.pl", use_snapshot=True):
+        super().__init__(kb_file, use_snapshot)
+        self._compact_tables()
+
+    def _compact_tables(self):
+        ingredient_ids = self.index.ingredient_ids
+        self._essential_ids = ingredient_ids.intern_all(self.kb.essential_base)
+        self._extra_ids = ingredient_ids.intern_all(self.kb.extra_base)
+        self._topping_ids = ingredient_ids.intern_all(self.kb.topping_ingredients)
+        self._essential_id_set = frozenset(self._essential_ids)
+        self._extra_names = {ingredient_ids.get(ing): ing for ing in self.kb.extra_base}
+        self._first_position = {}
+        for position, recipe in enumerate(self.index.recipes):
+            self._first_position.setdefault(recipe.name, position)
+
+    def rebuild_index(self):
+        super().rebuild_index()
+        self._compact_tables()
+
+    def clear_catalog(self):
+        super().clear_catalog()
+        self._compact_tables()
+
+    def ingredient_id(self, name):
+        """ID of an ingredient name, or None if the KB does not know it"""
+        return self.index.ingredient_ids.get(name)
+
+    def ingredient_name(self, ingredient_id):
+        return self.index.ingredient_ids.names[ingredient_id]
+
+    def pizza_id(self, name):
+        """ID of a pizza name, or None if there is no such pizza"""
+        return self.index.recipe_ids.get(name)
+
+    def pizza_name(self, pizza_id):
+        return self.index.recipe_ids.names[pizza_id]
+
+    def _pizza_ids(self, positions):
+        recipes = self.index.recipes
+        return array("I", [recipes[pos].name for pos in positions])
+
+    def get_essential_base_ingredients(self):
+        """Get IDs of essential base ingredients"""
+        return array("H", self._essential_ids)
+
+    def get_extra_base_ingredients(self):
+        """Get IDs of extra base ingredients"""
+        return array("H", self._extra_ids)
+
+    def get_topping_ingredients(self):
+        """Get IDs of all topping ingredients"""
+        return array("H", self._topping_ids)
+
+    def check_essential_base(self, user_base):
+        """Check if user has all essential base ingredients"""
+        owned = set(user_base)
+        return all(ing in owned for ing in self._essential_id_set)
+
+    def find_missing_extra(self, user_base):
+        """Find IDs of missing extra base ingredients, in KB order"""
+        owned = set(user_base)
+        return array("H", [ing for ing in self._extra_ids if ing not in owned])
+
+    def find_missing_essential(self, user_base):
+        """Find IDs of missing essential base ingredients, in KB order"""
+        owned = set(user_base)
+        return array("H", [ing for ing in self._essential_ids if ing not in owned])
+
+    def get_missing_extra_effect(self, ingredient):
+        """Get effect message for a missing extra ingredient ID"""
+        return self.kb.missing_extra_effect.get(self.ingredient_name(ingredient))
+
+    def find_makeable_pizzas(self, user_toppings):
+        """Find IDs of all pizzas that can be made with given topping IDs"""
+        return self._pizza_ids(self.index.makeable_ids(user_toppings))
+
+    def iter_makeable_pizzas(self, user_toppings):
+        """Yield the IDs of makeable pizzas, one at a time"""
+        have = self.index.ids_mask(user_toppings)
+        for recipe, mask in zip(self.index.recipes, self.index.masks):
+            if not mask & ~have:
+                yield recipe.name
+
+    def iter_missing_toppings(self, user_toppings):
+        """Yield (pizza ID, missing topping IDs) for each pizza that cannot be made"""
+        index = self.index
+        have = index.ids_mask(user_toppings)
+        for position, mask in enumerate(index.masks):
+            if mask & ~have:
+                yield index.recipes[position].name, index.missing_ids(position, have)
+
+    def missing_toppings_by_pizza(self, user_toppings):
+        """List (pizza ID, missing topping IDs) for every pizza that cannot be made"""
+        return list(self.iter_missing_toppings(user_toppings))
+
+    def closest_pizzas(self, user_toppings, k, max_missing=None):
+        """The k pizzas missing the fewest toppings, as (pizza ID, missing topping IDs)"""
+        index = self.index
+        have = index.ids_mask(user_toppings)
+        return [(index.recipes[pos].name, index.missing_ids(pos, have))
+                for pos in index.closest_ids(user_toppings, k, max_missing)]
+
+    def shopping_list(self, user_toppings, k, costs=None, pizzas=None, time_budget=None):
+        """shopping_list with topping IDs, cost keys and pizza IDs; returns IDs too"""
+        ingredient_ids, recipe_ids = self.index.ingredient_ids, self.index.recipe_ids
+        if costs is not None:
+            costs = {ingredient_ids.names[ing]: cost for ing, cost in costs.items()}
+        if pizzas is not None:
+            pizzas = recipe_ids.names_of(pizzas)
+        result = cheapest_cover(self.index, ingredient_ids.names_of(user_toppings), k,
+                                costs, pizzas, time_budget)
+        if result is not None:
+            result["ingredients"] = ingredient_ids.intern_all(result["ingredients"])
+            result["pizzas"] = recipe_ids.intern_all(result["pizzas"])
+        return result
+
+    def find_makeable_pizzas_batch(self, pantries):
+        """Find makeable pizza IDs for each pantry of topping IDs"""
+        return [self.find_makeable_pizzas(pantry) for pantry in pantries]
+
+    def missing_toppings_by_pizza_batch(self, pantries):
+        """Get missing topping IDs by pizza ID for each pantry of topping IDs"""
+        return [self.missing_toppings_by_pizza(pantry) for pantry in pantries]
+
+    def get_user_extras(self, user_base):
+        """Get IDs of the extra ingredients user has, in the user's order"""
+        return array("H", [ing for ing in user_base if ing in self._extra_names])
+
+    def generate_steps(self, pizza_type, user_extras):
+        """Generate complete step list for a pizza ID and extra ingredient IDs"""
+        steps = list(self.kb.base_steps)
+        for extra in user_extras:
+            steps.extend(self.kb.extra_steps.get(self._extra_names.get(extra), []))
+        steps.extend(self.kb.topping_steps.get(self.pizza_name(pizza_type), []))
+        return steps
+
+    def get_steps_for(self, pizza_type, user_base):
+        """Steps for a pizza ID given the user's base ingredient IDs"""
+        return super().get_steps_for(self.pizza_name(pizza_type),
+                                     self.index.ingredient_ids.names_of(user_base))
+
+    def get_pizza_types(self):
+        """Get IDs of available pizza types, in catalog order"""
+        return self._pizza_ids(range(len(self.index)))
+
+    def iter_pizza_types(self):
+        """Yield the available pizza type IDs, one at a time"""
+        return (recipe.name for recipe in self.index.recipes)
+
+    def get_pizza_ingredients(self, pizza_type):
+        """Get IDs of all ingredients needed for a pizza ID"""
+        position = self._first_position.get(pizza_type)
+        if position is None:
+            return array("H")
+        required = self.kb.pizza_toppings[position][1]
+        return self._essential_ids + self._extra_ids + self.index.ingredient_ids.intern_all(required)
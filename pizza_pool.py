@@ -0,0 +1,296 @@
+"""Process pool of pizza expert engines.
+
+pyswip drives a single SWI-Prolog engine per process and cannot be shared
+between threads, so ``PooledPizzaExpertSystem`` keeps several worker
+processes, each with the knowledge base preloaded, and hands every call to
+an idle one.  Crashed workers are replaced and the call is retried once; a
+worker that does not answer within the call timeout is killed and replaced,
+and the call fails with WorkerTimeoutError.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+
+
+class WorkerCrashedError(RuntimeError):
+    """A worker process died while answering a query"""
+
+
+class WorkerTimeoutError(WorkerCrashedError):
+    """A worker process did not answer a query within the call timeout"""
+
+
+def _create_expert(kb_file, backend):
+    if backend == "native":
+        from pizza_native import NativePizzaExpertSystem
+        return NativePizzaExpertSystem(kb_file)
+    from pizza_expert import create_expert_system
+    return create_expert_system(kb_file, backend)
+
+
+def _warm_up(expert):
+    """Run one query of each kind so the first real call is not the slowest"""
+    pizza_types = expert.get_pizza_types()
+    toppings = expert.get_topping_ingredients()
+    base = expert.get_essential_base_ingredients() + expert.get_extra_base_ingredients()
+    expert.check_essential_base(base)
+    expert.find_makeable_pizzas(toppings)
+    expert.missing_toppings_by_pizza([])
+    if pizza_types:
+        expert.generate_steps(pizza_types[0], expert.get_user_extras(base))
+
+
+def _worker_main(conn, kb_file, backend, warmup):
+    """Worker process loop: answer (method, args) requests until told to stop"""
+    try:
+        expert = _create_expert(kb_file, backend)
+        if warmup:
+            _warm_up(expert)
+    except Exception as e:
+        conn.send(("error", RuntimeError(f"Failed to load knowledge base: {e}")))
+        return
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+        method, args = request
+        try:
+            result = getattr(expert, method)(*args)
+        except Exception as e:
+            try:
+                conn.send(("error", e))
+            except Exception:
+                conn.send(("error", RuntimeError(repr(e))))
+        else:
+            conn.send(("ok", result))
+
+
+class _Worker:
+    """Parent-side handle on one worker process"""
+
+    def __init__(self, context, kb_file, backend, warmup):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main,
+                                       args=(child_conn, kb_file, backend, warmup),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self, timeout):
+        if not self.conn.poll(timeout):
+            self.stop()
+            raise WorkerCrashedError("Worker did not start in time")
+        try:
+            status, value = self.conn.recv()
+        except (EOFError, OSError):
+            self.stop()
+            raise WorkerCrashedError("Worker exited during startup")
+        if status != "ready":
+            self.stop()
+            raise value
+
+    def call(self, method, args, timeout=None):
+        self.conn.send((method, args))
+        if timeout is not None and not self.conn.poll(timeout):
+            raise WorkerTimeoutError(f"Worker did not answer {method} within {timeout} s")
+        return self.conn.recv()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.conn.close()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class PooledPizzaExpertSystem:
+    """PizzaExpertSystem interface served by a pool of worker processes"""
+
+    def __init__(self, kb_file="pizza_expert.pl", size=None, backend="prolog",
+                 warmup=True, start_timeout=60, call_timeout=60):
+        """Start size workers (default: one per CPU), each loading kb_file.
+
+        A call waits at most call_timeout seconds for its worker (None: no
+        limit).
+        """
+        self.kb_file = os.path.abspath(kb_file)
+        self.size = size or os.cpu_count() or 1
+        self.backend = backend
+        self.warmup = warmup
+        self.start_timeout = start_timeout
+        self.call_timeout = call_timeout
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        workers = [self._spawn() for _ in range(self.size)]
+        try:
+            for worker in workers:
+                worker.wait_ready(self.start_timeout)
+        except Exception:
+            for worker in workers:
+                worker.stop()
+            raise
+        for worker in workers:
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+    def _spawn(self):
+        return _Worker(self._context, self.kb_file, self.backend, self.warmup)
+
+    def _replace(self, worker):
+        """Stop a crashed or hung worker and put a fresh one in its place.
+
+        If the fresh worker cannot start, the slot is dropped and the error
+        raised; once no worker is left, waiting callers fail instead of
+        blocking forever.
+        """
+        worker.stop()
+        try:
+            fresh = self._spawn()
+            fresh.wait_ready(self.start_timeout)
+        except Exception:
+            with self._lock:
+                if worker in self._workers:
+                    self._workers.remove(worker)
+                if not self._workers:
+                    self._idle.put(None)
+            raise
+        with self._lock:
+            if worker in self._workers:
+                self._workers[self._workers.index(worker)] = fresh
+            self.restarts += 1
+        return fresh
+
+    def _dispatch(self, method, *args):
+        """Run one call on an idle worker, retrying once if the worker crashes"""
+        if self._closed:
+            raise RuntimeError("Pool is closed")
+        worker = self._idle.get()
+        if worker is None:    # every worker is gone
+            self._idle.put(None)
+            raise WorkerCrashedError("No worker left in the pool")
+        try:
+            for _ in range(2):
+                try:
+                    status, value = worker.call(method, args, self.call_timeout)
+                    break
+                except WorkerTimeoutError:
+                    hung, worker = worker, None
+                    worker = self._replace(hung)
+                    raise
+                except (EOFError, OSError):
+                    crashed, worker = worker, None
+                    worker = self._replace(crashed)
+            else:
+                raise WorkerCrashedError(f"Worker crashed while running {method}")
+        finally:
+            if worker is not None:
+                self._idle.put(worker)
+        if status == "error":
+            raise value
+        return value
+
+    def close(self):
+        """Stop every worker process"""
+        self._closed = True
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_essential_base_ingredients(self):
+        """Get list of essential base ingredients"""
+        return self._dispatch("get_essential_base_ingredients")
+
+    def get_extra_base_ingredients(self):
+        """Get list of extra base ingredients"""
+        return self._dispatch("get_extra_base_ingredients")
+
+    def get_topping_ingredients(self):
+        """Get list of all topping ingredients"""
+        return self._dispatch("get_topping_ingredients")
+
+    def check_essential_base(self, user_base):
+        """Check if user has all essential base ingredients"""
+        return self._dispatch("check_essential_base", user_base)
+
+    def find_missing_extra(self, user_base):
+        """Find missing extra base ingredients"""
+        return self._dispatch("find_missing_extra", user_base)
+
+    def find_missing_essential(self, user_base):
+        """Find missing essential base ingredients"""
+        return self._dispatch("find_missing_essential", user_base)
+
+    def get_missing_extra_effect(self, ingredient):
+        """Get effect message for missing extra ingredient"""
+        return self._dispatch("get_missing_extra_effect", ingredient)
+
+    def find_makeable_pizzas(self, user_toppings):
+        """Find all pizzas that can be made with given toppings"""
+        return self._dispatch("find_makeable_pizzas", user_toppings)
+
+    def missing_toppings_by_pizza(self, user_toppings):
+        """List (pizza, missing toppings) for every pizza that cannot be made"""
+        return self._dispatch("missing_toppings_by_pizza", user_toppings)
+
+    def closest_pizzas(self, user_toppings, k, max_missing=None):
+        """The k pizzas missing the fewest toppings (at most max_missing), as (pizza, missing)"""
+        return self._dispatch("closest_pizzas", user_toppings, k, max_missing)
+
+    def shopping_list(self, user_toppings, k, costs=None, pizzas=None, time_budget=None):
+        """Cheapest ingredients to buy so at least k pizzas can be made (see shopping_list.cheapest_cover)"""
+        return self._dispatch("shopping_list", user_toppings, k, costs, pizzas, time_budget)
+
+    def plan_production(self, stock, order):
+        """How much of an order mix (pizza -> count) the stock (topping -> amount) covers"""
+        return self._dispatch("plan_production", stock, order)
+
+    def find_makeable_pizzas_batch(self, pantries):
+        """Find makeable pizzas for many pantries in one worker call"""
+        return self._dispatch("find_makeable_pizzas_batch", pantries)
+
+    def missing_toppings_by_pizza_batch(self, pantries):
+        """Get missing toppings by pizza for many pantries in one worker call"""
+        return self._dispatch("missing_toppings_by_pizza_batch", pantries)
+
+    def get_user_extras(self, user_base):
+        """Get which extra ingredients user has"""
+        return self._dispatch("get_user_extras", user_base)
+
+    def generate_steps(self, pizza_type, user_extras):
+        """Generate complete step list for chosen pizza"""
+        return self._dispatch("generate_steps", pizza_type, user_extras)
+
+    def get_steps_for(self, pizza_type, user_base):
+        """Steps for a pizza given the user's base ingredients, from the precomputed plans"""
+        return self._dispatch("get_steps_for", pizza_type, user_base)
+
+    def get_pizza_types(self):
+        """Get list of available pizza types"""
+        return self._dispatch("get_pizza_types")
+
+    def get_pizza_ingredients(self, pizza_type):
+        """Get all ingredients needed for a specific pizza type"""
+        return self._dispatch("get_pizza_ingredients", pizza_type)
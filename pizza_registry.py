@@ -0,0 +1,66 @@
+"""Interned ingredient and recipe names.
+
+Each name is interned once (through ``sys.intern``) and given a small
+integer ID.  Recipes are ``__slots__`` records whose requirements are
+``array('H')`` ID lists.  Hot paths then pass ints around, and results
+reuse the registry's str objects instead of building fresh ones.
+"""
+
+import sys
+from array import array
+
+
+class NameRegistry:
+    """Two-way mapping between names and consecutive integer IDs"""
+
+    __slots__ = ("ids", "names", "typecode", "_limit")
+
+    def __init__(self, names=(), typecode="H"):
+        """IDs are stored in arrays of typecode ("H": up to 65536 names)"""
+        self.ids = {}      # name -> ID
+        self.names = []    # ID -> name
+        self.typecode = typecode
+        self._limit = 1 << (8 * array(typecode).itemsize)
+        for name in names:
+            self.intern(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def intern(self, name):
+        """Return the ID of name, assigning the next one if it is new"""
+        id_ = self.ids.get(name)
+        if id_ is None:
+            id_ = len(self.names)
+            if id_ >= self._limit:
+                raise OverflowError(f"registry full: {id_} names do not fit array({self.typecode!r})")
+            name = sys.intern(name)
+            self.ids[name] = id_
+            self.names.append(name)
+        return id_
+
+    def get(self, name, default=None):
+        """ID of name, or default if it was never interned"""
+        return self.ids.get(name, default)
+
+    def intern_all(self, names):
+        """IDs of names, interning new ones, as an array"""
+        return array(self.typecode, map(self.intern, names))
+
+    def names_of(self, ids):
+        """Names of a sequence of IDs"""
+        names = self.names
+        return [names[id_] for id_ in ids]
+
+
+class Recipe:
+    """A recipe: its name ID and the IDs of its distinct required ingredients"""
+
+    __slots__ = ("name", "requires")
+
+    def __init__(self, name, requires):
+        self.name = name            # ID in the recipe-name registry
+        self.requires = requires    # array('H') of ingredient IDs, sorted by ingredient name
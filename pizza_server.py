@@ -0,0 +1,354 @@
+"""Headless HTTP/JSON service for the pizza expert system.
+
+Every query method is exposed as ``POST /<method>`` taking a JSON object of
+named arguments (methods without arguments also answer ``GET``):
+
+    POST /find_makeable_pizzas     {"user_toppings": ["onions", "mushrooms"]}
+    POST /generate_steps           {"pizza_type": "margherita", "user_extras": []}
+    GET  /get_pizza_types
+    GET  /metrics                  (Prometheus text, when the expert has metrics)
+
+Responses are ``{"result": ...}`` (plus ``"kb_version"`` when the KB is
+hot-reloaded, see kb_reload and ``--watch``).  Queries run on a thread executor so the
+event loop never blocks on Prolog, identical in-flight requests share one
+evaluation, connections are kept alive (HTTP/1.1), and large list results
+are streamed with chunked transfer encoding.  This module never imports
+tkinter.
+
+    python pizza_server.py [--host 127.0.0.1] [--port 8080] [--backend prolog|native] [--pool N]
+                           [--watch SECONDS]
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from kb_reload import ReloadingExpertSystem, VersionedResult, default_factory
+from query_cache import canonical_key
+
+
+# method name -> names of its arguments, in call order
+METHODS = {
+    "get_essential_base_ingredients": (),
+    "get_extra_base_ingredients": (),
+    "get_topping_ingredients": (),
+    "check_essential_base": ("user_base",),
+    "find_missing_extra": ("user_base",),
+    "find_missing_essential": ("user_base",),
+    "get_missing_extra_effect": ("ingredient",),
+    "find_makeable_pizzas": ("user_toppings",),
+    "missing_toppings_by_pizza": ("user_toppings",),
+    "closest_pizzas": ("user_toppings", "k", "max_missing"),
+    "shopping_list": ("user_toppings", "k", "costs", "pizzas", "time_budget"),
+    "plan_production": ("stock", "order"),
+    "find_makeable_pizzas_batch": ("pantries",),
+    "missing_toppings_by_pizza_batch": ("pantries",),
+    "get_user_extras": ("user_base",),
+    "generate_steps": ("pizza_type", "user_extras"),
+    "get_steps_for": ("pizza_type", "user_base"),
+    "get_pizza_types": (),
+    "get_pizza_ingredients": ("pizza_type",),
+}
+
+# Default values of optional arguments
+DEFAULTS = {
+    "closest_pizzas": {"max_missing": None},
+    "shopping_list": {"costs": None, "pizzas": None, "time_budget": None},
+}
+
+# Methods whose result depends on the order of their list arguments
+# (plan_production takes stock and order as plain vectors too)
+ORDERED_METHODS = {"generate_steps", "get_user_extras", "find_makeable_pizzas_batch",
+                   "missing_toppings_by_pizza_batch", "plan_production"}
+
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+# Longest search a request may ask for (seconds); queries share the executor,
+# so an unbounded shopping_list would stall every other client
+MAX_TIME_BUDGET = 5.0
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def create_expert(kb_file="pizza_expert.pl", backend="prolog", pool_size=None, watch=None):
+    """Build the expert the server will query (a process pool when pool_size is set).
+
+    With watch (seconds), the KB file is polled and hot-reloaded on change.
+    """
+    if watch:
+        expert = ReloadingExpertSystem(kb_file, default_factory(backend, pool_size or 1))
+        expert.watch(watch)
+        return expert
+    if pool_size:
+        from pizza_pool import PooledPizzaExpertSystem
+        return PooledPizzaExpertSystem(kb_file, pool_size, backend)
+    if backend == "native":
+        from pizza_native import NativePizzaExpertSystem
+        return NativePizzaExpertSystem(kb_file)
+    from pizza_expert import create_expert_system
+    return create_expert_system(kb_file, backend)
+
+
+class PizzaServer:
+    """asyncio HTTP/1.1 server exposing an expert system as JSON endpoints"""
+
+    def __init__(self, expert, host="127.0.0.1", port=8080, workers=1,
+                 stream_threshold=1000, keep_alive_timeout=15):
+        """workers must stay 1 for an in-process PizzaExpertSystem (one Prolog engine)"""
+        self.expert = expert
+        self.host = host
+        self.port = port
+        self.stream_threshold = stream_threshold
+        self.keep_alive_timeout = keep_alive_timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pizza-query")
+        self.coalesced = 0
+        self._inflight = {}
+        self._server = None
+
+    async def start(self):
+        """Start listening; returns once the socket is bound"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    ##################################################################################
+    #        Query execution
+    ##################################################################################
+
+    async def query(self, method, args):
+        """Run one expert method off the event loop, sharing identical in-flight calls"""
+        ordered = method in ORDERED_METHODS
+        key = (method,) + tuple(canonical_key(arg, ordered) for arg in args)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, getattr(self.expert, method), *args)
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _parse_args(self, method, body):
+        names = METHODS[method]
+        if not names:
+            return ()
+        try:
+            params = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON")
+        if not isinstance(params, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        params = {**DEFAULTS.get(method, {}), **params}
+        missing = [name for name in names if name not in params]
+        if missing:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing argument(s): {', '.join(missing)}")
+        if "time_budget" in names:
+            params["time_budget"] = self._time_budget(params["time_budget"])
+        return tuple(params[name] for name in names)
+
+    def _time_budget(self, budget):
+        """A request's time budget, capped at MAX_TIME_BUDGET (None: the method's default)"""
+        if budget is None:
+            return None
+        if isinstance(budget, bool) or not isinstance(budget, (int, float)) or not budget >= 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "time_budget must be a non-negative number")
+        return min(budget, MAX_TIME_BUDGET)
+
+    ##################################################################################
+    #        HTTP handling
+    ##################################################################################
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader),
+                                                     self.keep_alive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                method, path, headers, body, version = request
+                keep_alive = self._keep_alive(version, headers)
+                await self._respond(writer, method, path, body, keep_alive)
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {"error": e.message}, keep_alive=False)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length is not a number")
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length is negative")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        path = target.split("?", 1)[0]
+        return method.upper(), path, headers, body, version
+
+    def _keep_alive(self, version, headers):
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    async def _respond(self, writer, method, path, body, keep_alive):
+        name = path.strip("/")
+        if name == "health":
+            payload = {"status": "ok"}
+            if isinstance(self.expert, ReloadingExpertSystem):
+                payload["kb_version"] = self.expert.version
+            await self._send_json(writer, HTTPStatus.OK, payload, keep_alive)
+            return
+        if name == "metrics":
+            metrics = getattr(self.expert, "metrics", None)
+            text = metrics.prometheus_text() if metrics is not None else ""
+            await self._send(writer, HTTPStatus.OK, text.encode("utf-8"), keep_alive,
+                             "text/plain; version=0.0.4")
+            return
+        if name not in METHODS:
+            await self._send_json(writer, HTTPStatus.NOT_FOUND,
+                                  {"error": f"Unknown method: {name}"}, keep_alive)
+            return
+        if method != "POST" and not (method == "GET" and not METHODS[name]):
+            await self._send_json(writer, HTTPStatus.METHOD_NOT_ALLOWED,
+                                  {"error": f"{method} not allowed for {name}"}, keep_alive)
+            return
+        try:
+            args = self._parse_args(name, body)
+            result = await self.query(name, args)
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {"error": e.message}, keep_alive)
+            return
+        except TypeError as e:    # arguments of the wrong type
+            await self._send_json(writer, HTTPStatus.BAD_REQUEST,
+                                  {"error": f"{type(e).__name__}: {e}"}, keep_alive)
+            return
+        except Exception as e:
+            await self._send_json(writer, HTTPStatus.INTERNAL_SERVER_ERROR,
+                                  {"error": f"{type(e).__name__}: {e}"}, keep_alive)
+            return
+
+        extra = {}
+        if isinstance(result, VersionedResult):
+            result, extra["kb_version"] = result
+        if isinstance(result, list) and len(result) > self.stream_threshold:
+            await self._stream_list(writer, result, keep_alive, extra)
+        else:
+            await self._send_json(writer, HTTPStatus.OK, {**extra, "result": result}, keep_alive)
+
+    def _head(self, status, keep_alive, extra, content_type="application/json"):
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}",
+                 f"Content-Type: {content_type}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines.extend(extra)
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(self, writer, status, body, keep_alive, content_type="application/json"):
+        head = self._head(status, keep_alive, [f"Content-Length: {len(body)}"], content_type)
+        writer.write(head + body)
+        await writer.drain()
+
+    async def _send_json(self, writer, status, payload, keep_alive):
+        await self._send(writer, status, json.dumps(payload).encode("utf-8"), keep_alive)
+
+    async def _stream_list(self, writer, items, keep_alive, extra=None, chunk_items=500):
+        """Send {**extra, "result": [...]} with chunked encoding, chunk_items list items at a time"""
+        writer.write(self._head(HTTPStatus.OK, keep_alive, ["Transfer-Encoding: chunked"]))
+
+        def chunk(data):
+            return b"%x\r\n%s\r\n" % (len(data), data)
+
+        head = json.dumps(extra or {})[:-1]
+        writer.write(chunk((head + (", " if extra else "") + '"result": [').encode("utf-8")))
+        for start in range(0, len(items), chunk_items):
+            part = ", ".join(json.dumps(item) for item in items[start:start + chunk_items])
+            if start:
+                part = ", " + part
+            writer.write(chunk(part.encode("utf-8")))
+            await writer.drain()
+        writer.write(chunk(b"]}") + b"0\r\n\r\n")
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pizza expert system JSON service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--kb", default="pizza_expert.pl")
+    parser.add_argument("--backend", choices=("prolog", "native"), default="prolog")
+    parser.add_argument("--pool", type=int, default=0,
+                        help="serve queries from N worker processes")
+    parser.add_argument("--watch", type=float, default=0, metavar="SECONDS",
+                        help="hot-reload the KB when the file changes, polling every SECONDS")
+    args = parser.parse_args()
+
+    expert = create_expert(args.kb, args.backend, args.pool, args.watch)
+    workers = args.pool or 1
+    server = PizzaServer(expert, args.host, args.port, workers=workers)
+
+    async def run():
+        await server.start()
+        print(f"Serving pizza expert system on http://{server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if hasattr(expert, "close"):
+            expert.close()
+
+
+if __name__ == "__main__":
+    main()
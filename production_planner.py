@@ -0,0 +1,186 @@
+"""Quantity-aware production planning over a sparse recipe-by-ingredient matrix.
+
+The KB says which toppings a pizza needs (``pizza_toppings/2``) and,
+through ``topping_quantity/3``, how much of each one per pizza (1 when no
+quantity is given).  ``ProductionPlanner`` keeps that as a sparse (CSR)
+matrix with one row per recipe and one column per ingredient of the
+RecipeIndex: per recipe, the column IDs and amounts of its ingredients.
+Memory grows with the number of (recipe, ingredient) pairs, not with
+recipes x ingredients, so a stock vector and an order mix are planned with
+whole-array arithmetic even on large catalogs:
+
+* ``max_units`` - how many of each pizza the stock makes on its own;
+* ``plan`` / ``plan_many`` - how much of an order mix the stock covers.
+
+An order mix is produced proportionally: every pizza still in production
+draws on the stock at the rate of its outstanding count until some
+ingredient runs out.  That ingredient's pizzas stop, the rest carry on
+with what is left, and so on; the first ingredient to run out is the
+bottleneck of the mix.  ``plan_many`` runs this for a whole matrix of
+stock scenarios at once, which is what repeated what-if queries need.  It
+only works on the small dense block of the ordered recipes and the
+ingredients they use.
+"""
+
+import numpy as np
+
+
+class ProductionPlanner:
+    """Sparse recipe-by-ingredient quantity matrix over a RecipeIndex"""
+
+    def __init__(self, index, quantities=None, default_quantity=1):
+        """quantities maps (pizza, ingredient) -> amount per pizza (default_quantity otherwise)"""
+        quantities = quantities or {}
+        self.index = index
+        self.pizzas = list(index.names)
+        self.ingredients = list(index.ingredients)
+        self.positions = {}           # pizza name -> first recipe position (its row)
+        for position, name in enumerate(self.pizzas):
+            self.positions.setdefault(name, position)
+
+        # CSR: row r's ingredient IDs are columns[indptr[r]:indptr[r + 1]],
+        # with the amounts it needs per pizza at the same offsets
+        indptr, columns, amounts = [0], [], []
+        for position, recipe in enumerate(index.recipes):
+            name = self.pizzas[position]
+            for ing in recipe.requires:
+                amount = quantities.get((name, self.ingredients[ing]), default_quantity)
+                if amount > 0:
+                    columns.append(ing)
+                    amounts.append(amount)
+            indptr.append(len(columns))
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.columns = np.array(columns, dtype=np.int64)
+        self.amounts = np.array(amounts, dtype=float)
+        self.rows = np.repeat(np.arange(len(self.pizzas)), np.diff(self.indptr))
+
+    def stock_vector(self, stock):
+        """Stock as an ingredient vector; stock is a mapping ingredient -> amount or a vector"""
+        if not isinstance(stock, dict):
+            return np.asarray(stock, dtype=float)
+        vector = np.zeros(len(self.ingredients))
+        ids = self.index.ingredient_ids
+        for ing, amount in stock.items():
+            id_ = ids.get(ing)
+            if id_ is not None and id_ < len(vector):    # later IDs are in no recipe
+                vector[id_] = amount
+        return vector
+
+    def order_vector(self, order):
+        """Order mix as a recipe vector; order is a mapping pizza -> count or a vector"""
+        if not isinstance(order, dict):
+            return np.asarray(order, dtype=float)
+        vector = np.zeros(len(self.pizzas))
+        for pizza, count in order.items():
+            position = self.positions.get(pizza)
+            if position is None:
+                raise KeyError(f"Unknown pizza: {pizza}")
+            vector[position] += count
+        return vector
+
+    def demand(self, order):
+        """Ingredient amounts an order mix needs in full"""
+        return self._consumption(self.order_vector(order))
+
+    def _consumption(self, counts):
+        """Ingredient vector used by counts (a recipe vector) of each recipe"""
+        return np.bincount(self.columns, weights=counts[self.rows] * self.amounts,
+                           minlength=len(self.ingredients))
+
+    def max_units(self, stock):
+        """pizza -> how many of it the stock makes, each pizza considered alone"""
+        stock = self.stock_vector(stock)
+        units = np.full(len(self.pizzas), np.inf)
+        filled = np.flatnonzero(np.diff(self.indptr))
+        if len(filled):
+            # Empty rows hold no entries, so each filled row's segment runs
+            # from its start to the next filled row's start
+            ratios = stock[self.columns] / self.amounts
+            units[filled] = np.floor(np.minimum.reduceat(ratios, self.indptr[filled]))
+        return {self.pizzas[pos]: (None if np.isinf(units[pos]) else int(units[pos]))
+                for pos in self.positions.values()}
+
+    def _block(self, recipes):
+        """Dense (recipes x used ingredients) amounts of some recipes, and the used ingredient IDs"""
+        starts = self.indptr[recipes]
+        lengths = self.indptr[recipes + 1] - starts
+        # Offsets of every entry of those rows, row after row
+        entries = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        used, local = np.unique(self.columns[entries], return_inverse=True)
+        block = np.zeros((len(recipes), len(used)))
+        block[np.repeat(np.arange(len(recipes)), lengths), local] = self.amounts[entries]
+        return block, used
+
+    def plan_many(self, stocks, order):
+        """Plan one order mix against many stock scenarios at once.
+
+        stocks is a (scenarios x ingredients) array (or a list of stock
+        vectors).  Returns (produced, bottleneck): produced is a
+        (scenarios x recipes) array of whole pizzas made, bottleneck the ID
+        of the first ingredient to run out in each scenario (-1 when the
+        whole order is covered).
+        """
+        stocks = np.array(stocks, dtype=float, ndmin=2)
+        order = self.order_vector(order)
+        recipes = np.flatnonzero(order > 0)
+        matrix, used = self._block(recipes)
+        stock = stocks[:, used]
+        outstanding = np.broadcast_to(order[recipes], (len(stock), len(recipes))).copy()
+        made_total = np.zeros_like(outstanding)
+        active = outstanding > 0
+        if not len(used):    # the ordered pizzas need nothing
+            made_total, active = outstanding, np.zeros_like(active)
+        uses = matrix > 0
+        bottleneck = np.full(len(stock), -1)
+        scenarios = np.arange(len(stock))
+
+        # Each round ends with the order covered or one more ingredient out,
+        # so there are at most (ingredients + 1) rounds
+        while active.any():
+            rate = np.where(active, outstanding, 0.0)
+            demand = rate @ matrix
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratios = np.where(demand > 0, stock / demand, np.inf)
+            limit = ratios.argmin(axis=1)
+            fraction = np.minimum(ratios[scenarios, limit], 1.0)
+
+            made = rate * fraction[:, None]
+            made_total += made
+            outstanding -= made
+            stock = np.maximum(stock - demand * fraction[:, None], 0.0)
+
+            done = fraction >= 1.0
+            active[done] = False
+            short = ~done & active.any(axis=1)
+            first = short & (bottleneck < 0)
+            bottleneck[first] = used[limit[first]]
+            active[short] &= ~uses[:, limit[short]].T
+
+        produced = np.zeros((len(stock), len(self.pizzas)), dtype=int)
+        produced[:, recipes] = np.floor(made_total + 1e-9).astype(int)
+        return produced, bottleneck
+
+    def plan(self, stock, order):
+        """How much of an order mix the stock covers.
+
+        Returns a dict with the pizzas produced (pizza -> count), the
+        ingredient that runs out first (None when the order is covered in
+        full), the shortfall per ingredient (amount missing to cover the
+        whole order) and the stock left over.
+        """
+        stock = self.stock_vector(stock)
+        order = self.order_vector(order)
+        produced, bottleneck = self.plan_many(stock[None, :], order)
+        produced = produced[0]
+        demand = self._consumption(order)
+        shortfall = np.maximum(demand - stock, 0.0)
+        leftover = stock - self._consumption(produced.astype(float))
+        ordered = np.flatnonzero(order)
+        return {
+            "produced": {self.pizzas[pos]: int(produced[pos]) for pos in ordered},
+            "runs_out": self.ingredients[bottleneck[0]] if bottleneck[0] >= 0 else None,
+            "shortfall": {self.ingredients[ing]: float(shortfall[ing])
+                          for ing in np.flatnonzero(shortfall)},
+            "leftover": {self.ingredients[ing]: float(leftover[ing])
+                         for ing in np.flatnonzero(leftover > 1e-9)},
+        }
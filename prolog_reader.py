@@ -0,0 +1,204 @@
+"""Reader for the facts and plain rules of Prolog KB files, without SWI-Prolog.
+
+Used by the native pizza backend, the health Rete engine and the genealogy
+index.  Facts come back as Python values (atoms and strings as str, lists as
+lists, compound arguments as tuples, variables as ``Var``); rules only when
+their body is a conjunction of plain goals.
+"""
+
+import re
+
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+|%[^\n]*)
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<quoted>'(?:[^'\\]|\\.|'')*')
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<name>[a-z][A-Za-z0-9_]*)
+  | (?P<var>[A-Z_][A-Za-z0-9_]*)
+  | (?P<neck>:-|-->)
+  | (?P<end>\.(?=\s|%|$))
+  | (?P<punct>[()\[\],|.])
+  | (?P<other>\S)
+""", re.VERBOSE)
+
+
+class PrologSyntaxError(ValueError):
+    """A clause of a KB file that this reader cannot read"""
+
+    def __init__(self, message, line):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+class Var:
+    """Placeholder for a Prolog variable appearing inside a fact."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"Var({self.name})"
+
+
+def _unescape(text):
+    return re.sub(r"\\(.)", lambda m: {"n": "\n", "t": "\t"}.get(m.group(1), m.group(1)), text)
+
+
+def _tokenize(source):
+    """Yield (kind, text, offset) for every token of source"""
+    for match in _TOKEN_RE.finditer(source):
+        kind = match.lastgroup
+        if kind == "ws":
+            continue
+        yield kind, match.group(), match.start()
+
+
+class _FactParser:
+    """Recursive-descent reader for ground facts (atoms, strings, numbers, lists).
+
+    Clauses are delimited by end tokens (a ``.`` followed by whitespace), so
+    a clause that cannot be read never swallows the ones after it.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        tokens = list(_tokenize(source))
+        self.tokens = [(kind, text) for kind, text, _ in tokens]
+        self.offsets = [offset for _, _, offset in tokens]
+        self.pos = 0
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def advance(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, value):
+        kind, text = self.advance()
+        if text != value:
+            raise ValueError(f"Expected '{value}' but found '{text}'")
+
+    def line(self, pos):
+        """Line number of token pos"""
+        offset = self.offsets[pos] if pos < len(self.offsets) else len(self.source)
+        return self.source.count("\n", 0, offset) + 1
+
+    def clause_end(self):
+        """Index of the end token of the clause starting at pos"""
+        for end in range(self.pos, len(self.tokens)):
+            if self.tokens[end][0] == "end":
+                return end
+        raise PrologSyntaxError("clause is not terminated by '.'", self.line(self.pos))
+
+    def clauses(self):
+        """Yield (name, args) for every fact; rules and directives are skipped.
+
+        Raises PrologSyntaxError for a fact that cannot be read, rather than
+        silently answering from a KB that differs from what Prolog loads.
+        """
+        while self.peek()[0] is not None:
+            start, end = self.pos, self.clause_end()
+            if any(kind == "neck" for kind, _ in self.tokens[start:end]):
+                self.pos = end + 1
+                continue
+            try:
+                name, args = self.term()
+                if self.pos != end:
+                    raise ValueError(f"Unexpected token '{self.peek()[1]}'")
+            except ValueError as e:
+                raise PrologSyntaxError(f"cannot read fact: {e}", self.line(start)) from None
+            self.pos = end + 1
+            yield name, tuple(args)
+
+    def rules(self):
+        """Yield (head, body) for every rule whose body is a conjunction of plain goals.
+
+        head and each goal are (name, args); facts, directives and rules
+        using other control constructs are skipped.
+        """
+        while self.peek()[0] is not None:
+            start, end = self.pos, self.clause_end()
+            try:
+                head = self.term()
+                if self.advance()[0] != "neck":
+                    raise ValueError("Not a rule")
+                body = [self.term()]
+                while self.peek()[1] == ",":
+                    self.advance()
+                    body.append(self.term())
+                if self.pos != end:
+                    raise ValueError("Not a conjunction")
+            except ValueError:
+                continue
+            finally:
+                self.pos = end + 1
+            yield head, body
+
+    def term(self):
+        kind, text = self.advance()
+        if kind == "quoted":
+            kind, text = "name", _unescape(text[1:-1].replace("''", "'"))
+        if kind == "name":
+            if self.peek()[1] == "(":
+                self.advance()
+                args = [self.value()]
+                while self.peek()[1] == ",":
+                    self.advance()
+                    args.append(self.value())
+                self.expect(")")
+                return text, args
+            return text, []
+        raise ValueError(f"Unexpected token '{text}'")
+
+    def value(self):
+        kind, text = self.peek()
+        if kind == "string":
+            self.advance()
+            return _unescape(text[1:-1])
+        if kind == "quoted":
+            self.advance()
+            return _unescape(text[1:-1].replace("''", "'"))
+        if kind == "number":
+            self.advance()
+            return int(text) if text.lstrip("-").isdigit() else float(text)
+        if kind == "var":
+            self.advance()
+            return Var(text)
+        if text == "[":
+            self.advance()
+            items = []
+            if self.peek()[1] != "]":
+                items.append(self.value())
+                while self.peek()[1] == ",":
+                    self.advance()
+                    items.append(self.value())
+            self.expect("]")
+            return items
+        if kind == "name":
+            name, args = self.term()
+            if args:
+                return (name, *args)
+            return name
+        raise ValueError(f"Unexpected token '{text}'")
+
+
+def read_prolog_facts(kb_file):
+    """Return {(name, arity): [args, ...]} for every fact in a Prolog file, in clause order."""
+    with open(kb_file, encoding="utf-8") as f:
+        source = f.read()
+    facts = {}
+    for name, args in _FactParser(source).clauses():
+        facts.setdefault((name, len(args)), []).append(args)
+    return facts
+
+
+def read_prolog_rules(kb_file):
+    """Return [(head, body), ...] for every conjunctive rule in a Prolog file, in clause order."""
+    with open(kb_file, encoding="utf-8") as f:
+        source = f.read()
+    return list(_FactParser(source).rules())
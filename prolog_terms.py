@@ -0,0 +1,52 @@
+"""Conversion between Python values and pyswip terms.
+
+Shared by every SWI-Prolog backed expert system (PizzaExpertSystem, the
+health sessions): str arguments become atoms, and atoms and strings in
+results come back as interned str.
+"""
+
+import functools
+import sys
+
+from pyswip import Atom
+from pyswip.core import PL_ATOM, PL_put_chars, REP_UTF8
+from pyswip.easy import Term
+
+
+@functools.lru_cache(maxsize=65536)
+def _decode(data):
+    """Decode a Prolog string once; repeated results share one str object"""
+    return sys.intern(data.decode('utf-8'))
+
+
+def atom(text):
+    """A term holding text as an atom.
+
+    pyswip puts str arguments with PL_put_atom_chars, which reads the bytes
+    as Latin-1; the atom is made from UTF-8 instead, so non-ASCII names are
+    the same atoms the KB and catalog_loader's escapes produce.
+    """
+    term = Term()
+    data = text.encode("utf-8")
+    PL_put_chars(term.handle, PL_ATOM | REP_UTF8, len(data), data)
+    return term
+
+
+def to_prolog(value):
+    """A goal argument with every str (also inside lists) made an atom term"""
+    if isinstance(value, str):
+        return atom(value)
+    if isinstance(value, list):
+        return [to_prolog(item) for item in value]
+    return value
+
+
+def from_prolog(value):
+    """Convert a pyswip term value to plain Python (atoms and strings become interned str)"""
+    if isinstance(value, Atom):
+        return sys.intern(value.value)
+    if isinstance(value, bytes):
+        return _decode(value)
+    if isinstance(value, list):
+        return [from_prolog(item) for item in value]
+    return value
@@ -0,0 +1,131 @@
+"""Bounded LRU/TTL cache for expert system query results."""
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """Thread-safe LRU cache with an optional time-to-live per entry"""
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (True, value) on a hit and (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Hit/miss statistics as a dict"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+def canonical_key(value, ordered=False):
+    """Hashable cache key for a query argument.
+
+    Ingredient lists become a sorted tuple of distinct names, so the same
+    pantry hits the same entry whatever order it was selected in; mappings
+    (such as ingredient costs) become sorted item tuples.  Nested lists and
+    mappings are converted the same way, all the way down.  Pass
+    ordered=True for arguments whose order changes the result (lists then
+    keep their order and duplicates, at every level).
+    """
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [canonical_key(item, ordered) for item in value]
+        if ordered and not isinstance(value, (set, frozenset)):
+            return tuple(items)
+        return tuple(sorted(frozenset(items), key=_sort_key))
+    if isinstance(value, dict):
+        return tuple(sorted(((key, canonical_key(item, ordered)) for key, item in value.items()),
+                            key=_sort_key))
+    return value
+
+
+def _sort_key(item):
+    """Order for canonical items, which may mix types (names, numbers, tuples)"""
+    return type(item).__name__, repr(item)
+
+
+def copy_result(value):
+    """Copy the list parts of a cached result so callers can't mutate the cache"""
+    if isinstance(value, list):
+        return [copy_result(item) for item in value]
+    if isinstance(value, tuple):
+        if any(isinstance(item, (list, tuple)) for item in value):
+            return tuple(copy_result(item) for item in value)
+        return value    # immutable all the way down
+    return value
+
+
+def cached_query(ordered=False):
+    """Cache a query method on ``self.cache`` (a QueryCache, or None to disable).
+
+    Arguments are bound to the method's signature, defaults included, so a
+    positional and a keyword call with the same values share one entry.
+    """
+    def decorator(method):
+        name = method.__name__
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (name,) + tuple(canonical_key(arg, ordered) for arg in bound.args[1:])
+            hit, value = cache.get(key)
+            if not hit:
+                value = method(self, *args, **kwargs)
+                cache.put(key, value)
+            return copy_result(value)
+        return wrapper
+    return decorator
@@ -0,0 +1,193 @@
+"""Per-query instrumentation for the expert system.
+
+``QueryMetrics`` counts every call of an instrumented query method and, for
+a sampled fraction of them, records wall time (as a histogram), result
+size and the number of Prolog inferences the call used.  The collected data
+is available as a plain dict (``snapshot()``) or as Prometheus text
+exposition format (``prometheus_text()``).
+"""
+
+import bisect
+import functools
+import random
+import threading
+import time
+
+
+# Upper bounds (seconds) of the wall-time histogram buckets
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class _MethodStats:
+    __slots__ = ("calls", "errors", "sampled", "bucket_counts", "time_sum", "time_max",
+                 "result_size_sum", "inferences_sum", "inferences_sampled")
+
+    def __init__(self, n_buckets):
+        self.calls = 0
+        self.errors = 0
+        self.sampled = 0
+        self.bucket_counts = [0] * (n_buckets + 1)   # last one is +Inf
+        self.time_sum = 0.0
+        self.time_max = 0.0
+        self.result_size_sum = 0
+        self.inferences_sum = 0
+        self.inferences_sampled = 0
+
+
+class QueryMetrics:
+    """Thread-safe call counters, latency histograms and result/inference totals"""
+
+    def __init__(self, sample_rate=1.0, buckets=DEFAULT_BUCKETS, random_fn=random.random):
+        """Measure a sample_rate fraction of calls (all calls are still counted)"""
+        self.sample_rate = sample_rate
+        self.buckets = tuple(sorted(buckets))
+        self._random = random_fn
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get(self, method):
+        stats = self._stats.get(method)
+        if stats is None:
+            stats = self._stats[method] = _MethodStats(len(self.buckets))
+        return stats
+
+    def should_sample(self):
+        """Decide whether the next call is measured"""
+        return self.sample_rate >= 1.0 or self._random() < self.sample_rate
+
+    def count(self, method, error=False):
+        """Count a call that was not sampled"""
+        with self._lock:
+            stats = self._get(method)
+            stats.calls += 1
+            if error:
+                stats.errors += 1
+
+    def record(self, method, seconds, result_size=None, inferences=None, error=False):
+        """Record a sampled call"""
+        with self._lock:
+            stats = self._get(method)
+            stats.calls += 1
+            stats.sampled += 1
+            if error:
+                stats.errors += 1
+            stats.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            stats.time_sum += seconds
+            stats.time_max = max(stats.time_max, seconds)
+            if result_size is not None:
+                stats.result_size_sum += result_size
+            if inferences is not None:
+                stats.inferences_sum += inferences
+                stats.inferences_sampled += 1
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self):
+        """Current metrics as {method: {...}}"""
+        with self._lock:
+            result = {}
+            for method, stats in self._stats.items():
+                cumulative = 0
+                histogram = []
+                for bound, count in zip(self.buckets + (float("inf"),), stats.bucket_counts):
+                    cumulative += count
+                    histogram.append((bound, cumulative))
+                sampled = stats.sampled
+                result[method] = {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "sampled": sampled,
+                    "time_sum_s": stats.time_sum,
+                    "time_mean_s": stats.time_sum / sampled if sampled else 0.0,
+                    "time_max_s": stats.time_max,
+                    "time_histogram": histogram,
+                    "result_size_mean": stats.result_size_sum / sampled if sampled else 0.0,
+                    "inferences_sum": stats.inferences_sum,
+                    "inferences_mean": (stats.inferences_sum / stats.inferences_sampled
+                                        if stats.inferences_sampled else 0.0),
+                }
+            return result
+
+    def prometheus_text(self, prefix="pizza_query"):
+        """Metrics in Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        family("calls_total", "counter", "Query method calls.")
+        for method, stats in snapshot.items():
+            lines.append(f'{prefix}_calls_total{{method="{method}"}} {stats["calls"]}')
+        family("errors_total", "counter", "Query method calls that raised.")
+        for method, stats in snapshot.items():
+            lines.append(f'{prefix}_errors_total{{method="{method}"}} {stats["errors"]}')
+
+        family("duration_seconds", "histogram", "Wall time of sampled query calls.")
+        for method, stats in snapshot.items():
+            for bound, count in stats["time_histogram"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_duration_seconds_bucket{{method="{method}",le="{le}"}} {count}')
+            lines.append(f'{prefix}_duration_seconds_sum{{method="{method}"}} {stats["time_sum_s"]}')
+            lines.append(f'{prefix}_duration_seconds_count{{method="{method}"}} {stats["sampled"]}')
+
+        family("result_size", "summary", "Number of items returned by sampled calls.")
+        for method, stats in snapshot.items():
+            total = stats["result_size_mean"] * stats["sampled"]
+            lines.append(f'{prefix}_result_size_sum{{method="{method}"}} {total:g}')
+            lines.append(f'{prefix}_result_size_count{{method="{method}"}} {stats["sampled"]}')
+
+        family("inferences", "summary", "Prolog inferences used by sampled calls.")
+        for method, stats in snapshot.items():
+            lines.append(f'{prefix}_inferences_sum{{method="{method}"}} {stats["inferences_sum"]}')
+            lines.append(f'{prefix}_inferences_count{{method="{method}"}} {stats["sampled"]}')
+        return "\n".join(lines) + "\n"
+
+
+def _result_size(result):
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return 1 if result else 0
+
+
+def instrumented_query(method):
+    """Record a query method on ``self.metrics`` (a QueryMetrics, or None to disable).
+
+    ``self._inferences()`` is called around sampled calls to count Prolog
+    inferences; it may return None when the backend has no such counter.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = self.metrics
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        if not metrics.should_sample():
+            try:
+                result = method(self, *args, **kwargs)
+            except Exception:
+                metrics.count(name, error=True)
+                raise
+            metrics.count(name)
+            return result
+
+        start_inferences = self._inferences()
+        start = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except Exception:
+            metrics.record(name, time.perf_counter() - start, error=True)
+            raise
+        elapsed = time.perf_counter() - start
+        end_inferences = self._inferences()
+        inferences = None
+        if start_inferences is not None and end_inferences is not None:
+            inferences = end_inferences - start_inferences
+        metrics.record(name, elapsed, _result_size(result), inferences)
+        return result
+    return wrapper
@@ -0,0 +1,179 @@
+"""Shopping-list optimiser: the cheapest ingredients to buy to make k pizzas.
+
+Works on a RecipeIndex.  Each recipe that cannot be made yet needs the
+ingredients in ``mask & ~pantry``; buying a set S makes every recipe whose
+missing mask is a subset of S.  Recipes with the same missing mask are
+grouped, then a depth-first branch-and-bound picks groups in order of
+increasing cost:
+
+* a node's cost is the cost of the union of the masks picked so far;
+* needing r more recipes, the final set costs at least the current cost
+  plus the r-th smallest extra cost among the groups not yet covered
+  (every one of those r recipes has to be covered), so such branches are
+  cut as soon as that bound reaches the best plan found.
+
+A greedy plan (repeatedly add the cheapest group to complete) seeds the
+search.  Ties between equal costs are broken on the sorted ingredient
+names, never on bit positions, so every index over the same catalog (the
+Prolog-built one or the native one, which interns ingredients in another
+order) returns the same plan.  The search stops when its time budget
+(DEFAULT_TIME_BUDGET unless given) runs out and the best plan so far, at
+worst the greedy one, is returned with ``optimal`` False.
+"""
+
+import time
+
+
+# Seconds the search may take when no time budget is given; large catalogs
+# can take minutes to prove a plan optimal
+DEFAULT_TIME_BUDGET = 1.0
+
+# Nodes expanded between two checks of the time budget (each node scans every group)
+_CLOCK_EVERY = 8
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def _mask_cost(mask, bit_costs):
+    total = 0
+    while mask:
+        low = mask & -mask
+        total += bit_costs[low.bit_length() - 1]
+        mask ^= low
+    return total
+
+
+def _mask_names(mask, names):
+    """Sorted names of the bits of mask: the tie-break between equal costs"""
+    found = []
+    while mask:
+        low = mask & -mask
+        found.append(names[low.bit_length() - 1])
+        mask ^= low
+    return sorted(found)
+
+
+class _Search:
+    def __init__(self, masks, weights, bit_costs, names, need, deadline):
+        self.masks = masks          # distinct missing masks, cheapest first
+        self.weights = weights      # number of recipes with each mask
+        self.bit_costs = bit_costs
+        self.names = names          # bit -> ingredient
+        self.costs = [_mask_cost(mask, bit_costs) for mask in masks]
+        self.need = need
+        self.deadline = deadline
+        self.nodes = 0
+        self.best_cost = float("inf")
+        self.best_mask = None
+
+    def cost(self, mask):
+        return _mask_cost(mask, self.bit_costs)
+
+    def covered(self, bought):
+        return sum(weight for mask, weight in zip(self.masks, self.weights)
+                   if not mask & ~bought)
+
+    def greedy(self):
+        """Seed plan: keep completing the group that is cheapest to complete"""
+        bought, cost = 0, 0
+        while self.covered(bought) < self.need:
+            extra = min((mask & ~bought for mask in self.masks if mask & ~bought),
+                        key=lambda extra: (self.cost(extra), _mask_names(extra, self.names)))
+            bought |= extra
+            cost += self.cost(extra)
+        self.best_cost, self.best_mask = cost, bought
+
+    def search(self, start, bought, cost):
+        """Complete groups start.. in any combination (each branch picks increasing indexes)"""
+        self.nodes += 1
+        if self.nodes % _CLOCK_EVERY == 0 and time.perf_counter() > self.deadline:
+            raise _BudgetExceeded
+        remaining = self.need - self.covered(bought)
+        if remaining <= 0:
+            if cost < self.best_cost:
+                self.best_cost, self.best_mask = cost, bought
+            return
+
+        # Extra cost of completing every open group; groups before start can
+        # still be covered on the way, so they count towards the bound
+        open_groups = []
+        for i, mask in enumerate(self.masks):
+            if not mask & bought:
+                open_groups.append((self.costs[i], i, mask))
+            elif mask & ~bought:
+                extra = mask & ~bought
+                open_groups.append((self.cost(extra), i, extra))
+        open_groups.sort()
+
+        # Lower bound: the remaining-th smallest extra cost, counting group sizes
+        counted = 0
+        for extra_cost, i, _ in open_groups:
+            counted += self.weights[i]
+            if counted >= remaining:
+                if cost + extra_cost >= self.best_cost:
+                    return
+                break
+
+        for extra_cost, i, extra in open_groups:
+            if cost + extra_cost >= self.best_cost:
+                break
+            if i >= start:
+                self.search(i + 1, bought | extra, cost + extra_cost)
+
+
+def cheapest_cover(index, pantry, k, costs=None, pizzas=None, time_budget=None,
+                   default_cost=1):
+    """Cheapest set of ingredients to buy so that at least k pizzas can be made.
+
+    costs maps ingredient -> price (default_cost for the others, so by
+    default the smallest set is found); pizzas restricts which recipes
+    count.  The search runs for at most time_budget seconds (None:
+    DEFAULT_TIME_BUDGET; pass float("inf") to always search exhaustively).
+    Returns a dict with the ingredients to buy (sorted), their total cost,
+    the pizzas makeable afterwards and whether the plan is proven optimal,
+    or None when fewer than k pizzas exist at all.
+    """
+    costs = costs or {}
+    have = index.pantry_mask(pantry)
+    allowed = set(pizzas) if pizzas is not None else None
+    positions = [pos for pos, name in enumerate(index.names)
+                 if allowed is None or name in allowed]
+    if len(positions) < k:
+        return None
+
+    groups = {}
+    makeable = 0
+    for pos in positions:
+        missing = index.masks[pos] & ~have
+        if missing:
+            groups[missing] = groups.get(missing, 0) + 1
+        else:
+            makeable += 1
+
+    bit_costs = [costs.get(ing, default_cost) for ing in index.ingredients]
+    bought, cost, optimal = 0, 0, True
+    if makeable < k:
+        if time_budget is None:
+            time_budget = DEFAULT_TIME_BUDGET
+        deadline = time.perf_counter() + time_budget
+        names = index.ingredients
+        ordered = sorted(groups.items(), key=lambda item: (_mask_cost(item[0], bit_costs),
+                                                           _mask_names(item[0], names)))
+        search = _Search([mask for mask, _ in ordered], [weight for _, weight in ordered],
+                         bit_costs, names, k - makeable, deadline)
+        search.greedy()
+        try:
+            search.search(0, 0, 0)
+        except _BudgetExceeded:
+            optimal = False
+        bought, cost = search.best_mask, search.best_cost
+
+    after = have | bought
+    return {
+        "ingredients": sorted(index.mask_ingredients(bought)),
+        "cost": cost,
+        "pizzas": [index.names[pos] for pos in positions if not index.masks[pos] & ~after],
+        "optimal": optimal,
+    }
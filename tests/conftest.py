@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Sample arguments for the expert methods, by parameter name (pizza_expert.pl)
+PANTRY = ["tomato_sauce", "mozzarella_cheese", "pepperoni_slices"]
+
+ARGUMENTS = {
+    "user_base": ["flour", "water", "sugar"],
+    "ingredient": "sugar",
+    "user_toppings": PANTRY,
+    "k": 2,
+    "max_missing": 3,
+    "costs": {"onions": 2, "mushrooms": 5},
+    "pizzas": None,
+    "time_budget": 0.5,
+    "stock": {"tomato_sauce": 10, "mozzarella_cheese": 10, "pepperoni_slices": 40},
+    "order": {"pepperoni": 3},
+    "pantries": [PANTRY, ["onions", "mushrooms"]],
+    "pizza_type": "pepperoni",
+    "user_extras": ["sugar"],
+}
+
+
+def many_extras_kb(directory, n_extras):
+    """Copy of pizza_expert.pl with n_extras more extra base ingredients, each with a step"""
+    with open(os.path.join(ROOT, "pizza_expert.pl"), encoding="utf-8") as f:
+        text = f.read()
+    extras = [f"extra_{n}" for n in range(n_extras)]
+    text = text.replace("extra_base(semolina).\n", "extra_base(semolina).\n" + "".join(
+        f"extra_base({extra}).\n" for extra in extras))
+    text = text.replace('extra_step(semolina, "Add semolina to the mix").\n',
+                        'extra_step(semolina, "Add semolina to the mix").\n' + "".join(
+                            f'extra_step({extra}, "Add {extra}").\n' for extra in extras))
+    path = os.path.join(str(directory), "many_extras.pl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def run_isolated(script):
+    """Run script in a fresh interpreter and return the JSON it prints last.
+
+    pyswip has one SWI engine per process, so tests that consult another KB
+    run there instead of redefining the predicates the other tests use.
+    """
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
@@ -0,0 +1,127 @@
+"""The native backend answers exactly like the Prolog one (needs SWI-Prolog)."""
+
+import os
+
+import pytest
+
+from conftest import ARGUMENTS, ROOT
+from pizza_native import NativePizzaExpertSystem
+from pizza_server import METHODS
+
+KB_FILE = os.path.join(ROOT, "pizza_expert.pl")
+
+
+@pytest.fixture(scope="module")
+def prolog():
+    try:
+        from pizza_expert import PizzaExpertSystem
+    except Exception as e:    # pyswip raises its own error when SWI-Prolog is missing
+        pytest.skip(f"SWI-Prolog not available: {e}")
+    return PizzaExpertSystem(KB_FILE, cache_size=0)
+
+
+@pytest.fixture(scope="module")
+def native():
+    return NativePizzaExpertSystem(KB_FILE, use_snapshot=False)
+
+
+def shape(value):
+    """value with every leaf replaced by its type, to compare return types"""
+    if isinstance(value, (list, tuple)):
+        return type(value), [shape(item) for item in value]
+    if isinstance(value, dict):
+        return dict, {key: shape(item) for key, item in value.items()}
+    return type(value)
+
+
+@pytest.mark.parametrize("method", sorted(METHODS))
+def test_same_results_and_types(prolog, native, method):
+    args = [ARGUMENTS[name] for name in METHODS[method]]
+    expected = getattr(prolog, method)(*args)
+    result = getattr(native, method)(*args)
+    assert result == expected
+    assert shape(result) == shape(expected)
+
+
+def test_keyword_arguments(prolog, native):
+    for expert in (prolog, native):
+        assert expert.closest_pizzas(ARGUMENTS["user_toppings"], 5, max_missing=2) == \
+            native.closest_pizzas(ARGUMENTS["user_toppings"], 5, 2)
+        assert expert.shopping_list(ARGUMENTS["user_toppings"], 3, costs={"onions": 4},
+                                    time_budget=0.5)["cost"] >= 0
+
+
+def test_non_ascii_atoms_round_trip(prolog):
+    from catalog_loader import _quote_atom
+
+    name = "jalape\xf1o"
+    assert prolog._solve("atom_length", name) == len(name)
+    assert prolog._holds("atom_to_term", _quote_atom(name), name, [])
+    assert prolog._solve("atom_string", name) == name
+
+
+def test_every_query_method_is_instrumented(prolog):
+    from query_metrics import QueryMetrics
+
+    prolog.metrics = QueryMetrics()
+    try:
+        for method, names in METHODS.items():
+            getattr(prolog, method)(*[ARGUMENTS[name] for name in names])
+        assert set(prolog.metrics.snapshot()) == set(METHODS)
+    finally:
+        prolog.metrics = None
+
+
+@pytest.fixture(params=["prolog", "native"])
+def expert(request):
+    return request.getfixturevalue(request.param)
+
+
+def test_iter_methods_match_the_list_methods(expert):
+    pantry = ARGUMENTS["user_toppings"]
+    assert list(expert.iter_makeable_pizzas(pantry)) == expert.find_makeable_pizzas(pantry)
+    assert list(expert.iter_missing_toppings(pantry)) == expert.missing_toppings_by_pizza(pantry)
+    assert list(expert.iter_pizza_types()) == expert.get_pizza_types()
+
+
+def test_iter_closed_early_then_another_query(expert):
+    types = expert.get_pizza_types()
+    pizzas = expert.iter_pizza_types()
+    assert next(pizzas) == types[0]
+    pizzas.close()
+    assert expert.get_pizza_types() == types
+
+    for pizza, missing in expert.iter_missing_toppings(ARGUMENTS["user_toppings"]):
+        break
+    assert expert.get_pizza_ingredients(pizza)
+    assert list(expert.iter_pizza_types()) == types
+
+    unstarted = expert.iter_makeable_pizzas(ARGUMENTS["user_toppings"])
+    unstarted.close()
+    assert expert.find_makeable_pizzas(ARGUMENTS["user_toppings"]) == \
+        list(expert.iter_makeable_pizzas(ARGUMENTS["user_toppings"]))
+
+
+def test_steps_beyond_max_plan_extras(prolog, tmp_path):
+    from conftest import many_extras_kb, run_isolated
+    from pizza_native import MAX_PLAN_EXTRAS
+
+    kb_file = many_extras_kb(tmp_path, MAX_PLAN_EXTRAS)
+    user_bases = [[], ["extra_3", "sugar", "water"], [f"extra_{n}" for n in range(8, -1, -3)]]
+    result = run_isolated(f"""
+import json
+from pizza_expert import PizzaExpertSystem
+expert = PizzaExpertSystem({kb_file!r}, cache_size=0)
+pizza = expert.get_pizza_types()[0]
+print(json.dumps({{
+    "max_plan_extras": expert._solve("max_plan_extras"),
+    "plan": expert._solve("step_plan", pizza, []),
+    "pizza": pizza,
+    "steps": [list(expert.get_steps_for(pizza, base)) for base in {user_bases!r}],
+}}))
+""")
+    native = NativePizzaExpertSystem(kb_file, use_snapshot=False)
+    assert result["max_plan_extras"] == MAX_PLAN_EXTRAS
+    assert result["plan"] is None
+    assert result["steps"] == [list(native.get_steps_for(result["pizza"], base))
+                               for base in user_bases]
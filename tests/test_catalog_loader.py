@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from catalog_loader import (CatalogFormatError, _quote_atom, _quote_string, load_catalog,
+                            prolog_facts, read_catalog)
+
+
+def records(path, chunk_bytes=1 << 20, fmt=None):
+    return [record for chunk, _ in read_catalog(str(path), fmt, chunk_bytes) for record in chunk]
+
+
+def test_csv_recipes_and_effects(tmp_path):
+    path = tmp_path / "catalog.csv"
+    path.write_text("pizza,toppings,steps,quantities,extra,effect\n"
+                    "calzone,ricotta; ham ,Fill|Fold,ham=4;ricotta=0.5,,\n"
+                    "\n"
+                    ",,,,sugar,\"Slower rise, less browning\"\n", encoding="utf-8")
+    assert records(path) == [
+        ("recipe", "calzone", ["ricotta", "ham"], ["Fill", "Fold"], {"ham": 4, "ricotta": 0.5}),
+        ("effect", "sugar", "Slower rise, less browning"),
+    ]
+
+
+def test_csv_header_must_name_known_columns(tmp_path):
+    path = tmp_path / "catalog.csv"
+    path.write_text("name,items\nmargherita,tomato\n", encoding="utf-8")
+    with pytest.raises(CatalogFormatError):
+        records(path)
+
+
+def test_csv_quoted_field_with_newlines(tmp_path):
+    path = tmp_path / "catalog.csv"
+    rows = "".join(f'p{n},ham,"Roll the dough\nout|Bake\r\nit",\n' for n in range(50))
+    path.write_text("pizza,toppings,steps,quantities\n" + rows, encoding="utf-8", newline="")
+    expected = [("recipe", f"p{n}", ["ham"], ["Roll the dough\nout", "Bake\r\nit"], {})
+                for n in range(50)]
+    assert records(path) == expected
+    for chunk_bytes in (1, 7, 30, 64):
+        assert records(path, chunk_bytes) == expected
+
+
+def test_jsonl_keeps_unicode_line_separators(tmp_path):
+    path = tmp_path / "catalog.jsonl"
+    recipe = {"pizza": "jalape\xf1o", "toppings": ["chili"], "steps": ["Slice\u2028thin\u2029\x85\x0c\x1cok"]}
+    effect = {"extra": "sugar", "effect": "Slowerrise"}
+    path.write_text(json.dumps(recipe, ensure_ascii=False) + "\n"
+                    + json.dumps(effect, ensure_ascii=False) + "\n", encoding="utf-8")
+    assert records(path) == [
+        ("recipe", "jalape\xf1o", ["chili"], ["Slice\u2028thin\u2029\x85\x0c\x1cok"], {}),
+        ("effect", "sugar", "Slowerrise"),
+    ]
+
+
+def test_jsonl_rejects_unknown_records(tmp_path):
+    path = tmp_path / "catalog.jsonl"
+    path.write_text('{"name": "x"}\n', encoding="utf-8")
+    with pytest.raises(CatalogFormatError):
+        records(path)
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 10, 100, 1 << 20])
+def test_chunk_boundaries_do_not_change_the_records(tmp_path, chunk_bytes):
+    path = tmp_path / "catalog.jsonl"
+    lines = [json.dumps({"pizza": f"p{n}", "toppings": [f"t{n % 7}"]}) for n in range(200)]
+    path.write_text("\n".join(lines), encoding="utf-8")    # no final newline
+    chunks = list(read_catalog(str(path), chunk_bytes=chunk_bytes))
+    assert sum(n_bytes for _, n_bytes in chunks) == path.stat().st_size
+    assert [record[1] for chunk, _ in chunks for record in chunk] == [f"p{n}" for n in range(200)]
+
+
+def test_quoted_escapes():
+    assert _quote_atom("it's") == "'it\\'s'"
+    assert _quote_atom("back\\slash") == "'back\\\\slash'"
+    assert _quote_string('say "hi"\nnow\r') == '"say \\"hi\\"\\nnow\\r"'
+    assert _quote_atom("jalape\xf1o") == "'jalape\\xf1\\o'"
+    assert _quote_string("\u20ac\u2028") == '"\\x20ac\\\\x2028\\"'
+    assert prolog_facts([("recipe", "a", ["b"], ["c"], {"b": 2})]) == (
+        "pizza_toppings('a', ['b']).\n"
+        "topping_quantity('a', 'b', 2).\n"
+        "topping_step('a', 1, \"c\").\n")
+
+
+def test_load_catalog_into_the_native_backend(tmp_path):
+    from conftest import ROOT
+    from pizza_native import NativePizzaExpertSystem
+
+    path = tmp_path / "catalog.csv"
+    path.write_text("pizza,toppings\ncalzone,ricotta;ham\n", encoding="utf-8")
+    expert = NativePizzaExpertSystem(f"{ROOT}/pizza_expert.pl")
+    stats = load_catalog(expert, str(path))
+    assert stats["recipes"] == 1
+    assert "calzone" in expert.get_pizza_types()
+    assert "calzone" in expert.find_makeable_pizzas(["ricotta", "ham"])
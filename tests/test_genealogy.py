@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from conftest import ROOT
+from genealogy import GenealogyCycleError, GenealogyIndex, load_parent_edges
+
+
+def naive_ancestors(edges):
+    parents = {}
+    for parent, child in edges:
+        parents.setdefault(child, set()).add(parent)
+    memo = {}
+
+    def ancestors(person):
+        if person not in memo:
+            found = set()
+            for parent in parents.get(person, ()):
+                found |= {parent} | ancestors(parent)
+            memo[person] = found
+        return memo[person]
+    return ancestors
+
+
+def random_dag(rng):
+    people = [f"x{n}" for n in range(rng.randint(2, 25))]
+    rng.shuffle(people)    # edges go from earlier to later people in this order
+    edges = []
+    for _ in range(rng.randint(0, 50)):
+        a, b = sorted(rng.sample(range(len(people)), 2))
+        edges.append((people[a], people[b]))
+    return people, edges
+
+
+@pytest.mark.parametrize("seed", range(80))
+def test_queries_match_naive_closure(seed):
+    rng = random.Random(seed)
+    people, edges = random_dag(rng)
+    split = rng.randint(0, len(edges))
+    bulk = GenealogyIndex(edges[:split])     # batch, then incremental
+    for edge in edges[split:]:
+        bulk.add_parent(*edge)
+    incremental = GenealogyIndex()
+    for edge in edges:
+        incremental.add_parent(*edge)
+    ancestors = naive_ancestors(edges)
+    present = [person for person in people if person in bulk]
+    for index in (bulk, incremental):
+        for person in present:
+            assert set(index.ancestors(person)) == ancestors(person)
+            assert set(index.descendants(person)) == {p for p in present if person in ancestors(p)}
+        for first in present:
+            for second in present:
+                assert index.is_ancestor(first, second) == (first in ancestors(second))
+                common = ancestors(first) & ancestors(second)
+                assert set(index.common_ancestors(first, second)) == common
+                assert set(index.lowest_common_ancestors(first, second)) == \
+                    {c for c in common if not any(c in ancestors(d) for d in common)}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_cycles_are_rejected_and_leave_the_index_unchanged(seed):
+    rng = random.Random(seed)
+    _, edges = random_dag(rng)
+    if not edges:
+        return
+    index = GenealogyIndex(edges)
+    parent, child = edges[0]
+    before = [list(parents) for parents in index.parents], list(index.ancestors_of)
+    with pytest.raises(GenealogyCycleError):
+        index.add_parent(child, parent)
+    with pytest.raises(GenealogyCycleError):
+        index.add_parents([("new", "other"), (child, parent)])
+    assert ([list(parents) for parents in index.parents[:len(before[0])]],
+            index.ancestors_of[:len(before[1])]) == before
+    with pytest.raises(GenealogyCycleError):
+        index.add_parent(parent, parent)
+
+
+def test_family_kb_and_edge_files(tmp_path):
+    index = GenealogyIndex.from_kb(f"{ROOT}/family.pl")
+    assert index.ancestors("susan") == ["john", "mary"]
+    assert index.lowest_common_ancestors("susan", "bob") == ["john"]
+
+    path = tmp_path / "edges.txt"
+    path.write_text("parent,child\na,b\n# comment\nparent( b , c ).\nc\td\n% also a comment\nd e\n")
+    index = load_parent_edges(str(path))
+    assert index.edges == 4
+    assert index.is_ancestor("a", "e") and not index.is_ancestor("e", "a")
+
+    path.write_text("a,b,c\n")
+    with pytest.raises(ValueError, match=":1:"):
+        load_parent_edges(str(path))
+
+
+def test_header_after_comments_is_not_an_edge(tmp_path):
+    from genealogy import read_parent_edges
+
+    path = tmp_path / "edges.csv"
+    path.write_text("# exported family tree\n\nParent,Child\na,b\nparent,child\n")
+    assert list(read_parent_edges(str(path))) == [("a", "b"), ("parent", "child")]
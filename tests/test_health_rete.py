@@ -0,0 +1,110 @@
+import itertools
+import os
+import random
+
+import pytest
+
+from conftest import ROOT
+from health_rete import HealthExpertSystem, ReteNetwork
+from prolog_reader import Var
+
+PREDICATES = {"p": 1, "q": 2, "r": 2, "s": 1}
+CONSTANTS = ["a", "b", "c"]
+
+
+def naive_closure(rules, facts):
+    """Every fact derivable from facts, by naive fixpoint iteration"""
+    known = set(facts)
+    while True:
+        new = set()
+        for head, body in rules:
+            for combination in itertools.product(sorted(known), repeat=len(body)):
+                bindings = {}
+                if all(unify(condition, fact, bindings) for condition, fact in zip(body, combination)):
+                    new.add((head[0], *(bindings[a.name] if isinstance(a, Var) else a for a in head[1])))
+        if new <= known:
+            return known
+        known |= new
+
+
+def unify(condition, fact, bindings):
+    name, args = condition
+    if fact[0] != name or len(fact) != len(args) + 1:
+        return False
+    for arg, value in zip(args, fact[1:]):
+        if isinstance(arg, Var):
+            if bindings.setdefault(arg.name, value) != value:
+                return False
+        elif arg != value:
+            return False
+    return True
+
+
+def random_rule(rng):
+    variables = [Var(name) for name in "XYZ"]
+
+    def condition(name):
+        return name, [rng.choice(variables + CONSTANTS[:1]) for _ in range(PREDICATES[name])]
+
+    body = [condition(rng.choice(list(PREDICATES))) for _ in range(rng.randint(1, 2))]
+    bound = [arg for _, args in body for arg in args if isinstance(arg, Var)]
+    name = rng.choice(["q", "s", "r"])
+    head = name, [rng.choice(bound) if bound else "c" for _ in range(PREDICATES[name])]
+    return head, body
+
+
+def random_fact(rng):
+    name = rng.choice(["p", "q"])
+    return (name, *rng.choices(CONSTANTS, k=PREDICATES[name]))
+
+
+def working_memory(network):
+    return {fact for name, arity in PREDICATES.items() for fact in network.query(name, arity)}
+
+
+@pytest.mark.parametrize("seed", range(150))
+def test_assert_and_retract_match_naive_forward_chaining(seed):
+    rng = random.Random(seed)
+    rules = [random_rule(rng) for _ in range(rng.randint(1, 4))]
+    rules.append((("r", [Var("X"), Var("Z")]), [("r", [Var("X"), Var("Y")]), ("q", [Var("Y"), Var("Z")])]))
+    network = ReteNetwork()
+    late = rng.randint(0, len(rules))
+    for head, body in rules[:late]:
+        network.add_rule(head, body)
+    asserted = set()
+    for step in range(25):
+        if step == 10:
+            for head, body in rules[late:]:
+                network.add_rule(head, body)
+        fact = random_fact(rng)
+        if fact in asserted and rng.random() < 0.5:
+            network.remove_fact(fact)
+            asserted.discard(fact)
+        else:
+            network.add_fact(fact)
+            asserted.add(fact)
+        active = rules if step >= 10 else rules[:late]
+        assert working_memory(network) == naive_closure(active, asserted)
+
+
+def test_retraction_drops_facts_that_only_support_each_other():
+    network = ReteNetwork()
+    x, y = Var("X"), Var("Y")
+    network.add_rule(("r", [x, y]), [("q", [x, y])])
+    network.add_rule(("r", [x, y]), [("r", [y, x])])
+    network.add_fact(("q", "a", "b"))
+    assert network.holds(("r", "b", "a"))
+    assert set(network.remove_fact(("q", "a", "b"))) == {("r", "a", "b"), ("r", "b", "a")}
+    assert not network.query("r", 2)
+
+
+def test_health_diagnoses_follow_answers():
+    expert = HealthExpertSystem(os.path.join(ROOT, "health.pl"))
+    assert expert.assert_symptom("cough") == ["cold"]
+    assert expert.assert_symptom("fever") == ["flu"]
+    assert expert.diagnoses() == ["flu", "cold"]
+    assert set(expert.retract_symptom("cough")) == {"flu", "cold"}
+    assert expert.diagnoses() == []
+    expert.assert_symptom("headache")
+    expert.reset()
+    assert expert.diagnoses() == []
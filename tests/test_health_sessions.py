@@ -0,0 +1,68 @@
+import os
+import threading
+
+import pytest
+
+from conftest import ROOT
+from health_sessions import HealthSessionManager
+
+KB_FILE = os.path.join(ROOT, "health.pl")
+
+
+@pytest.fixture(params=["rete", "prolog"])
+def manager(request):
+    try:
+        return HealthSessionManager(KB_FILE, backend=request.param)
+    except Exception as e:    # pyswip raises its own error when SWI-Prolog is missing
+        pytest.skip(f"SWI-Prolog not available: {e}")
+
+
+def test_sessions_do_not_see_each_other(manager):
+    first, second = manager.open_session(), manager.open_session()
+    assert first.assert_symptom("cough") == ["cold"]
+    assert second.diagnoses() == []
+    assert second.assert_symptom("headache") == ["migraine"]
+    assert first.assert_symptom("fever") == ["flu"]
+    assert first.diagnoses() == ["flu", "cold"]
+    assert second.diagnoses() == ["migraine"]
+
+    assert set(first.retract_symptom("cough")) == {"flu", "cold"}
+    assert second.assert_symptom("cough") == ["cold"]
+    assert first.diagnoses() == []
+    assert second.diagnoses() == ["cold", "migraine"]
+
+
+def test_closing_or_resetting_a_session_leaves_the_others(manager):
+    first, second = manager.open_session(), manager.open_session()
+    first.assert_symptom("cough")
+    second.assert_symptom("cough")
+    with manager.open_session() as third:
+        third.assert_symptom("headache")
+        assert len(manager) == 3
+    assert manager.get_session(third.id) is None
+    first.reset()
+    assert first.diagnoses() == []
+    assert second.diagnoses() == ["cold"]
+    second.close()
+    assert len(manager) == 1
+    assert manager.get_session(first.id) is first
+    assert manager.get_symptoms() == ["fever", "cough", "headache"]
+
+
+def test_concurrent_sessions(manager):
+    answers = [["fever", "cough"], ["headache"], ["cough"], []] * 4
+    results = [None] * len(answers)
+
+    def consult(n):
+        with manager.open_session() as session:
+            for symptom in answers[n]:
+                session.assert_symptom(symptom)
+            results[n] = session.diagnoses()
+
+    threads = [threading.Thread(target=consult, args=(n,)) for n in range(len(answers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [["flu", "cold"], ["migraine"], ["cold"], []] * 4
+    assert len(manager) == 0
@@ -0,0 +1,36 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+from kb_reload import ReloadError, ReloadingExpertSystem, default_factory
+
+
+@pytest.fixture
+def kb_file(tmp_path):
+    path = tmp_path / "pizza_expert.pl"
+    shutil.copy(os.path.join(ROOT, "pizza_expert.pl"), path)
+    return str(path)
+
+
+def test_truncated_clause_is_not_swapped_in(kb_file):
+    expert = ReloadingExpertSystem(kb_file, default_factory("native"))
+    version = expert.version
+    with open(kb_file, "a", encoding="utf-8") as f:
+        f.write("\npizza_toppings(broken")
+    with pytest.raises(ReloadError, match="line"):
+        expert.reload()
+    assert expert.version == version
+    assert isinstance(expert.last_error, ReloadError)
+    assert expert.get_pizza_types().value
+
+
+def test_valid_edit_is_swapped_in(kb_file):
+    expert = ReloadingExpertSystem(kb_file, default_factory("native"))
+    version = expert.version
+    with open(kb_file, "a", encoding="utf-8") as f:
+        f.write("\npizza_toppings(plain, [tomato_sauce]).\n")
+    assert expert.reload()
+    assert expert.version != version
+    assert "plain" in expert.get_pizza_types().value
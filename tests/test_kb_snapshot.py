@@ -0,0 +1,77 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+from pizza_native import NativePizzaExpertSystem, read_snapshot, write_snapshot
+
+KB_FILE = os.path.join(ROOT, "pizza_expert.pl")
+
+
+@pytest.fixture
+def kb_file(tmp_path):
+    path = tmp_path / "pizza_expert.pl"
+    shutil.copy(KB_FILE, path)
+    return str(path)
+
+
+@pytest.fixture
+def pizza_expert():
+    try:
+        import pizza_expert
+    except Exception as e:    # pyswip raises its own error when SWI-Prolog is missing
+        pytest.skip(f"SWI-Prolog not available: {e}")
+    return pizza_expert
+
+
+def test_native_snapshot_is_used_only_while_the_source_matches(kb_file):
+    path = write_snapshot(kb_file)
+    assert path == os.path.splitext(kb_file)[0] + ".kbsnap"
+    kb, index = read_snapshot(kb_file)
+    expert = NativePizzaExpertSystem(kb_file)
+    assert expert.get_pizza_types() == NativePizzaExpertSystem(kb_file, use_snapshot=False) \
+        .get_pizza_types()
+    assert len(index) == len(kb.pizza_toppings)
+
+    with open(kb_file, "a", encoding="utf-8") as f:
+        f.write("\npizza_toppings(calzone, [ricotta, ham]).\n")
+    assert read_snapshot(kb_file) is None
+    assert "calzone" in NativePizzaExpertSystem(kb_file).get_pizza_types()
+
+
+def test_unreadable_snapshot_is_ignored(kb_file):
+    with open(os.path.splitext(kb_file)[0] + ".kbsnap", "wb") as f:
+        f.write(b"not a pickle")
+    assert read_snapshot(kb_file) is None
+    assert NativePizzaExpertSystem(kb_file).get_pizza_types()
+
+
+def test_compiled_kb_path_prefers_a_newer_qlf(pizza_expert, kb_file):
+    qlf_file = os.path.splitext(kb_file)[0] + ".qlf"
+    assert pizza_expert.compiled_kb_path(kb_file) == kb_file
+    open(qlf_file, "wb").close()
+    source_time = os.path.getmtime(kb_file)
+    os.utime(qlf_file, (source_time - 10, source_time - 10))
+    assert pizza_expert.compiled_kb_path(kb_file) == kb_file
+    os.utime(qlf_file, (source_time + 10, source_time + 10))
+    assert pizza_expert.compiled_kb_path(kb_file) == qlf_file
+
+
+def test_build_qlf(pizza_expert, kb_file):
+    from conftest import run_isolated
+
+    result = run_isolated(f"""
+import json
+from kb_snapshot import build_qlf
+from pizza_expert import PizzaExpertSystem, compiled_kb_path
+qlf_file = build_qlf({kb_file!r})
+print(json.dumps({{
+    "qlf_file": qlf_file,
+    "compiled": compiled_kb_path({kb_file!r}),
+    "pizza_types": PizzaExpertSystem({kb_file!r}, cache_size=0).get_pizza_types(),
+}}))
+""")
+    assert os.path.exists(result["qlf_file"])
+    assert result["compiled"] == result["qlf_file"]
+    assert result["pizza_types"] == NativePizzaExpertSystem(kb_file).get_pizza_types()
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from pizza_index import PantrySession, RecipeIndex
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_session_agrees_with_index_while_toggling(seed):
+    rng = random.Random(seed)
+    ingredients = [f"i{n}" for n in range(rng.randint(1, 12))]
+    index = RecipeIndex([(f"p{n}", rng.sample(ingredients, rng.randint(0, min(5, len(ingredients)))))
+                         for n in range(rng.randint(1, 30))])
+    start = rng.sample(ingredients, rng.randint(0, len(ingredients)))
+    session = PantrySession(index, start)
+    pantry = set(start)
+    for _ in range(40):
+        ingredient = rng.choice(ingredients + ["unknown"])
+        if ingredient in pantry:
+            assert session.remove_ingredient(ingredient)
+            pantry.discard(ingredient)
+        else:
+            assert session.add_ingredient(ingredient)
+            pantry.add(ingredient)
+        assert session.find_makeable() == index.find_makeable(pantry)
+        k, max_missing = rng.randint(0, 6), rng.choice([None, 1, 2])
+        assert session.closest(k, max_missing) == index.closest(pantry, k, max_missing)
+
+
+def test_toggling_twice_is_a_no_op():
+    index = RecipeIndex([("a", ["x"])])
+    session = PantrySession(index)
+    assert session.add_ingredient("x")
+    assert not session.add_ingredient("x")
+    assert session.find_makeable() == ["a"]
+    assert session.remove_ingredient("x")
+    assert not session.remove_ingredient("x")
+    assert session.find_makeable() == []
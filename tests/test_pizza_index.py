@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from pizza_index import RecipeIndex
+
+
+def random_catalog(seed):
+    rng = random.Random(seed)
+    ingredients = [f"i{n}" for n in range(rng.randint(1, 15))]
+    recipes = [(f"p{n % 7}", rng.sample(ingredients, rng.randint(0, min(5, len(ingredients)))))
+               for n in range(rng.randint(0, 25))]
+    for _, required in recipes:
+        if required and rng.random() < 0.2:    # listed twice, as a KB may do
+            required.insert(rng.randint(0, len(required)), rng.choice(required))
+    pantry = rng.sample(ingredients + ["unknown"], rng.randint(0, len(ingredients)))
+    return rng, recipes, pantry, RecipeIndex(recipes)
+
+
+def brute_missing(required, pantry):
+    """Missing ingredients in recipe order, as missing_toppings_for_pizza/3 lists them"""
+    return [ing for ing in required if ing not in pantry]
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_makeable_matches_subset_check(seed):
+    _, recipes, pantry, index = random_catalog(seed)
+    expected = [name for name, required in recipes if set(required) <= set(pantry)]
+    assert index.find_makeable(pantry) == expected
+    assert list(index.iter_makeable(pantry)) == expected
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_missing_by_recipe_matches_set_difference(seed):
+    _, recipes, pantry, index = random_catalog(seed)
+    expected = [(name, brute_missing(required, pantry)) for name, required in recipes
+                if not set(required) <= set(pantry)]
+    assert index.missing_by_recipe(pantry) == expected
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_closest_matches_full_sort(seed):
+    rng, recipes, pantry, index = random_catalog(seed)
+    k = rng.randint(0, 8)
+    max_missing = rng.choice([None, 1, 2, 3])
+    ranked = sorted((len(set(brute_missing(required, pantry))), position)
+                    for position, (_, required) in enumerate(recipes))
+    expected = [(recipes[position][0], brute_missing(recipes[position][1], pantry))
+                for missing, position in ranked
+                if missing and (max_missing is None or missing <= max_missing)][:k]
+    assert index.closest(pantry, k, max_missing) == expected
+
+
+class CountingList(list):
+    def __init__(self, items):
+        super().__init__(items)
+        self.visited = 0
+
+    def __iter__(self):
+        for item in super().__iter__():
+            self.visited += 1
+            yield item
+
+
+@pytest.mark.parametrize("pantry_size", [20, 100])
+def test_closest_stops_early_with_a_large_pantry(pantry_size):
+    rng = random.Random(pantry_size)
+    ingredients = [f"i{n}" for n in range(300)]
+    recipes = [(f"p{n}", rng.sample(ingredients, rng.randint(1, 8))) for n in range(10000)]
+    index = RecipeIndex(recipes)
+    pantry = ingredients[:pantry_size]
+    expected = index.closest(pantry, 10)
+    index._by_size = CountingList(index._by_size)
+    assert index.closest(pantry, 10) == expected
+    assert index._by_size.visited < len(recipes) // 10
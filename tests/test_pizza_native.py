@@ -0,0 +1,51 @@
+import os
+
+from conftest import ROOT
+
+from pizza_native import CompactPizzaExpertSystem
+
+
+def test_compact_lookup_of_an_unknown_ingredient_leaves_the_index_alone():
+    expert = CompactPizzaExpertSystem(os.path.join(ROOT, "pizza_expert.pl"))
+    known = len(expert.index.ingredient_ids)
+    expert.production_planner()
+    assert expert.ingredient_id("anchovy") is None
+    assert len(expert.index.ingredient_ids) == known
+    sauce = expert.ingredient_id("tomato_sauce")
+    assert expert.ingredient_name(sauce) == "tomato_sauce"
+    assert expert.plan_production({"anchovy": 3}, {"pepperoni": 1})
+
+
+def test_lists_come_back_in_kb_recipe_and_user_order():
+    from pizza_native import NativePizzaExpertSystem
+
+    expert = NativePizzaExpertSystem(os.path.join(ROOT, "pizza_expert.pl"), use_snapshot=False)
+    assert expert.find_missing_essential(["water"]) == ["flour", "salt"]
+    assert expert.find_missing_extra([]) == ["sugar", "semolina"]
+    assert expert.get_user_extras(["semolina", "flour", "sugar"]) == ["semolina", "sugar"]
+    assert dict(expert.missing_toppings_by_pizza(["tomato_sauce"]))["vegetarian"] == \
+        ["mozzarella_cheese", "onions", "mushrooms"]
+
+
+def test_steps_beyond_max_plan_extras_are_generated_on_demand(tmp_path, monkeypatch):
+    import pizza_native
+    from conftest import many_extras_kb
+    from pizza_native import MAX_PLAN_EXTRAS, NativePizzaExpertSystem
+
+    kb_file = many_extras_kb(tmp_path, MAX_PLAN_EXTRAS)
+    expert = NativePizzaExpertSystem(kb_file, use_snapshot=False)
+    assert len(expert.get_extra_base_ingredients()) > MAX_PLAN_EXTRAS
+    assert expert._step_plans == {}
+    monkeypatch.setattr(pizza_native, "MAX_PLAN_EXTRAS", MAX_PLAN_EXTRAS + 2)
+    planned = NativePizzaExpertSystem(kb_file, use_snapshot=False)
+    assert planned._step_plans
+
+    extras = sorted(expert.get_extra_base_ingredients())
+    for user_base in ([], ["flour"], ["extra_3", "sugar", "water"], extras[::-1], extras[::3]):
+        wanted = sorted(set(user_base) & set(extras))
+        for pizza in expert.get_pizza_types():
+            steps = expert.get_steps_for(pizza, user_base)
+            assert list(steps) == expert.generate_steps(pizza, wanted)
+            assert steps == planned.get_steps_for(pizza, user_base)
+    assert expert.get_steps_for("no such pizza", ["sugar"]) == \
+        tuple(expert.generate_steps("no such pizza", ["sugar"]))
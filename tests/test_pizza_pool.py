@@ -0,0 +1,58 @@
+import os
+import signal
+import sys
+
+import pytest
+
+from conftest import PANTRY, ROOT
+from pizza_native import NativePizzaExpertSystem
+from pizza_pool import PooledPizzaExpertSystem, WorkerCrashedError, WorkerTimeoutError
+
+KB_FILE = os.path.join(ROOT, "pizza_expert.pl")
+
+
+def pool(size=1, **options):
+    return PooledPizzaExpertSystem(KB_FILE, size=size, backend="native", warmup=False, **options)
+
+
+def test_answers_like_the_expert():
+    expert = NativePizzaExpertSystem(KB_FILE)
+    with pool(size=2) as experts:
+        assert experts.find_makeable_pizzas(PANTRY) == expert.find_makeable_pizzas(PANTRY)
+        assert experts.closest_pizzas(PANTRY, 2, 3) == expert.closest_pizzas(PANTRY, 2, 3)
+        with pytest.raises(KeyError):
+            experts.plan_production({}, {"no such pizza": 1})
+
+
+def test_crashed_worker_is_replaced_and_the_call_retried():
+    with pool() as experts:
+        experts._workers[0].process.kill()
+        experts._workers[0].process.join()
+        assert experts.get_pizza_types() == NativePizzaExpertSystem(KB_FILE).get_pizza_types()
+        assert experts.restarts == 1
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs SIGSTOP")
+def test_hung_worker_times_out_and_is_replaced():
+    with pool(call_timeout=0.5) as experts:
+        hung = experts._workers[0]
+        os.kill(hung.process.pid, signal.SIGSTOP)
+        with pytest.raises(WorkerTimeoutError):
+            experts.get_pizza_types()
+        assert not hung.process.is_alive()
+        assert experts._workers[0] is not hung
+        assert experts.get_pizza_types()
+
+
+def test_worker_that_cannot_be_replaced_is_dropped():
+    with pool() as experts:
+        def spawn():
+            raise OSError("cannot start a worker")
+
+        experts._spawn = spawn
+        experts._workers[0].process.kill()
+        with pytest.raises(OSError):
+            experts.get_pizza_types()
+        assert experts._workers == []
+        with pytest.raises(WorkerCrashedError, match="No worker left"):
+            experts.get_pizza_types()
@@ -0,0 +1,101 @@
+"""Every server method, called once over HTTP on localhost (native backend)."""
+
+import asyncio
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from conftest import ARGUMENTS, ROOT
+from pizza_native import NativePizzaExpertSystem
+from pizza_server import METHODS, PizzaServer
+from query_cache import canonical_key
+
+
+@pytest.fixture(scope="module")
+def server():
+    expert = NativePizzaExpertSystem(os.path.join(ROOT, "pizza_expert.pl"), use_snapshot=False)
+    loop = asyncio.new_event_loop()
+    server = PizzaServer(expert, port=0)
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.run_until_complete(server.close())
+    loop.close()
+
+
+def post(server, method, params):
+    request = urllib.request.Request(f"http://127.0.0.1:{server.port}/{method}",
+                                     data=json.dumps(params).encode("utf-8"), method="POST")
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, json.loads(response.read())
+
+
+@pytest.mark.parametrize("method", sorted(METHODS))
+def test_every_method_answers(server, method):
+    params = {name: ARGUMENTS[name] for name in METHODS[method]}
+    status, payload = post(server, method, params)
+    assert status == 200
+    expected = getattr(server.expert, method)(*params.values())
+    assert payload["result"] == json.loads(json.dumps(expected))
+
+
+def test_canonical_key_is_hashable_for_nested_arguments():
+    pantries = [["b", "a"], ["c"]]
+    assert hash(canonical_key(pantries, ordered=True))
+    assert canonical_key([["b", "a"], ["c"]]) == canonical_key([["c"], ["b", "a"]])
+    assert canonical_key({"x": [2, 1]}) == canonical_key({"x": [1, 2]})
+    assert canonical_key([10, 5], ordered=True) != canonical_key([5, 10], ordered=True)
+
+
+def test_time_budget_is_capped(server):
+    from pizza_server import MAX_TIME_BUDGET
+    assert server._time_budget(None) is None
+    assert server._time_budget(1e9) == MAX_TIME_BUDGET
+    assert server._time_budget(0.25) == 0.25
+    with pytest.raises(urllib.error.HTTPError) as error:
+        post(server, "shopping_list", {"user_toppings": [], "k": 1, "time_budget": "forever"})
+    assert error.value.code == 400
+
+
+def test_stock_vectors_in_different_orders_are_not_coalesced(server):
+    from pizza_server import ORDERED_METHODS
+    assert "plan_production" in ORDERED_METHODS
+    planner = server.expert.production_planner()
+    stock = [0.0] * len(planner.ingredients)
+    swapped = list(stock)
+    stock[0], swapped[1] = 10, 10
+    order = {"margherita": 1}
+    _, first = post(server, "plan_production", {"stock": stock, "order": order})
+    _, second = post(server, "plan_production", {"stock": swapped, "order": order})
+    assert first["result"] == server.expert.plan_production(stock, order)
+    assert second["result"] == server.expert.plan_production(swapped, order)
+
+
+def raw_request(server, data):
+    import socket
+    with socket.create_connection(("127.0.0.1", server.port), timeout=10) as sock:
+        sock.sendall(data)
+        response = b""
+        while chunk := sock.recv(65536):
+            response += chunk
+    return int(response.split(b" ", 2)[1])
+
+
+def test_bad_content_length_is_a_client_error(server):
+    for length in (b"ten", b"-5"):
+        request = b"POST /find_makeable_pizzas HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}"
+        assert raw_request(server, request) == 400
+
+
+def test_wrongly_typed_arguments_are_a_client_error(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        post(server, "find_makeable_pizzas", {"user_toppings": 5})
+    assert error.value.code == 400
+    assert "TypeError" in json.loads(error.value.read())["error"]
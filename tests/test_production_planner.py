@@ -0,0 +1,66 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from pizza_index import RecipeIndex
+from production_planner import ProductionPlanner
+
+
+def catalog(seed):
+    rng = random.Random(seed)
+    ingredients = [f"i{n}" for n in range(rng.randint(1, 10))]
+    recipes = [(f"p{n}", rng.sample(ingredients, rng.randint(0, min(4, len(ingredients)))))
+               for n in range(rng.randint(1, 8))]
+    quantities = {(pizza, ing): rng.choice([0.5, 1, 2, 3])
+                  for pizza, required in recipes for ing in required if rng.random() < 0.5}
+    stock = {ing: rng.randint(0, 20) for ing in ingredients}
+    return rng, recipes, quantities, stock, ProductionPlanner(RecipeIndex(recipes, ingredients), quantities)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_max_units_and_demand_match_a_naive_computation(seed):
+    rng, recipes, quantities, stock, planner = catalog(seed)
+    units = planner.max_units(stock)
+    for pizza, required in recipes:
+        amounts = [quantities.get((pizza, ing), 1) for ing in required]
+        expected = min((math.floor(stock[ing] / a) for ing, a in zip(required, amounts)), default=None)
+        assert units[pizza] == expected
+    order = {pizza: rng.randint(0, 4) for pizza, _ in recipes}
+    demand = dict.fromkeys(stock, 0.0)
+    for pizza, required in recipes:
+        for ing in required:
+            demand[ing] += order[pizza] * quantities.get((pizza, ing), 1)
+    assert np.allclose(planner.demand(order), [demand[ing] for ing in planner.ingredients])
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_plan_never_uses_more_than_the_stock(seed):
+    rng, recipes, _, stock, planner = catalog(seed)
+    order = {pizza: rng.randint(0, 4) for pizza, _ in recipes}
+    plan = planner.plan(stock, order)
+    assert all(amount >= -1e-9 for amount in plan["leftover"].values())
+    assert all(plan["produced"][pizza] <= count for pizza, count in order.items() if count)
+    if plan["runs_out"] is None:
+        assert all(plan["produced"][pizza] == count for pizza, count in order.items() if count)
+
+
+def test_proportional_split_and_bottleneck():
+    index = RecipeIndex([("a", ["dough", "ham"]), ("b", ["dough"])], ["dough", "ham"])
+    planner = ProductionPlanner(index, {("a", "ham"): 2})
+    plan = planner.plan({"dough": 10, "ham": 4}, {"a": 5, "b": 5})
+    assert plan["runs_out"] == "ham"
+    assert plan["produced"] == {"a": 2, "b": 5}
+    assert plan["shortfall"] == {"ham": 6.0}
+    produced, bottleneck = planner.plan_many([[10, 4], [100, 100]], {"a": 5, "b": 5})
+    assert produced.tolist() == [[2, 5], [5, 5]]
+    assert bottleneck.tolist() == [1, -1]
+
+
+def test_ingredients_interned_after_the_planner_are_ignored():
+    index = RecipeIndex([("a", ["dough"])], ["dough"])
+    planner = ProductionPlanner(index)
+    index.intern("anchovy")
+    assert planner.stock_vector({"dough": 3, "anchovy": 5}).tolist() == [3]
+    assert planner.plan({"dough": 3, "anchovy": 5}, {"a": 2})["produced"] == {"a": 2}
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from conftest import ROOT
+
+from prolog_reader import PrologSyntaxError, _FactParser, read_prolog_facts
+
+
+def facts(source):
+    return list(_FactParser(source).clauses())
+
+
+def test_reads_facts_and_skips_rules_and_directives():
+    source = """
+    :- dynamic has/1.
+    pizza_toppings(margherita, [tomato_sauce, 'fresh basil']).
+    step(margherita, 1, "Stretch the dough. Then bake").
+    makeable(P) :- pizza_toppings(P, T), ready(T).
+    'quoted name'(a).
+    """
+    assert facts(source) == [
+        ("pizza_toppings", ("margherita", ["tomato_sauce", "fresh basil"])),
+        ("step", ("margherita", 1, "Stretch the dough. Then bake")),
+        ("quoted name", ("a",)),
+    ]
+
+
+def test_numbers():
+    assert facts("q(1e3, -2.5E-1, 7, 0.5).") == [("q", (1000.0, -0.25, 7, 0.5))]
+
+
+def test_unreadable_fact_is_an_error_with_its_line():
+    source = "pizza_toppings(a, [x]).\npizza_toppings(b, [y).\npizza_toppings(c, [z]).\n"
+    with pytest.raises(PrologSyntaxError) as error:
+        facts(source)
+    assert error.value.line == 2
+
+
+def test_unterminated_clause_is_an_error():
+    with pytest.raises(PrologSyntaxError, match="line 2"):
+        facts("a(b).\npizza_toppings(broken")
+
+
+def test_shipped_kbs_read_cleanly():
+    for kb_file in ("pizza_expert.pl", "health.pl", "family.pl"):
+        assert read_prolog_facts(os.path.join(ROOT, kb_file))
@@ -0,0 +1,54 @@
+import pytest
+
+from query_cache import QueryCache, cached_query
+from query_metrics import QueryMetrics, instrumented_query
+
+
+class Backend:
+    def __init__(self):
+        self.cache = QueryCache()
+        self.metrics = QueryMetrics()
+        self.calls = 0
+
+    def _inferences(self):
+        return None
+
+    @cached_query()
+    @instrumented_query
+    def closest_pizzas(self, user_toppings, k, max_missing=None):
+        self.calls += 1
+        return [sorted(user_toppings), k, max_missing]
+
+    @instrumented_query
+    def shopping_list(self, user_toppings, k, costs=None, time_budget=None):
+        return costs, time_budget
+
+
+def test_keyword_and_positional_calls_share_a_cache_entry():
+    backend = Backend()
+    first = backend.closest_pizzas(["b", "a"], 5, max_missing=2)
+    assert first == [["a", "b"], 5, 2]
+    assert backend.closest_pizzas(["a", "b"], 5, 2) == first
+    assert backend.closest_pizzas(user_toppings=["a", "b"], k=5, max_missing=2) == first
+    assert backend.calls == 1
+
+
+def test_defaults_are_part_of_the_key():
+    backend = Backend()
+    backend.closest_pizzas(["a"], 1)
+    backend.closest_pizzas(["a"], 1, None)
+    assert backend.calls == 1
+    backend.closest_pizzas(["a"], 1, 0)
+    assert backend.calls == 2
+
+
+def test_instrumented_query_passes_keywords():
+    backend = Backend()
+    assert backend.shopping_list(["a"], 3, costs={"x": 2}) == ({"x": 2}, None)
+    assert backend.shopping_list(["a"], 3, time_budget=0.1) == (None, 0.1)
+    assert backend.metrics.snapshot()["shopping_list"]["calls"] == 2
+
+
+def test_unknown_keyword_is_still_an_error():
+    with pytest.raises(TypeError):
+        Backend().closest_pizzas(["a"], 1, limit=2)
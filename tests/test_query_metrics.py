@@ -0,0 +1,97 @@
+import pytest
+
+from query_metrics import QueryMetrics, instrumented_query
+
+
+class Backend:
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.inferences = 0
+
+    def _inferences(self):
+        return self.inferences
+
+    @instrumented_query
+    def find_makeable_pizzas(self, user_toppings):
+        self.inferences += 7
+        return sorted(user_toppings)
+
+    @instrumented_query
+    def get_pizza_ingredients(self, pizza_type):
+        raise KeyError(pizza_type)
+
+
+def test_sampled_calls_are_measured():
+    backend = Backend(QueryMetrics())
+    backend.find_makeable_pizzas(["b", "a"])
+    backend.find_makeable_pizzas(["c"])
+    with pytest.raises(KeyError):
+        backend.get_pizza_ingredients("nope")
+    snapshot = backend.metrics.snapshot()
+    stats = snapshot["find_makeable_pizzas"]
+    assert (stats["calls"], stats["errors"], stats["sampled"]) == (2, 0, 2)
+    assert stats["result_size_mean"] == 1.5
+    assert stats["inferences_sum"] == 14 and stats["inferences_mean"] == 7
+    assert stats["time_histogram"][-1] == (float("inf"), 2)
+    assert snapshot["get_pizza_ingredients"]["errors"] == 1
+
+
+def test_unsampled_calls_are_only_counted():
+    draws = iter([0.1, 0.9, 0.9, 0.2])
+    backend = Backend(QueryMetrics(sample_rate=0.5, random_fn=lambda: next(draws)))
+    for _ in range(3):
+        backend.find_makeable_pizzas(["a"])
+    with pytest.raises(KeyError):
+        backend.get_pizza_ingredients("nope")
+    snapshot = backend.metrics.snapshot()
+    stats = snapshot["find_makeable_pizzas"]
+    assert (stats["calls"], stats["sampled"]) == (3, 1)
+    assert stats["inferences_sum"] == 7
+    assert stats["time_histogram"][-1] == (float("inf"), 1)
+    errors = snapshot["get_pizza_ingredients"]
+    assert (errors["calls"], errors["errors"], errors["sampled"]) == (1, 1, 1)
+
+
+def test_disabled_metrics():
+    backend = Backend(None)
+    assert backend.find_makeable_pizzas(["a"]) == ["a"]
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = QueryMetrics(buckets=(0.1, 0.01))
+    for seconds in (0.005, 0.01, 0.05, 3.0):
+        metrics.record("q", seconds)
+    assert metrics.snapshot()["q"]["time_histogram"] == [
+        (0.01, 2), (0.1, 3), (float("inf"), 4)]
+
+
+def test_prometheus_text():
+    metrics = QueryMetrics(buckets=(0.01, 0.1))
+    metrics.record("find_makeable_pizzas", 0.05, result_size=3, inferences=40)
+    metrics.record("find_makeable_pizzas", 0.5, result_size=1, inferences=20, error=True)
+    metrics.count("find_makeable_pizzas")
+    lines = metrics.prometheus_text(prefix="pz").splitlines()
+    assert lines[:2] == ["# HELP pz_calls_total Query method calls.",
+                         "# TYPE pz_calls_total counter"]
+    for line in [
+        'pz_calls_total{method="find_makeable_pizzas"} 3',
+        'pz_errors_total{method="find_makeable_pizzas"} 1',
+        "# TYPE pz_duration_seconds histogram",
+        'pz_duration_seconds_bucket{method="find_makeable_pizzas",le="0.01"} 0',
+        'pz_duration_seconds_bucket{method="find_makeable_pizzas",le="0.1"} 1',
+        'pz_duration_seconds_bucket{method="find_makeable_pizzas",le="+Inf"} 2',
+        'pz_duration_seconds_sum{method="find_makeable_pizzas"} 0.55',
+        'pz_duration_seconds_count{method="find_makeable_pizzas"} 2',
+        'pz_result_size_sum{method="find_makeable_pizzas"} 4',
+        'pz_result_size_count{method="find_makeable_pizzas"} 2',
+        'pz_inferences_sum{method="find_makeable_pizzas"} 60',
+        'pz_inferences_count{method="find_makeable_pizzas"} 2',
+    ]:
+        assert line in lines
+    assert all(line.startswith(("#", "pz_")) for line in lines)
+
+
+def test_prometheus_text_without_calls():
+    text = QueryMetrics().prometheus_text()
+    assert text.endswith("\n")
+    assert all(line.startswith("# ") for line in text.splitlines())
@@ -0,0 +1,77 @@
+import itertools
+import random
+import time
+
+import pytest
+
+from pizza_index import RecipeIndex
+from shopping_list import DEFAULT_TIME_BUDGET, cheapest_cover
+
+
+def random_catalog(rng, n_ingredients, n_recipes, max_size):
+    ingredients = [f"i{n}" for n in range(n_ingredients)]
+    recipes = [(f"p{n}", rng.sample(ingredients, rng.randint(0, max_size)))
+               for n in range(n_recipes)]
+    return ingredients, RecipeIndex(recipes, ingredients)
+
+
+def brute_force(index, pantry, k, costs, pizzas=None):
+    """Cost of the cheapest ingredient set letting at least k pizzas be made"""
+    names = set(pizzas) if pizzas is not None else set(index.names)
+    buyable = sorted({ing for ing in index.ingredients if ing not in pantry})
+    best = None
+    for size in range(len(buyable) + 1):
+        for bought in itertools.combinations(buyable, size):
+            have = set(pantry) | set(bought)
+            made = sum(1 for name, required in zip(index.names, index.recipes)
+                       if name in names and set(index.ingredient_ids.names_of(required.requires)) <= have)
+            if made >= k:
+                cost = sum(costs.get(ing, 1) for ing in bought)
+                if best is None or cost < best:
+                    best = cost
+    return best
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_matches_exhaustive_search(seed):
+    rng = random.Random(seed)
+    ingredients, index = random_catalog(rng, 9, rng.randint(1, 12), 4)
+    pantry = rng.sample(ingredients, rng.randint(0, 3))
+    costs = {ing: rng.randint(1, 9) for ing in ingredients if rng.random() < 0.7}
+    pizzas = rng.sample(index.names, rng.randint(1, len(index.names))) if rng.random() < 0.3 else None
+    k = rng.randint(1, len(pizzas if pizzas is not None else index.names))
+    result = cheapest_cover(index, pantry, k, costs, pizzas, time_budget=float("inf"))
+    assert result["optimal"]
+    assert result["cost"] == brute_force(index, pantry, k, costs, pizzas)
+    assert result["cost"] == sum(costs.get(ing, 1) for ing in result["ingredients"])
+    assert len(result["pizzas"]) >= k
+
+
+def test_too_few_pizzas():
+    index = RecipeIndex([("a", ["x"])])
+    assert cheapest_cover(index, [], 2) is None
+
+
+def test_large_catalog_stays_within_the_default_budget():
+    rng = random.Random(1)
+    ingredients = [f"i{n}" for n in range(300)]
+    index = RecipeIndex([(f"p{n}", rng.sample(ingredients, rng.randint(4, 8)))
+                         for n in range(2000)], ingredients)
+    start = time.perf_counter()
+    result = cheapest_cover(index, [], 20)
+    assert time.perf_counter() - start < DEFAULT_TIME_BUDGET + 1
+    assert not result["optimal"]
+    assert len(result["pizzas"]) >= 20
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_ties_do_not_depend_on_bit_layout(seed):
+    rng = random.Random(seed)
+    ingredients, index = random_catalog(rng, 8, rng.randint(2, 10), 3)
+    recipes = [(name, index.ingredient_ids.names_of(recipe.requires))
+               for name, recipe in zip(index.names, index.recipes)]
+    reversed_index = RecipeIndex(recipes, list(reversed(ingredients)))
+    k = rng.randint(1, len(recipes))
+    for budget in (0, float("inf")):
+        assert cheapest_cover(index, [], k, time_budget=budget) == \
+            cheapest_cover(reversed_index, [], k, time_budget=budget)